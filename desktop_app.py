@@ -1,7 +1,17 @@
+from __future__ import annotations
+import time
+_T0 = time.perf_counter()  # 시작 시각 (--startup-report 용)
+
 from datetime import datetime, timedelta
 import sys
 import os
 
+if __name__ == "__main__":
+    # PyInstaller exe 의 프로세스 풀 작업자는 여기서 작업을 받고 끝난다
+    # (만료 검사/모듈 준비보다 먼저 — 작업자마다 만료 팝업이나 종료가 일어나지 않게)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
 # ──[설정]────────────────────────────────────────────────────────
 DEPLOY_DATE = datetime(2025, 9, 1)   # 배포일
 VALID_DAYS  = 40                     # 사용 가능 기간 (일)
@@ -18,7 +28,13 @@ def _should_expire(now: datetime) -> bool:
     expire_date = DEPLOY_DATE + timedelta(days=VALID_DAYS)
     return now > expire_date
 
+# 'aggregate' 하위 명령은 GUI 없이 실행 (tkinter 를 import 하지 않음)
+_CLI_MODE = len(sys.argv) > 1 and sys.argv[1] == "aggregate"
+
 def _block_with_message(msg: str):
+    if _CLI_MODE:
+        print(msg, file=sys.stderr)
+        sys.exit(1)
     try:
         import tkinter as tk
         from tkinter import messagebox
@@ -32,6 +48,10 @@ def _block_with_message(msg: str):
 if _should_expire(datetime.now()):
     _block_with_message("⚠️ 사용 기간이 만료되었습니다.\n개발자에게 문의하세요.")
 
+if _CLI_MODE and __name__ == "__main__":
+    from heart_cli import main as _cli_main
+    sys.exit(_cli_main(sys.argv[2:]))
+
 # -*- coding: utf-8 -*-
 """
 desktop_app.py  (v2025-09-01, tag-based rounds)
@@ -39,96 +59,58 @@ desktop_app.py  (v2025-09-01, tag-based rounds)
 - 엑셀 총합산: 파일명 4자리 태그(예: 0804) 기준 회차/요약 생성
 """
 
-import os, sys, io, re, csv, json, time, threading, subprocess, zipfile, unicodedata
+import os, sys, re, json, time, queue, atexit, shutil, tempfile, threading, subprocess
+import importlib
 from pathlib import Path
 from datetime import datetime
 from typing import List, Tuple
 
-import pandas as pd
-import numpy as np
-
+_t = time.perf_counter()
 import tkinter as tk
 from tkinter import (
     Tk, ttk, StringVar, Text, NORMAL, DISABLED, END,
     filedialog, messagebox
 )
-
-# ====== helpers ======
-def sanitize(name: str) -> str:
-    return re.sub(r'[\\/*?:\[\]]', "_", str(name))[:31] or "Sheet"
-
-def visual_len(val) -> int:
-    s = str("" if val is None else val)
-    w = 0
-    for ch in s:
-        if unicodedata.east_asian_width(ch) in ("F","W","A") or ord(ch) >= 0x1F300:
-            w += 2
-        else:
-            w += 1
-    return w
-
-def _strip_zw(s: str) -> str:
-    return re.sub(r"[\u200b-\u200f\u202a-\u202e\u2060-\u206f\ufeff]", "", s)
-
-BRACKET_ANY = r"[()\[\]{}<>「」『』【】〈〉《》⟦⟧❲❳]"
-
-def normalize_nick(nick: str) -> str:
-    if not isinstance(nick, str):
-        return ""
-    s = unicodedata.normalize("NFKC", nick)
-    s = _strip_zw(s)
-    for _ in range(3):
-        s = re.sub(fr"^\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*", "", s)
-        s = re.sub(fr"\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*$", "", s)
-        s = re.sub(fr"{BRACKET_ANY}.*?{BRACKET_ANY}", " ", s)
-    s = re.sub(r"[\U0001F000-\U0001FAFF\U00002700-\U000027BF\U00002600-\U000026FF]+", "", s)
-    s = re.sub(r"[❤️♡♥︎💗💖💘💝💞💟✨⭐️☀️]+", "", s)
-    s = re.sub(r"\s*(님|형|누나|오빠|언니)$", "", s)
-    s = re.sub(r"[\"'`]+", "", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def normalize_bj(name: str) -> str:
-    if not isinstance(name, str):
-        return ""
-    s = unicodedata.normalize("NFKC", name)
-    s = _strip_zw(s)
-    s = re.sub(fr"^\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*", "", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def extract_date_from_name(name: str) -> str:
-    s = name.lower()
-    m = re.search(r'(20\d{2})[.\-_](\d{1,2})[.\-_](\d{1,2})', s)
-    if m: return f"{int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
-    m = re.search(r'(20\d{2})(\d{2})(\d{2})', s)
-    if m: return f"{int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
-    m = re.search(r'(\d{2})[.\-_](\d{1,2})[.\-_](\d{1,2})', s)
-    if m: return f"{2000+int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
-    m = re.search(r'(\d{1,2})(\d{2})', s)
-    if m and len(m.group(0)) == 4:
-        y = datetime.now().year
-        return f"{y:04d}-{int(m[1]):02d}-{int(m[2]):02d}"
-    return datetime.now().strftime("%Y-%m-%d")
-
-def read_any_table(path_or_file, sheet=None) -> pd.DataFrame:
-    p = str(path_or_file)
-    if p.lower().endswith(".xlsx"):
-        return pd.read_excel(path_or_file, sheet_name=(sheet if str(sheet).strip() else 0))
-    with open(path_or_file, "rb") as f:
-        raw = f.read()
-    for enc in ["utf-8-sig","utf-8","cp949","euc-kr"]:
+_TK_IMPORT_S = time.perf_counter() - _t
+
+from heart_jobs import JobRunner
+
+# pandas/numpy/openpyxl 과 집계 모듈은 창을 먼저 띄운 뒤 백그라운드에서 로드
+# (각 함수는 필요할 때 지역 import — 이미 로드됐으면 비용 없음)
+HEAVY_IMPORTS = ["numpy", "pandas", "openpyxl", "heart_pipeline"]
+STARTUP_BUDGET_S = 1.5   # 첫 창 표시까지 목표 시간
+
+# 예전에 이 모듈에 있던 함수들 (desktop_app.X 로 쓰던 코드 호환, 접근 시 로드)
+_LAZY_EXPORTS = {
+    "normalize_nick": "heart_norm", "normalize_bj": "heart_norm",
+    "normalize_nick_series": "heart_norm", "normalize_bj_series": "heart_norm",
+    "AFFILIATE_GENERAL_SUBSTRS": "heart_norm", "classify_heart": "heart_norm",
+    "visual_len": "xlsx_writer",
+    "sanitize_name": "heart_export", "make_bj_excel_bytes": "heart_export",
+    "extract_date_from_name": "heart_ingest", "read_any_table": "heart_ingest",
+    "preprocess_single": "heart_ingest",
+    "sanitize": "heart_pipeline",
+}
+
+def __getattr__(name):
+    mod = _LAZY_EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(mod), name)
+
+_import_costs: List[Tuple[str, float]] = []
+
+def _warm_imports(done=None) -> None:
+    """무거운 모듈을 순서대로 import 하며 모듈별 소요 시간을 기록."""
+    for name in HEAVY_IMPORTS:
+        t = time.perf_counter()
         try:
-            text = raw.decode(enc)
-            try:
-                dialect = csv.Sniffer().sniff(text[:4000], delimiters=[",","\t",";","|"])
-                sep = dialect.delimiter
-            except Exception:
-                sep = ","
-            return pd.read_csv(io.StringIO(text), sep=sep)
+            importlib.import_module(name)
         except Exception:
-            continue
-    raise ValueError("CSV 인코딩/구분자 해석 실패")
+            pass
+        _import_costs.append((name, time.perf_counter() - t))
+    if done:
+        done()
 
 # ===== 경로 상수 =====
 BASE = Path(__file__).resolve().parent
@@ -142,6 +124,15 @@ LOG_ERR = BASE / "sender_stderr.log"
 
 FULLWIDTH_SPACE = "\u3000"
 
+def _temp_zip_path(kind: str) -> str:
+    fd, p = tempfile.mkstemp(prefix=f"muse_{kind}_", suffix=".zip")
+    os.close(fd)
+    return p
+
+def _unlink_quiet(p) -> None:
+    try: Path(p).unlink(missing_ok=True)
+    except Exception: pass
+
 def now_ts() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -155,91 +146,6 @@ def save_status(path: Path, data: dict) -> None:
     path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
 
 # ---------------- 하트 합계 유틸 ----------------
-AFFILIATE_GENERAL_SUBSTRS = ["@ka"]   # '@ka' 포함 시 일반하트 예외
-
-def classify_heart(id_str) -> str:
-    if id_str is None:
-        return "일반하트"
-    s = str(id_str).strip()
-    s = s.replace("＠", "@").lower()
-    if any(sub in s for sub in AFFILIATE_GENERAL_SUBSTRS):
-        return "일반하트"
-    return "제휴하트" if "@" in s else "일반하트"
-
-def sanitize_name(name: str) -> str:
-    return re.sub(r'[\\/*?:\[\]]', "_", str(name))[:31] or "BJ"
-
-def preprocess_single(df: pd.DataFrame) -> pd.DataFrame:
-    df.columns = [str(c).strip() for c in df.columns]
-    col_bj    = next((c for c in df.columns if c == "참여BJ"), None)
-    col_heart = next((c for c in df.columns if c == "후원하트"), None)
-    col_mix   = next((c for c in df.columns if c == "후원 아이디(닉네임)"), None)
-    if not (col_bj and col_heart and col_mix):
-        raise ValueError("필수 컬럼 누락: 참여BJ / 후원하트 / 후원 아이디(닉네임)")
-
-    df[col_bj] = df[col_bj].astype(str).str.strip()
-    df[col_heart] = df[col_heart].astype(str).str.replace(",", "", regex=False)
-    df[col_heart] = pd.to_numeric(df[col_heart], errors="coerce").fillna(0).astype(int)
-    df[col_mix] = df[col_mix].astype(str).str.strip()
-
-    sp = df[col_mix].str.extract(r'^\s*(?P<ID>[^()]+?)(?:\((?P<NICK>.*)\))?\s*$')
-    df["ID"] = sp["ID"].fillna("").str.replace("＠","@",regex=False).str.strip()
-    df["닉네임"] = sp["NICK"].fillna("").apply(normalize_nick)
-
-    base = (
-        df.groupby([col_bj, "ID", "닉네임"], as_index=False)[col_heart]
-          .sum()
-          .rename(columns={col_bj:"참여BJ", col_heart:"후원하트"})
-    )
-    return base
-
-def make_bj_excel_bytes(bj_name: str, sub_df: pd.DataFrame, admin: bool) -> bytes:
-    sub = sub_df.copy()
-    # 예외패턴까지 반영한 제휴판별
-    sub["is_aff"] = sub["ID"].apply(lambda x: classify_heart(x) == "제휴하트")
-    gen = sub[~sub["is_aff"]].sort_values("후원하트", ascending=False)[["ID","닉네임","후원하트"]].copy()
-    aff = sub[ sub["is_aff"]].sort_values("후원하트", ascending=False)[["ID","닉네임","후원하트"]].copy()
-    gsum, asum = int(gen["후원하트"].sum()), int(aff["후원하트"].sum())
-
-    from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-
-    wb = Workbook(); ws = wb.active; ws.title = sanitize_name(bj_name)
-    if admin:
-        ws.append(["", bj_name, gsum+asum, "", ""])
-        ws.append(["ID","닉네임","후원하트","구분","합계"])
-    else:
-        ws.append(["", bj_name, gsum+asum])
-        ws.append(["ID","닉네임","후원하트"])
-    if not gen.empty:
-        if admin:
-            gen2 = gen.copy(); gen2["구분"] = ""; gen2["합계"] = ""
-            rows = gen2.values.tolist(); rows[0][3] = "일반하트"; rows[0][4] = gsum
-        else:
-            rows = gen.values.tolist()
-        for r in rows: ws.append(r)
-    if not aff.empty:
-        if admin:
-            aff2 = aff.copy(); aff2["구분"] = ""; aff2["합계"] = ""
-            rows = aff2.values.tolist(); rows[0][3] = "제휴하트"; rows[0][4] = asum
-        else:
-            rows = aff.values.tolist()
-        for r in rows: ws.append(r)
-
-    for col in ws.columns:
-        letter = get_column_letter(col[0].column)
-        m = 0
-        for cell in col: m = max(m, visual_len(cell.value))
-        ws.column_dimensions[letter].width = max(12, min(m+2, 80))
-    bio = io.BytesIO(); wb.save(bio); bio.seek(0); return bio.getvalue()
-
-def pack_zip(files: dict[str, bytes]) -> bytes:
-    zbio = io.BytesIO()
-    with zipfile.ZipFile(zbio, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for fname, data in files.items():
-            zf.writestr(fname, data)
-    zbio.seek(0); return zbio.getvalue()
-
 # ---------------- DM 발송 (탭2) 유틸 ----------------
 def guess_columns(df: pd.DataFrame) -> Tuple[str,str,str]:
     cols = [str(c).strip() for c in df.columns]
@@ -257,12 +163,14 @@ def guess_columns(df: pd.DataFrame) -> Tuple[str,str,str]:
     return id_col, nick_col, heart_col
 
 def normalize_id_from_mix(x: str) -> str:
+    import pandas as pd
     if pd.isna(x): return ""
     s = str(x).strip()
     m = re.match(r"^\s*([^()]+)", s)
     return (m.group(1) if m else s).strip()
 
 def normalize_nick_from_mix(x: str) -> str:
+    import pandas as pd
     if pd.isna(x): return ""
     s = str(x).strip()
     m = re.search(r"\((.*?)\)", s)
@@ -328,10 +236,17 @@ def save_local_bundle(out_df: pd.DataFrame, base_message: str, panda_id: str, pa
     if panda_id and panda_pw:
         ENV_FILE.write_text(f"PANDA_ID={panda_id}\nPANDA_PW={panda_pw}\n", encoding="utf-8")
 
+def _targets_or_empty(df):
+    # 아직 대상자를 뽑지 않았으면 빈 목록
+    if df is not None:
+        return df
+    import pandas as pd
+    return pd.DataFrame(columns=["후원아이디","닉네임","후원하트"])
+
 # ---------------- GUI ----------------
 class App:
     def copy_vip_to_clipboard(self):
-        if self._vip_df_cache.empty:
+        if self._vip_df_cache is None or self._vip_df_cache.empty:
             messagebox.showwarning("안내", "VIP 대상이 없습니다.")
             return
         text = "\n".join(self._vip_df_cache["후원아이디"].astype(str).tolist())
@@ -340,7 +255,7 @@ class App:
         messagebox.showinfo("완료", f"VIP ID {len(self._vip_df_cache)}명이 클립보드에 복사되었습니다.")
 
     def export_vip_excel(self):
-        if self._vip_df_cache.empty:
+        if self._vip_df_cache is None or self._vip_df_cache.empty:
             messagebox.showwarning("안내", "VIP 대상이 없습니다.")
             return
         out = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile="vip_list.xlsx")
@@ -358,6 +273,9 @@ class App:
         root.title("하트 합계 & 쪽지 발송 (Desktop)  v2025-09-01")
         root.geometry("1200x820")
 
+        self._ui_queue = queue.Queue()
+        self._runner = JobRunner(post=self._post_ui)
+
         nb = ttk.Notebook(root)
         self.tab_sum = ttk.Frame(nb)
         self.tab_dm  = ttk.Frame(nb)
@@ -368,6 +286,7 @@ class App:
         self.build_tab_sum()
         self.build_tab_dm()
         self.tick()
+        self._pump_ui()
 
     # ----- 탭1 -----
     def build_tab_sum(self):
@@ -379,6 +298,7 @@ class App:
         ttk.Button(frm1, text="파일 선택 (CSV/XLSX)", command=self.pick_single).pack(side="left", padx=10, pady=8)
         ttk.Button(frm1, text="관리자용 ZIP 저장", command=self.save_admin_zip).pack(side="left", padx=5)
         ttk.Button(frm1, text="BJ용 ZIP 저장", command=self.save_bj_zip).pack(side="left", padx=5)
+        ttk.Button(frm1, text="⛔ 작업 취소", command=self.cancel_sum_job).pack(side="right", padx=10)
 
         frm2 = ttk.LabelFrame(f, text="여러 파일 총합산 엑셀")
         frm2.pack(fill="x", padx=10, pady=10)
@@ -387,63 +307,97 @@ class App:
         ttk.Label(frm2, textvariable=self.multi_label).pack(anchor="w", padx=10, pady=4)
         ttk.Button(frm2, text="파일 여러 개 선택", command=self.pick_multi).pack(side="left", padx=10, pady=8)
         ttk.Button(frm2, text="총합산 엑셀 저장", command=self.save_master_excel).pack(side="left", padx=5)
+        ttk.Button(frm2, text="📂 폴더 감시", command=self.watch_master_folder).pack(side="left", padx=5)
+        ttk.Label(frm2, text="병렬 작업 수(0=자동)").pack(side="left", padx=(15,3))
+        self.var_workers = StringVar(value="0")
+        ttk.Entry(frm2, textvariable=self.var_workers, width=4).pack(side="left")
+        self.var_stream = StringVar(value="0")
+        ttk.Checkbutton(frm2, text="대용량(스트리밍)", variable=self.var_stream,
+                        onvalue="1", offvalue="0").pack(side="left", padx=(15,0))
+        self.var_dedup = StringVar(value="1")
+        ttk.Checkbutton(frm2, text="중복 행 제거", variable=self.var_dedup,
+                        onvalue="1", offvalue="0").pack(side="left", padx=(10,0))
+        self.var_ledger = StringVar(value="0")
+        ttk.Checkbutton(frm2, text="원장(DB)에 누적", variable=self.var_ledger,
+                        onvalue="1", offvalue="0").pack(side="left", padx=(10,0))
+        self.var_columnar = StringVar(value="0")
+        ttk.Checkbutton(frm2, text="Parquet 함께 저장", variable=self.var_columnar,
+                        onvalue="1", offvalue="0").pack(side="left", padx=(10,0))
+        self.var_catalog = StringVar(value="0")
+        ttk.Checkbutton(frm2, text="회차 목록 사용", variable=self.var_catalog,
+                        onvalue="1", offvalue="0").pack(side="left", padx=(10,0))
+        ttk.Button(frm2, text="🧹 캐시 비우기", command=self.clear_ingest_cache).pack(side="right", padx=10)
+        ttk.Button(frm2, text="🗂 회차 목록 초기화", command=self.reset_round_catalog).pack(side="right")
+
+        frm3 = ttk.LabelFrame(f, text="후원자 검색 (총합산 저장 후, ID 또는 닉네임)")
+        frm3.pack(fill="x", padx=10, pady=(0,10))
+        self._donor_index = None
+        self.var_donor_q = StringVar()
+        ent_q = ttk.Entry(frm3, textvariable=self.var_donor_q, width=40)
+        ent_q.pack(side="left", padx=10, pady=8)
+        ent_q.bind("<Return>", self.search_donor)
+        ttk.Button(frm3, text="🔍 검색", command=self.search_donor).pack(side="left", padx=5)
 
         self.sum_log = Text(f, height=16)
         self.sum_log.pack(fill="both", expand=True, padx=10, pady=10)
         self.log_sum("[안내] 단일 파일은 '참여BJ / 후원하트 / 후원 아이디(닉네임)' 컬럼이 필요합니다.")
         self._single_df = None
-        self._admin_zip_bytes = None
-        self._bj_zip_bytes = None
+        self._admin_zip_path = None
+        self._bj_zip_path = None
+        atexit.register(self._drop_single_zips)
 
     def log_sum(self, msg: str):
         self.sum_log.configure(state=NORMAL); self.sum_log.insert(END, msg.rstrip()+"\n")
         self.sum_log.configure(state=DISABLED); self.sum_log.see(END)
 
     def pick_single(self):
+        if self._runner.busy:
+            self.log_sum("[안내] 진행 중인 작업이 있습니다. 끝나거나 취소한 뒤 다시 시도하세요."); return
         path = filedialog.askopenfilename(filetypes=[("CSV/XLSX","*.csv *.xlsx")])
         if not path: return
         self.single_path.set(path)
-        try:
-            df = read_any_table(Path(path), sheet=None)
-            base = preprocess_single(df)
-            summary = base.groupby("참여BJ", as_index=False)["후원하트"].sum().sort_values("후원하트", ascending=False)
-
-            admin_files, bj_files = {"요약.xlsx": self._to_excel_bytes(summary)}, {"요약.xlsx": self._to_excel_bytes(summary)}
-            for bj in summary["참여BJ"]:
-                sub = base[base["참여BJ"] == bj][["ID","닉네임","후원하트"]]
-                admin_files[f"{sanitize_name(str(bj))}.xlsx"] = make_bj_excel_bytes(str(bj), sub, admin=True)
-                bj_files[f"{sanitize_name(str(bj))}.xlsx"] = make_bj_excel_bytes(str(bj), sub, admin=False)
-            self._admin_zip_bytes = pack_zip(admin_files)
-            self._bj_zip_bytes = pack_zip(bj_files)
-            self._single_df = base
-            self.log_sum(f"[완료] 대상 {len(summary)}명 요약 계산/ZIP 작성 완료.")
-        except Exception as e:
-            messagebox.showerror("오류", str(e))
-
-    def _to_excel_bytes(self, df: pd.DataFrame) -> bytes:
-        from openpyxl import Workbook
-        from openpyxl.utils import get_column_letter
-        wb = Workbook(); ws = wb.active; ws.title = "요약"
-        ws.append(list(df.columns))
-        for _, row in df.iterrows(): ws.append(list(row.values))
-        for col in ws.columns:
-            letter = get_column_letter(col[0].column)
-            m = 0
-            for cell in col: m = max(m, visual_len(cell.value))
-            ws.column_dimensions[letter].width = max(12, min(m+2, 80))
-        bio = io.BytesIO(); wb.save(bio); bio.seek(0); return bio.getvalue()
+        workers = self._ingest_workers()
+        stream = self.var_stream.get() == "1"
 
-    def save_admin_zip(self):
-        if not self._admin_zip_bytes:
+        # 이전 결과는 버리고 새 임시 ZIP 에 바로 기록
+        self._drop_single_zips()
+        admin_zip, bj_zip = _temp_zip_path("admin"), _temp_zip_path("bj")
+
+        def _work(job):
+            from heart_pipeline import build_single
+            try:
+                return build_single(path, admin_zip, bj_zip, workers=workers, job=job, stream=stream)
+            except BaseException:
+                _unlink_quiet(admin_zip); _unlink_quiet(bj_zip)
+                raise
+
+        def _done(res):
+            self._admin_zip_path, self._bj_zip_path = admin_zip, bj_zip
+            self._single_df = res["base"]
+            self.log_sum(f"[완료] 대상 {len(res['summary'])}명 요약 계산/ZIP 작성 완료.")
+
+        self._runner.start(
+            "단일 파일", _work,
+            on_done=_done, on_error=lambda e: messagebox.showerror("오류", str(e)),
+            log=self.log_sum,
+        )
+
+    def _drop_single_zips(self):
+        for p in (self._admin_zip_path, self._bj_zip_path):
+            if p: _unlink_quiet(p)
+        self._admin_zip_path = self._bj_zip_path = None
+
+    def _save_zip_copy(self, src, initialfile: str):
+        if not src or not Path(src).exists():
             messagebox.showwarning("안내", "먼저 단일 파일을 선택해 주세요."); return
-        out = filedialog.asksaveasfilename(defaultextension=".zip", initialfile="BJ별_관리자용.zip")
-        if out: Path(out).write_bytes(self._admin_zip_bytes); self.log_sum(f"[저장] {out}")
+        out = filedialog.asksaveasfilename(defaultextension=".zip", initialfile=initialfile)
+        if out: shutil.copyfile(src, out); self.log_sum(f"[저장] {out}")
+
+    def save_admin_zip(self):
+        self._save_zip_copy(self._admin_zip_path, "BJ별_관리자용.zip")
 
     def save_bj_zip(self):
-        if not self._bj_zip_bytes:
-            messagebox.showwarning("안내", "먼저 단일 파일을 선택해 주세요."); return
-        out = filedialog.asksaveasfilename(defaultextension=".zip", initialfile="BJ별_BJ용.zip")
-        if out: Path(out).write_bytes(self._bj_zip_bytes); self.log_sum(f"[저장] {out}")
+        self._save_zip_copy(self._bj_zip_path, "BJ별_BJ용.zip")
 
     def pick_multi(self):
         paths = filedialog.askopenfilenames(filetypes=[("CSV/XLSX","*.csv *.xlsx")])
@@ -453,271 +407,145 @@ class App:
         self.multi_label.set((names[:120] + ("..." if len(names)>120 else "")))
         self.log_sum(f"[선택] 파일 {len(paths)}개")
 
+    def clear_ingest_cache(self):
+        import heart_cache
+        n, size = heart_cache.clear()
+        self.log_sum(f"[캐시] {n}개 파일 삭제 ({size/1024/1024:.1f} MB)")
+
+    def reset_round_catalog(self):
+        from heart_catalog import CATALOG_NAME, reset_catalog
+        path = filedialog.askopenfilename(title="초기화할 회차 목록 (총합산 출력 폴더)",
+                                          filetypes=[("회차 목록", CATALOG_NAME), ("JSON", "*.json")])
+        if not path:
+            return
+        if not messagebox.askyesno("회차 목록 초기화",
+                                   f"{path}\n\n목록을 지우면 다음 총합산부터 1회차부터 다시 매깁니다. 계속할까요?"):
+            return
+        if reset_catalog(path):
+            self.log_sum(f"[회차] 회차 목록 초기화: {path} (이전 목록은 .bak)")
+
+    def _ingest_workers(self):
+        try:
+            n = int(self.var_workers.get().strip() or "0")
+        except Exception:
+            n = 0
+        return n if n > 0 else None
+
     def save_master_excel(self, *_ev):
-        import time
-        from openpyxl import Workbook
-        from openpyxl.utils import get_column_letter
-        
-        # === 회차 인덱스 매핑 준비 ===
-        round_info = []
-        seen = set()
-        for p in self.multi_paths:
-            fn = Path(p).name
-            ds = extract_date_from_name(fn)  # YYYY-MM-DD
-            if ds in seen:
-                continue
-            seen.add(ds)
-
-            m4 = re.search(r'(\d{4})', fn)
-            if m4:
-                tag = m4.group(1)  # 예: '0804'
-            else:
-                tag = ds[5:].replace('-', '')  # MMDD
+        # 재진입 가드 (작업은 백그라운드에서 실행)
+        if self._runner.busy:
+            self.log_sum("[안내] 진행 중인 작업이 있습니다. 끝나거나 취소한 뒤 다시 시도하세요."); return
+        if not getattr(self, "multi_paths", None):
+            messagebox.showwarning("안내", "먼저 '파일 여러 개 선택'으로 CSV/XLSX 파일을 선택하세요.")
+            return
 
-            try:
-                sort_key = int(tag)
-            except:
-                sort_key = int(ds.replace('-', ''))  # YYYYMMDD fallback
-                tag = ds[5:].replace('-', '')
+        from heart_pipeline import PipelineError, build_master, master_default_name
+        paths = list(self.multi_paths)
+        out = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile=master_default_name(paths))
+        if not out:
+            return
+        workers = self._ingest_workers()
+        stream = self.var_stream.get() == "1"
+        drop_duplicates = self.var_dedup.get() == "1"
+        ledger = None
+        if self.var_ledger.get() == "1":
+            from heart_ledger import LEDGER_PATH
+            ledger = LEDGER_PATH
+        columnar = "parquet" if self.var_columnar.get() == "1" else None
+        catalog = self.var_catalog.get() == "1"
+
+        def _done(res):
+            self.log_sum(f"[저장] 총합산 엑셀 저장: {res['out']}")
+            if res.get("columnar"):
+                self.log_sum(f"[저장] Parquet {len(res['columnar'])}개: {Path(res['columnar'][0]).parent}")
+            self._donor_index = res.get("index")
+            if self._donor_index is not None:
+                self.log_sum(f"[검색] 후원자 {len(self._donor_index):,}명 색인 — 아래 검색창에서 바로 조회할 수 있습니다.")
+            messagebox.showinfo("완료", f"총합산 엑셀 저장 완료:\n{res['out']}")
+
+        def _error(e):
+            if isinstance(e, PermissionError):
+                messagebox.showerror("저장 실패", "엑셀에서 해당 파일이 열려있습니다.\n파일을 닫고 다시 저장하세요.")
+            elif isinstance(e, PipelineError):
+                messagebox.showerror("오류", str(e))
+            else:
+                messagebox.showerror("저장 실패", f"엑셀 저장 중 오류가 발생했습니다:\n{e}")
+
+        self._runner.start(
+            "총합산", lambda job: build_master(paths, out, workers=workers, job=job, stream=stream,
+                                             ledger=ledger, keep_index=True,
+                                             drop_duplicates=drop_duplicates, columnar=columnar,
+                                             catalog=catalog),
+            on_done=_done, on_error=_error, log=self.log_sum,
+        )
+
+    def watch_master_folder(self):
+        # 폴더 감시: 새 파일이 생길 때마다 총합산 엑셀의 바뀐 시트만 다시 씀 (⛔ 작업 취소로 중지)
+        if self._runner.busy:
+            self.log_sum("[안내] 진행 중인 작업이 있습니다. 끝나거나 취소한 뒤 다시 시도하세요."); return
+        folder = filedialog.askdirectory(title="감시할 폴더 (회차 CSV/XLSX 가 저장되는 곳)")
+        if not folder:
+            return
+        from heart_pipeline import PipelineError
+        from heart_watch import watch_folder
+        out = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile="총합산.xlsx")
+        if not out:
+            return
+        workers = self._ingest_workers()
+        drop_duplicates = self.var_dedup.get() == "1"
+        catalog = self.var_catalog.get() == "1"
 
-            round_info.append((sort_key, ds, tag))
+        def _error(e):
+            if isinstance(e, PipelineError):
+                messagebox.showerror("오류", str(e))
+            else:
+                messagebox.showerror("감시 중단", f"폴더 감시 중 오류가 발생했습니다:\n{e}")
 
-        round_info.sort(key=lambda x: x[0])
-        date_to_round = {ds: i+1 for i, (_, ds, _) in enumerate(round_info)}
-        date_to_tag   = {ds: tag for _, ds, tag in round_info}
+        self._runner.start(
+            "폴더 감시", lambda job: watch_folder(folder, out, job=job, workers=workers,
+                                               drop_duplicates=drop_duplicates, catalog=catalog),
+            on_error=_error, log=self.log_sum,
+        )
 
-        # 재진입 가드/디바운스
-        if getattr(self, "_saving_master", False):
+    def search_donor(self, *_ev):
+        if self._donor_index is None:
+            self.log_sum("[안내] 먼저 '총합산 엑셀 저장'을 실행하세요 (그 결과에서 검색합니다).")
+            return
+        q = self.var_donor_q.get().strip()
+        if not q:
             return
-        now = time.time()
-        if now - getattr(self, "_last_save_master_ts", 0) < 0.8:
+        from heart_index import format_hit
+        t0 = time.perf_counter()
+        hits = self._donor_index.search(q)
+        ms = (time.perf_counter() - t0) * 1000
+        if not hits:
+            self.log_sum(f"[검색] '{q}' 결과 없음 ({ms:.0f}ms)")
             return
-        self._saving_master = True
-
-        def _cleanup():
-            self._saving_master = False
-            self._last_save_master_ts = time.time()
-
-        def _auto_width(ws):
-            for col in ws.columns:
-                letter = get_column_letter(col[0].column)
-                m = 0
-                for cell in col:
-                    v = "" if cell.value is None else str(cell.value)
-                    m = max(m, visual_len(v))
-                ws.column_dimensions[letter].width = max(12, min(m + 2, 80))
-
-        def _unique_sheet_name(base: str, used: set[str]) -> str:
-            base = sanitize(str(base))[:31] or "Sheet"
-            name = base
-            i = 2
-            while name in used:
-                suf = f" ({i})"
-                name = base[:31 - len(suf)] + suf
-                i += 1
-            used.add(name)
-            return name
+        self.log_sum(f"[검색] '{q}' → {len(hits)}명 ({ms:.0f}ms)")
+        for h in hits[:5]:
+            self.log_sum(format_hit(h))
+        if len(hits) > 5:
+            self.log_sum("  그 외: " + ", ".join(h.id for h in hits[5:]))
+
+    def cancel_sum_job(self):
+        if self._runner.cancel():
+            self.log_sum("[안내] 취소 요청됨 — 현재 단계가 끝나는 대로 중단합니다.")
+        else:
+            self.log_sum("[안내] 진행 중인 작업이 없습니다.")
+
+    def _post_ui(self, fn):
+        # 작업 스레드 → UI 스레드 전달 (Tk 는 메인 스레드에서만 건드림)
+        self._ui_queue.put(fn)
 
+    def _pump_ui(self):
         try:
-            if not getattr(self, "multi_paths", None):
-                messagebox.showwarning("안내", "먼저 '파일 여러 개 선택'으로 CSV/XLSX 파일을 선택하세요.")
-                _cleanup(); return
-
-            # 1) 파일 읽기 + 전처리 + 파일명 태그 부여
-            self._seen_tags = []  # 최초 등장 순서 체크용(정렬은 아래에서 숫자 오름차순)
-            all_rows, err_files = [], []
-            for p in self.multi_paths:
-                p = Path(p)
-                try:
-                    # 파일명에서 4자리 태그 추출(없으면 MMDD 보정)
-                    m4 = re.search(r'(\d{4})', p.name)
-                    if m4:
-                        tag = m4.group(1)  # 예: '0804'
-                    else:
-                        tag = extract_date_from_name(p.name)[5:].replace('-', '')  # 'MMDD'
-
-                    if tag not in self._seen_tags:
-                        self._seen_tags.append(tag)
-
-                    df_in = read_any_table(p, sheet=None)
-
-                    mix_col = "후원 아이디(닉네임)"
-                    if mix_col not in df_in.columns:
-                        raise ValueError(f"{p.name}: '{mix_col}' 컬럼이 없습니다.")
-
-                    sp = df_in[mix_col].astype(str).str.extract(
-                        r'^\s*(?P<ID>[^()]+?)(?:\((?P<NICK>.*)\))?\s*$'
-                    )
-                    df_in["ID"] = sp["ID"].fillna("").str.replace("＠", "@", regex=False).str.strip()
-                    df_in["닉네임"] = sp["NICK"].fillna("").apply(normalize_nick)
-                    if "참여BJ" in df_in.columns:
-                        df_in["참여BJ"] = df_in["참여BJ"].astype(str).apply(normalize_bj)
-
-                    # 제휴/일반 구분 (예외 포함)
-                    df_in["구분"] = df_in["ID"].apply(classify_heart)
-
-                    # 하트 정수화
-                    if "후원하트" in df_in.columns:
-                        df_in["후원하트"] = (
-                            df_in["후원하트"].astype(str).str.replace(",", "", regex=False)
-                            .pipe(pd.to_numeric, errors="coerce").fillna(0).astype(int)
-                        )
-
-                    # 파일명 태그
-                    df_in["회차태그"] = tag
-
-                    cols = ["회차태그", "후원시간", "참여BJ", "ID", "닉네임", "후원하트", "구분"]
-                    exist_cols = [c for c in cols if c in df_in.columns]
-                    all_rows.append(df_in[exist_cols].copy())
-
-                except Exception as e:
-                    err_files.append(f"{p.name}: {e}")
-
-            if err_files:
-                self.log_sum("[경고] 일부 파일을 건너뜀:\n  - " + "\n  - ".join(err_files))
-            if not all_rows:
-                messagebox.showerror("오류", "처리 가능한 파일이 없습니다.")
-                _cleanup(); return
-
-            merged = pd.concat(all_rows, ignore_index=True)
-
-            # 안전망 정규화
-            if "닉네임" in merged.columns:
-                merged["닉네임"] = merged["닉네임"].apply(normalize_nick)
-            if "참여BJ" in merged.columns:
-                merged["참여BJ"] = merged["참여BJ"].apply(normalize_bj)
-
-            # 2) 회차번호 매핑 (태그 숫자 오름차순)
-            tags_sorted = sorted(getattr(self, "_seen_tags", []), key=lambda x: int(x))
-            tag_to_round = {tag: i + 1 for i, tag in enumerate(tags_sorted)}
-
-            # 3) 요약_일별 (파일명 태그 기준)
-            need = {"회차태그", "참여BJ", "구분", "후원하트"}
-            if not need.issubset(set(merged.columns)):
-                messagebox.showerror("오류", "필수 컬럼(회차태그/참여BJ/구분/후원하트) 부족으로 요약을 만들 수 없습니다.")
-                _cleanup(); return
-
-            piv = (
-                merged.groupby(["회차태그", "참여BJ", "구분"], as_index=False)["후원하트"].sum()
-                      .pivot(index=["회차태그", "참여BJ"], columns="구분", values="후원하트")
-                      .fillna(0)
-                      .reset_index()
-            )
-            for col in ["일반하트", "제휴하트"]:
-                if col not in piv.columns:
-                    piv[col] = 0
-            piv["총합"] = piv["일반하트"] + piv["제휴하트"]
-            piv["회차"] = piv["회차태그"].map(tag_to_round).fillna(0).astype(int)
-            piv = piv[piv["회차"] > 0].sort_values(["회차", "참여BJ"]).reset_index(drop=True)
-
-            df_daily = piv[["회차", "회차태그", "참여BJ", "일반하트", "제휴하트", "총합"]].rename(columns={"회차태그": "태그"})
-            df_daily["회차"] = df_daily["회차"].astype(str) + "회차"
-
-            # 4) 요약_참여BJ_총계
-            merged["참여BJ_정규화"] = merged["참여BJ"].apply(normalize_bj)
-            total_by_bj = (
-                merged.groupby(["참여BJ_정규화", "구분"], as_index=False)["후원하트"].sum()
-                      .pivot(index="참여BJ_정규화", columns="구분", values="후원하트")
-                      .fillna(0)
-                      .reset_index()
-                      .rename(columns={"참여BJ_정규화": "참여BJ"})
-            )
-            for col in ["일반하트", "제휴하트"]:
-                if col not in total_by_bj.columns:
-                    total_by_bj[col] = 0
-            total_by_bj["총합"] = total_by_bj["일반하트"] + total_by_bj["제휴하트"]
-            df_total = total_by_bj[["참여BJ", "일반하트", "제휴하트", "총합"]].copy()
-
-            # 5) 저장 경로
-            # 첫 파일명에서 날짜 문자열만 활용해 기본 파일명 구성 (실제 집계는 태그 기준)
-            default_name = f"총합산_{extract_date_from_name(Path(self.multi_paths[0]).name)}.xlsx"
-            out = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile=default_name)
-            if not out:
-                _cleanup(); return
-
-            # 6) 엑셀 작성
-            wb = Workbook()
-
-            # (A) 요약_일별
-            ws_daily = wb.active; ws_daily.title = "일별"
-            ws_daily.append(list(df_daily.columns))
-            for row in df_daily.itertuples(index=False):
-                ws_daily.append(list(row))
-            _auto_width(ws_daily)
-
-            # (B) 요약_참여BJ_총계
-            ws_total = wb.create_sheet(title="참여BJ_총계")
-            ws_total.append(list(df_total.columns))
-            for row in df_total.sort_values("총합", ascending=False).itertuples(index=False):
-                ws_total.append(list(row))
-            per_round = pd.DataFrame(columns=["회차번호", "후원하트", "회차태그"])  # 안전한 기본값
-            if {"회차태그", "후원하트"}.issubset(merged.columns):
-                per_round = (
-                    merged.groupby("회차태그", as_index=False)["후원하트"].sum()
-                )
-                per_round["회차번호"] = per_round["회차태그"].map(tag_to_round)
-                per_round = per_round.dropna(subset=["회차번호"]).sort_values("회차번호")
-                per_round["회차번호"] = per_round["회차번호"].astype(int)
-
-            if not per_round.empty:
-                ws_total.append([])
-                ws_total.append(["회차별 전체 합계"])
-                ws_total.append(["회차번호", "후원하트", "회차태그"])
-                for r in per_round.to_dict("records"):
-                    ws_total.append([r["회차번호"], int(r["후원하트"]), r["회차태그"]])
-    
-            _auto_width(ws_total)
-
-            # (C) 참여BJ별 상세 + 회차별 합계(태그 기준)
-            merged_sorted = merged.copy()
-            sort_cols = [c for c in ["회차태그", "후원시간"] if c in merged_sorted.columns]
-            if sort_cols:
-                merged_sorted = merged_sorted.sort_values(sort_cols)
-            merged_sorted["BJ_KEY"] = merged_sorted["참여BJ"].apply(normalize_bj)
-
-            used_names = {"요약_일별", "요약_참여BJ_총계"}
-            for bj_key, sub in merged_sorted.groupby("BJ_KEY", dropna=False):
-                bj_key = bj_key if isinstance(bj_key, str) and bj_key.strip() else "미지정BJ"
-
-                gsum = int(sub.loc[sub["구분"] == "일반하트", "후원하트"].sum())
-                asum = int(sub.loc[sub["구분"] == "제휴하트", "후원하트"].sum())
-                tsum = gsum + asum
-
-                sheet_title = _unique_sheet_name(bj_key, used_names)
-                ws = wb.create_sheet(title=sheet_title)
-
-                ws.append([f"총 일반하트={gsum}", f"총 제휴하트={asum}", f"총합={tsum}"])
-
-                cols = ["회차태그", "후원시간", "ID", "닉네임", "후원하트", "구분"]
-                exist_cols = [c for c in cols if c in sub.columns]
-                ws.append(exist_cols)
-                for row in sub[exist_cols].itertuples(index=False):
-                    ws.append(list(row))
-
-                # 하단: 회차별 합계 (파일명 태그 기준)
-                if "회차태그" in sub.columns:
-                    per_round = sub.groupby("회차태그", as_index=False)["후원하트"].sum()
-                    per_round["회차번호"] = per_round["회차태그"].map(tag_to_round).fillna(0).astype(int)
-                    per_round = per_round[per_round["회차번호"] > 0].sort_values("회차번호")
-                    if not per_round.empty:
-                        ws.append([])
-                        ws.append(["회차별 합계"])
-                        ws.append(["회차", "하트합계", "회차태그"])
-                        for _, r in per_round.iterrows():
-                            ws.append([f"{int(r['회차번호'])}회차",int(r["후원하트"]),str(r["회차태그"])])
-
-                _auto_width(ws)
-
-            wb.save(out)
-            self.log_sum(f"[저장] 총합산 엑셀 저장: {out}")
-            messagebox.showinfo("완료", f"총합산 엑셀 저장 완료:\n{out}")
-
-        except PermissionError:
-            messagebox.showerror("저장 실패", "엑셀에서 해당 파일이 열려있습니다.\n파일을 닫고 다시 저장하세요.")
-        except Exception as e:
-            messagebox.showerror("저장 실패", f"엑셀 저장 중 오류가 발생했습니다:\n{e}")
-        finally:
-            _cleanup()
+            while True:
+                fn = self._ui_queue.get_nowait()
+                try: fn()
+                except Exception as e: self.log_sum(f"[오류] {e}")
+        except queue.Empty:
+            pass
+        self.root.after(100, self._pump_ui)
 
     # ----- 탭2 (쪽지 전송: 기존 그대로) -----
     def build_tab_dm(self):
@@ -788,8 +616,9 @@ class App:
         self.log_err = Text(frm_dash, height=6); self.log_err.pack(fill="both", expand=True, padx=8)
 
         self.sender_pid = None
-        self._auto_df_cache = pd.DataFrame(columns=["후원아이디","닉네임","후원하트"])
-        self._vip_df_cache  = pd.DataFrame(columns=["후원아이디","닉네임","후원하트"])
+        # 빈 목록은 None (창 생성 시 pandas 를 불러오지 않도록)
+        self._auto_df_cache = None
+        self._vip_df_cache  = None
 
     def _fill_tree(self, tree: ttk.Treeview, rows: list[tuple]):
         for i in tree.get_children(): tree.delete(i)
@@ -798,6 +627,7 @@ class App:
     def pick_recip_csv(self):
         path = filedialog.askopenfilename(filetypes=[("CSV","*.csv")])
         if not path: return
+        import pandas as pd
         try:
             df = pd.read_csv(path)
         except Exception:
@@ -816,13 +646,14 @@ class App:
         messagebox.showinfo("완료", f"자동발송 {len(auto_df)}명 / VIP {len(vip_df)}명 추출 완료 (미리보기 상위 50명 표시).")
 
     def save_bundle(self):
+        import pandas as pd
         manual = self.txt_manual.get("1.0", END).strip()
         if manual:
             tokens = [t.strip() for t in re.split(r"[,\s]+", manual) if t.strip()]
             tokens = list(dict.fromkeys(tokens))
             out_df = pd.DataFrame({"후원아이디": tokens, "닉네임": ["" for _ in tokens], "후원하트": [1000 for _ in tokens]})
         else:
-            out_df = self._auto_df_cache
+            out_df = _targets_or_empty(self._auto_df_cache)
 
         base_message = self.txt_msg.get("1.0", END).rstrip("\n")
         panda_id = self.var_pid.get().strip()
@@ -838,13 +669,14 @@ class App:
         save_status(STATUS_JSON, st_json)
 
     def preview_messages(self):
+        import pandas as pd
         manual = self.txt_manual.get("1.0", END).strip()
         if manual:
             tokens = [t.strip() for t in re.split(r"[,\s]+", manual) if t.strip()]
             tokens = list(dict.fromkeys(tokens))
             out_df = pd.DataFrame({"후원아이디": tokens, "닉네임": ["" for _ in tokens], "후원하트": [1000 for _ in tokens]})
         else:
-            out_df = self._auto_df_cache
+            out_df = _targets_or_empty(self._auto_df_cache)
 
         base_message = self.txt_msg.get("1.0", END).rstrip("\n")
         msgs = build_messages_with_endspaces(base_message, len(out_df))
@@ -943,8 +775,33 @@ class App:
         self.root.after(1000, self.tick)
 
 # ===== main =====
+def _startup_report(first_window: float) -> int:
+    """--startup-report: 첫 창까지 시간 + 모듈별 import 비용 출력. 예산 초과 시 1 반환."""
+    lines = [f"[시작] 첫 창 표시까지 {first_window:.3f}s (목표 {STARTUP_BUDGET_S:.1f}s)"]
+    lines.append(f"  - {'tkinter (창 전)':<22}{_TK_IMPORT_S:.3f}s")
+    for name, sec in _import_costs:
+        lines.append(f"  - {name + ' (창 후)':<22}{sec:.3f}s")
+    lines.append(f"[시작] 무거운 모듈 로드 완료까지 {time.perf_counter() - _T0:.3f}s")
+    print("\n".join(lines), flush=True)
+    return 0 if first_window <= STARTUP_BUDGET_S else 1
+
+def _on_first_window(root, report: bool):
+    first_window = time.perf_counter() - _T0
+    if not report:
+        threading.Thread(target=_warm_imports, name="warm-imports", daemon=True).start()
+        return
+    # 측정 모드: 모듈을 메인 스레드에서 순서대로 로드해 비용을 재고 종료
+    _warm_imports()
+    code = _startup_report(first_window)
+    root.destroy()
+    sys.exit(code)
+
 if __name__ == "__main__":
+    report = "--startup-report" in sys.argv[1:]
     root = Tk()
     app = App(root)
+    # 첫 화면이 그려진 뒤 (이벤트 루프 진입 직후) 무거운 모듈 로드 시작
+    root.update_idletasks()
+    root.after_idle(lambda: _on_first_window(root, report))
     root.mainloop()
 
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+heart_bench.py
+- 탭1 집계 단계별 벤치마크 (heart_synth 로 만든 가짜 내역 사용)
+    * read_any_table      : CSV 1개 읽기 (인코딩/구분자 판정 포함)
+    * preprocess_single   : 단일 파일 전처리 (BJ/ID/닉네임별 합계)
+    * make_bj_excel_bytes : BJ별 관리자용+BJ용 워크북 (순차, 전체 BJ)
+    * build_single        : 단일 파일 → ZIP 2개 (전체 경로)
+    * build_master        : 회차 파일 여러 개 → 총합산 엑셀 (캐시 없이)
+- 크기마다 단계별 소요 시간, 처리량(행/초), 최대 메모리(tracemalloc) 출력
+- 실행 예:
+    python heart_bench.py --sizes 10k,100k,1M
+    python heart_bench.py --sizes 100k --stages build_master --json bench.json
+- 메모리는 tracemalloc 으로 한 번 더 실행해 측정 (추적 부담이 시간에 섞이지 않게),
+  시간만 볼 때는 --no-mem
+- 워커 프로세스 메모리는 잡히지 않음 (기본 --workers 1 로 단계 간 비교 가능하게)
+- --memory-report: 회차 파일을 합친 프레임의 열별 메모리 (범주형 vs 문자열 그대로)
+    python heart_bench.py --sizes 1M --files 30 --stages build_master --memory-report
+"""
+
+import gc
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from heart_synth import parse_count, make_population, generate_files
+
+STAGES = ["read_any_table", "preprocess_single", "make_bj_excel_bytes", "build_single", "build_master"]
+
+
+def measure(stage: str, rows: int, fn: Callable[[], object], trace_mem: bool = True):
+    """
+    fn() 실행 후 (결과, 기록 dict) 반환.
+    시간은 추적 없이 잰 첫 실행 기준, 메모리는 tracemalloc 을 켠 두 번째 실행의 최대값.
+    """
+    gc.collect()
+    t0 = time.perf_counter()
+    res = fn()
+    sec = time.perf_counter() - t0
+    rec = {"stage": stage, "rows": rows, "seconds": round(sec, 4),
+           "rows_per_s": round(rows / sec) if sec > 0 else None, "peak_mb": None}
+    if trace_mem:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            rec["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return res, rec
+
+def bench_size(rows: int, work: Path, stages: List[str], workers: int, files: int,
+               bjs: int, donors: int, encoding: str, trace_mem: bool,
+               memory_report: bool = False, on_record: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    from heart_ingest import read_any_table, preprocess_single
+    from heart_export import make_bj_excel_bytes
+    from heart_pipeline import build_single, build_master
+
+    pop = make_population(bjs=bjs, donors=donors)
+    single = generate_files(work / "single", files=1, rows=rows, encoding=encoding, pop=pop)[0]
+    records = []
+    want = set(stages)
+
+    def _run(stage, n, fn):
+        # 선택하지 않은 단계도 뒤 단계 준비용이면 실행만 하고 기록하지 않음
+        if stage not in want:
+            return fn()
+        res, rec = measure(stage, n, fn, trace_mem)
+        records.append(rec)
+        if on_record:
+            on_record(rec)
+        return res
+
+    if want & {"read_any_table", "preprocess_single", "make_bj_excel_bytes"}:
+        df = _run("read_any_table", rows, lambda: read_any_table(single))
+        if want & {"preprocess_single", "make_bj_excel_bytes"}:
+            base = _run("preprocess_single", rows, lambda: preprocess_single(df.copy()))
+        if "make_bj_excel_bytes" in want:
+            def _all_bjs():
+                for bj, sub in base.groupby("참여BJ", sort=False):
+                    make_bj_excel_bytes(bj, sub, admin=True)
+                    make_bj_excel_bytes(bj, sub, admin=False)
+            _run("make_bj_excel_bytes", len(base), _all_bjs)
+        df = base = None
+
+    if "build_single" in want:
+        _run("build_single", rows, lambda: build_single(
+            single, work / "admin.zip", work / "bj.zip", workers=workers))
+    if "build_master" in want or memory_report:
+        paths = generate_files(work / "master", files=files, rows=rows, encoding=encoding, pop=pop)
+    if "build_master" in want:
+        _run("build_master", rows, lambda: build_master(
+            paths, work / "master.xlsx", workers=workers, use_cache=False))
+    if memory_report:
+        import heart_engine
+        merged = heart_engine.normalize(heart_engine.ingest(paths, workers=workers, use_cache=False).frames)
+        print(f"[메모리] {rows:,}행 / 회차 파일 {files}개 합친 프레임")
+        print(heart_engine.format_memory_report(heart_engine.memory_report(merged)), flush=True)
+    return records
+
+def format_record(rec: Dict) -> str:
+    rps = f"{rec['rows_per_s']:>12,}" if rec["rows_per_s"] else f"{'-':>12}"
+    mem = f"{rec['peak_mb']:>9,.1f}" if rec["peak_mb"] is not None else f"{'-':>9}"
+    return f"{rec['rows']:>10,}  {rec['stage']:<20}{rec['seconds']:>9.3f}s {rps} 행/s {mem} MB"
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="heart_bench.py", description="탭1 집계 단계별 벤치마크")
+    ap.add_argument("--sizes", default="10k,100k,1M", help="행 수 목록 (쉼표 구분)")
+    ap.add_argument("--stages", default=",".join(STAGES), help="실행할 단계 (쉼표 구분)")
+    ap.add_argument("--workers", type=int, default=1, help="병렬 작업 수 (1=순차)")
+    ap.add_argument("--files", type=int, default=4, help="build_master 회차 파일 수")
+    ap.add_argument("--bjs", type=int, default=30)
+    ap.add_argument("--donors", default="20k")
+    ap.add_argument("--encoding", default="utf-8-sig", choices=["utf-8-sig", "utf-8", "cp949"])
+    ap.add_argument("--no-mem", action="store_true", help="최대 메모리 측정 끄기 (시간만)")
+    ap.add_argument("--memory-report", action="store_true", help="합친 총합산 프레임의 열별 메모리 출력")
+    ap.add_argument("--json", help="결과를 JSON 파일로 저장")
+    ap.add_argument("--keep", help="생성한 데이터/결과를 이 폴더에 남김")
+    return ap
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"알 수 없는 단계: {', '.join(unknown)} (가능: {', '.join(STAGES)})", file=sys.stderr)
+        return 2
+    sizes = [parse_count(s) for s in args.sizes.split(",") if s.strip()]
+    trace_mem = not args.no_mem
+
+    root = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="muse_bench_"))
+    print(f"{'행 수':>9}  {'단계':<18}{'시간':>10} {'처리량':>13} {'최대 메모리':>12}", flush=True)
+    results = []
+    try:
+        for n in sizes:
+            work = root / f"rows_{n}"
+            work.mkdir(parents=True, exist_ok=True)
+            results += bench_size(n, work, stages, args.workers, args.files, args.bjs,
+                                  parse_count(args.donors), args.encoding, trace_mem,
+                                  memory_report=args.memory_report, on_record=lambda r: print(format_record(r), flush=True))
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    if args.json:
+        Path(args.json).write_text(json.dumps(
+            {"workers": args.workers, "encoding": args.encoding, "results": results},
+            ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+heart_cache.py
+- 전처리된 파일 단위 프레임의 디스크 캐시 (총합산 반복 실행 가속)
+- 키: 파일 내용 해시 + 정규화 규칙 버전 + 하트 구분 규칙 표 해시 + 회차태그 (+ 캐시 포맷 버전)
+- 저장 형식: Feather(Arrow) — pyarrow 가 없으면 캐시를 쓰지 않음 (available)
+    * 앱 폴더의 파일을 pickle 로 풀지 않기 위해 pickle 대체 저장은 두지 않는다
+- 용량 상한 초과 시 가장 오래 쓰지 않은 항목부터 삭제 (mtime 을 접근 시각으로 사용)
+"""
+
+import os
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from heart_norm import NORM_RULES_VERSION, rules_signature
+from heart_paths import APP_DIR
+
+CACHE_DIR = APP_DIR / "ingest_cache"
+CACHE_FORMAT = 3
+CACHE_MB_ENV = "MUSE_CACHE_MB"
+CACHE_MB_DEFAULT = 512
+
+_EXTS = (".feather", ".pkl")   # .pkl: 예전 형식 — 읽지 않고 evict/clear 로 정리만
+
+
+def file_digest(path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for buf in iter(lambda: f.read(chunk), b""):
+            h.update(buf)
+    return h.hexdigest()
+
+def cache_key(digest: str, tag: str, stream: bool = False) -> str:
+    raw = f"{digest}|rules={NORM_RULES_VERSION}|heart={rules_signature()}|tag={tag}|fmt={CACHE_FORMAT}"
+    if stream:
+        raw += "|stream"   # 스트리밍 결과는 합계 프레임이라 따로 저장
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40]
+
+def available() -> bool:
+    """캐시 사용 가능 여부 (pyarrow 설치)."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+def load(key: str, cache_dir: Path = CACHE_DIR) -> Optional[pd.DataFrame]:
+    p = cache_dir / f"{key}.feather"
+    if not p.exists():
+        return None
+    try:
+        df = pd.read_feather(p)
+    except Exception:
+        # 깨진 항목은 지우고 다시 만들게 둔다
+        try: p.unlink()
+        except Exception: pass
+        return None
+    try: os.utime(p)  # LRU 갱신
+    except Exception: pass
+    return df
+
+def store(key: str, df: pd.DataFrame, cache_dir: Path = CACHE_DIR) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    df = df.reset_index(drop=True)
+    # 임시 파일에 쓴 뒤 교체 (여러 워커가 동시에 써도 안전)
+    dst = cache_dir / f"{key}.feather"
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    try:
+        df.to_feather(tmp)
+        os.replace(tmp, dst)
+    except Exception:
+        try: tmp.unlink()
+        except Exception: pass
+        raise
+
+def _entries(cache_dir: Path):
+    if not cache_dir.exists():
+        return []
+    return [p for p in cache_dir.iterdir() if p.is_file() and p.suffix in _EXTS]
+
+def max_bytes() -> int:
+    env = os.environ.get(CACHE_MB_ENV, "").strip()
+    mb = int(env) if env.isdigit() else CACHE_MB_DEFAULT
+    return mb * 1024 * 1024
+
+def evict(limit: Optional[int] = None, cache_dir: Path = CACHE_DIR) -> int:
+    """용량 상한까지 오래된 항목부터 삭제. 삭제한 개수 반환."""
+    limit = max_bytes() if limit is None else limit
+    items = []
+    for p in _entries(cache_dir):
+        try:
+            st = p.stat(); items.append((st.st_mtime, st.st_size, p))
+        except Exception:
+            pass
+    total = sum(sz for _, sz, _ in items)
+    removed = 0
+    for _, sz, p in sorted(items):
+        if total <= limit:
+            break
+        try:
+            p.unlink(); total -= sz; removed += 1
+        except Exception:
+            pass
+    return removed
+
+def stats(cache_dir: Path = CACHE_DIR) -> Tuple[int, int]:
+    """(항목 수, 총 바이트)"""
+    items = _entries(cache_dir)
+    return len(items), sum(p.stat().st_size for p in items)
+
+def clear(cache_dir: Path = CACHE_DIR) -> Tuple[int, int]:
+    """캐시 전체 삭제. (삭제 개수, 해제 바이트) 반환."""
+    n, size = 0, 0
+    if not cache_dir.exists():
+        return n, size
+    for p in cache_dir.iterdir():
+        if not p.is_file():
+            continue
+        try:
+            sz = p.stat().st_size; p.unlink(); n += 1; size += sz
+        except Exception:
+            pass
+    return n, size
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+heart_catalog.py
+- 회차 목록(manifest): 총합산 출력 폴더의 heart_rounds.json
+- 항목 하나 = 파일 하나: 내용 해시 → 회차태그 / 날짜 / 회차 번호 / 행 수 (+ 파일명, 추가 시각)
+- 회차 번호는 목록 안 회차태그의 숫자 오름차순 (1부터) — 실행마다 파일명을 다시 훑지 않고 조회만
+    * 처음 보는 파일만 항목 추가 (파일명 → 태그/날짜 해석은 그때 한 번)
+    * 새 태그가 마지막 태그 뒤면 기존 번호는 그대로, 중간 날짜가 늦게 들어오면 뒤 번호를 한 칸씩 민다
+- 같은 파일(해시 + 회차태그)은 한 번만, 같은 태그의 다른 파일(다시 받은 내보내기)은 같은 회차
+- 켜야만 씀 (build_master(catalog=...) / --catalog / 탭1 '회차 목록 사용'), 초기화는 reset_catalog
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+CATALOG_NAME = "heart_rounds.json"
+CATALOG_VERSION = 1
+
+
+class RoundEntry(NamedTuple):
+    digest: str
+    tag: str
+    date: str                    # YYYY-MM-DD (파일명 기준, 처음 추가할 때 고정)
+    round: int
+    rows: int                    # 전처리 후 행 수 (summed 면 합계 행 수)
+    summed: bool = False         # 스트리밍 합계 프레임으로 센 행 수
+    name: str = ""
+    added_at: str = ""
+
+
+def catalog_path(out) -> Path:
+    """총합산 엑셀 경로 → 같은 폴더의 회차 목록 경로."""
+    return Path(out).parent / CATALOG_NAME
+
+def reset_catalog(path) -> bool:
+    """회차 목록 초기화 (다음 실행부터 1회차부터 다시). 지운 목록은 .bak 으로 남김. 반환: 목록이 있었는지."""
+    path = Path(path)
+    if not path.exists():
+        return False
+    path.replace(path.with_name(path.name + ".bak"))
+    return True
+
+def _tag_order(tag: str) -> int:
+    return int(tag)
+
+
+class RoundCatalog:
+    def __init__(self, path, entries: Optional[List[RoundEntry]] = None):
+        self.path = Path(path)
+        self.entries: List[RoundEntry] = list(entries or [])
+        self._by_key = {(e.digest, e.tag): i for i, e in enumerate(self.entries)}
+        self._rounds = {e.tag: e.round for e in self.entries}
+        self.dirty = False
+        self._broken = False
+
+    @classmethod
+    def load(cls, path) -> "RoundCatalog":
+        """목록 읽기 (없거나 깨졌으면 빈 목록 — 깨진 파일은 다음 저장 때 .bak 으로 옮기고 새로 씀)."""
+        path = Path(path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if raw.get("version") != CATALOG_VERSION:
+                raise ValueError(raw.get("version"))
+            entries = [RoundEntry(**e) for e in raw["files"]]
+        except FileNotFoundError:
+            return cls(path)
+        except Exception:
+            cat = cls(path)
+            cat.dirty = cat._broken = True
+            return cat
+        return cls(path, entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(self, digest: str, tag: str) -> Optional[RoundEntry]:
+        i = self._by_key.get((digest, tag))
+        return None if i is None else self.entries[i]
+
+    def rounds(self) -> Dict[str, int]:
+        """회차태그 → 회차 번호."""
+        return dict(self._rounds)
+
+    def add(self, digest: str, tag: str, rows: int, name: str = "",
+            summed: bool = False) -> RoundEntry:
+        """
+        파일 하나 등록 (이미 있으면 그 항목). 합계 행 수만 있던 항목을 행 단위로 다시 읽었으면 행 수만 갱신.
+        """
+        i = self._by_key.get((digest, tag))
+        if i is not None:
+            old = self.entries[i]
+            if old.summed and not summed:
+                self.entries[i] = old._replace(rows=int(rows), summed=False)
+                self.dirty = True
+            return self.entries[i]
+
+        if tag not in self._rounds:
+            self._insert_tag(tag)
+        from heart_ingest import extract_date_from_name
+        entry = RoundEntry(digest, tag, extract_date_from_name(name or tag), self._rounds[tag],
+                           int(rows), bool(summed), name,
+                           datetime.now().isoformat(timespec="seconds"))
+        self._by_key[(digest, tag)] = len(self.entries)
+        self.entries.append(entry)
+        self.dirty = True
+        return entry
+
+    def _insert_tag(self, tag: str) -> None:
+        later = [t for t in self._rounds if _tag_order(t) > _tag_order(tag)]
+        if not later:
+            self._rounds[tag] = len(self._rounds) + 1
+            return
+        # 중간 날짜: 그 뒤 태그 번호를 한 칸씩
+        self._rounds[tag] = min(self._rounds[t] for t in later)
+        for t in later:
+            self._rounds[t] += 1
+        self.entries = [e._replace(round=self._rounds[e.tag]) for e in self.entries]
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._broken and self.path.exists():
+            self.path.replace(self.path.with_name(self.path.name + ".bak"))
+            self._broken = False
+        raw = {"version": CATALOG_VERSION, "files": [e._asdict() for e in self.entries]}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(raw, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(self.path)
+        self.dirty = False
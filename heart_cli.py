@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+heart_cli.py
+- 탭1 집계를 GUI(tkinter) 없이 실행하는 명령줄 모드
+- 실행 예:
+    python desktop_app.py aggregate --single 0804.csv 0805.csv --out out/
+    python desktop_app.py aggregate --master "data/*.csv" --out 총합산.xlsx
+    python desktop_app.py aggregate --master "data/*.csv" --out 총합산.xlsx --columnar parquet
+    python desktop_app.py aggregate --watch data/ --out 총합산.xlsx --interval 5
+- 파일 인자는 glob 패턴 허용 (Windows 셸처럼 확장을 안 해 줘도 동작)
+- 결과는 실행 단위마다 stdout 에 JSON 한 줄, 진행 로그는 stderr (--watch 는 반영할 때마다 한 줄, Ctrl+C 로 종료)
+- 종료 코드: 0 성공 / 1 실패 / 2 인자 오류·입력 없음 / 3 완료했으나 일부 파일 건너뜀
+"""
+
+import sys
+import glob
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List
+
+EXIT_OK, EXIT_FAIL, EXIT_USAGE, EXIT_PARTIAL = 0, 1, 2, 3
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """glob 확장 + 중복 제거 (입력 순서 유지). 패턴마다 매칭은 이름순."""
+    out, seen = [], set()
+    for pat in patterns:
+        hits = sorted(glob.glob(pat)) if glob.has_magic(pat) else [pat]
+        for h in hits:
+            p = Path(h)
+            if p.is_file() and p.resolve() not in seen:
+                seen.add(p.resolve()); out.append(p)
+    return out
+
+def _emit(record: dict) -> None:
+    print(json.dumps(record, ensure_ascii=False), flush=True)
+
+def _make_job(quiet: bool):
+    from heart_jobs import Job
+    return Job("cli", log=None if quiet else (lambda m: print(m, file=sys.stderr, flush=True)))
+
+def output_stems(files: List[Path]) -> List[str]:
+    """
+    입력 파일 → ZIP 이름 앞부분. 이름이 겹치면 (a/후원.csv 와 b/후원.csv, 후원.csv 와 후원.xlsx)
+    뒤 파일에 ' (2)', ' (3)' … 을 붙여 서로 덮어쓰지 않게 (대소문자 무시 — Windows 파일 시스템).
+    """
+    used, stems = set(), []
+    for f in files:
+        stem, i = f.stem, 2
+        while stem.casefold() in used:
+            stem = f"{f.stem} ({i})"
+            i += 1
+        used.add(stem.casefold())
+        stems.append(stem)
+    return stems
+
+def _file_sig(p: Path):
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+def run_single(files: List[Path], out_dir: Path, workers, quiet: bool, stream: bool = False) -> int:
+    from heart_pipeline import build_single
+    out_dir.mkdir(parents=True, exist_ok=True)
+    code = EXIT_OK
+    for f, stem in zip(files, output_stems(files)):
+        t0 = time.perf_counter()
+        admin_zip = out_dir / f"{stem}_BJ별_관리자용.zip"
+        bj_zip = out_dir / f"{stem}_BJ별_BJ용.zip"
+        before = {p: _file_sig(p) for p in (admin_zip, bj_zip)}
+        try:
+            res = build_single(f, admin_zip, bj_zip, workers=workers, job=_make_job(quiet),
+                               stream=stream)
+        except Exception as e:
+            # 이번 호출이 쓰기 시작한 ZIP 만 지움 (쓰기 전에 실패했으면 이전 실행 결과는 그대로)
+            for p, sig in before.items():
+                if _file_sig(p) != sig:
+                    p.unlink(missing_ok=True)
+            _emit({"mode": "single", "input": str(f), "ok": False, "error": str(e),
+                   "seconds": round(time.perf_counter() - t0, 3)})
+            code = EXIT_FAIL
+            continue
+        _emit({
+            "mode": "single", "input": str(f), "ok": True,
+            "admin_zip": str(admin_zip), "bj_zip": str(bj_zip),
+            "rows": res["rows"], "donor_rows": len(res["base"]), "bjs": res["bj_count"],
+            "encoding": res["encoding"], "sep": res["sep"],
+            "seconds": round(time.perf_counter() - t0, 3),
+        })
+    return code
+
+def run_master(files: List[Path], out: Path, workers, quiet: bool, use_cache: bool,
+               stream: bool = False, ledger=None, drop_duplicates: bool = True,
+               columnar=None, catalog=False) -> int:
+    from heart_pipeline import build_master, master_default_name
+    if out.is_dir():
+        out = out / master_default_name(files)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        res = build_master(files, out, workers=workers, job=_make_job(quiet), use_cache=use_cache,
+                           stream=stream, ledger=ledger, drop_duplicates=drop_duplicates,
+                           columnar=columnar, catalog=catalog)
+    except Exception as e:
+        _emit({"mode": "master", "inputs": len(files), "ok": False, "error": str(e),
+               "seconds": round(time.perf_counter() - t0, 3)})
+        return EXIT_FAIL
+    record = {
+        "mode": "master", "inputs": len(files), "ok": True, "out": res["out"],
+        "rows": res["rows"], "sheets": res["sheets"],
+        "cached": res["cached"], "parsed": res["parsed"], "skipped": res["errors"],
+        "duplicates": res["duplicates"],
+    }
+    if "columnar" in res:
+        record["columnar"] = res["columnar"]
+    record["seconds"] = round(time.perf_counter() - t0, 3)
+    _emit(record)
+    return EXIT_PARTIAL if res["errors"] else EXIT_OK
+
+def run_watch(folder: Path, out: Path, interval: float, workers, quiet: bool, use_cache: bool,
+              drop_duplicates: bool = True, catalog=False) -> int:
+    from heart_pipeline import PipelineError
+    from heart_watch import watch_folder
+
+    def _update(res):
+        _emit({"mode": "watch", "ok": True, "out": res["out"], "files": res["files"],
+               "rows": res["rows"], "added": res["added"], "written": res["written"],
+               "sheets": res["sheets"], "skipped": res["errors"],
+               "duplicates": res["duplicates"], "seconds": res["seconds"]})
+    try:
+        watch_folder(folder, out, interval, job=_make_job(quiet), workers=workers,
+                     use_cache=use_cache, drop_duplicates=drop_duplicates, catalog=catalog,
+                     on_update=_update)
+    except KeyboardInterrupt:
+        return EXIT_OK
+    except PipelineError as e:
+        _emit({"mode": "watch", "ok": False, "error": str(e)})
+        return EXIT_USAGE
+    return EXIT_OK
+
+# 모드마다 함께 쓸 수 없는 옵션 (argparse dest 이름) — 조용히 무시하지 않고 인자 오류로
+_NOT_FOR_MODE = {
+    "single": ["no_cache", "keep_duplicates", "ledger", "columnar", "catalog", "interval"],
+    "master": ["interval"],
+    "watch": ["stream", "ledger", "columnar"],
+}
+
+def check_args(ap: argparse.ArgumentParser, args) -> None:
+    """지원하지 않는 옵션 조합이면 ap.error (종료 코드 2)."""
+    mode = next(m for m in _NOT_FOR_MODE if getattr(args, m))
+    bad = [f"--{d.replace('_', '-')}" for d in _NOT_FOR_MODE[mode]
+           if getattr(args, d) not in (None, False)]
+    if bad:
+        ap.error(f"--{mode} 에서는 쓸 수 없는 옵션: {', '.join(bad)}")
+    if mode == "master" and args.stream and not args.keep_duplicates:
+        # 스트리밍 합계 행에는 후원시간이 없어 중복 제거가 아무것도 지우지 못한다
+        ap.error("--master --stream 은 중복 행을 지울 수 없습니다: --keep-duplicates 를 같이 주세요")
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="desktop_app.py aggregate",
+        description="하트 합계 집계를 GUI 없이 실행",
+        epilog="종료 코드: 0 성공 / 1 실패 / 2 인자 오류·입력 없음 / 3 일부 파일 건너뜀",
+    )
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--single", nargs="+", metavar="FILE",
+                      help="파일마다 관리자용/BJ용 ZIP 생성 (--out 은 폴더)")
+    mode.add_argument("--master", nargs="+", metavar="FILE",
+                      help="모든 파일을 합산한 총합산 엑셀 생성 (--out 은 .xlsx 또는 폴더)")
+    mode.add_argument("--watch", metavar="DIR",
+                      help="폴더를 감시해 새 파일이 생길 때마다 총합산 엑셀 갱신 (바뀐 시트만 다시 씀, Ctrl+C 로 종료)")
+    ap.add_argument("--out", required=True, help="출력 폴더 또는 파일")
+    ap.add_argument("--workers", type=int, default=0, help="병렬 작업 수 (0=자동)")
+    ap.add_argument("--interval", type=float, default=None, metavar="SEC",
+                    help="폴더 확인 간격(초) (--watch, 기본 5)")
+    ap.add_argument("--no-cache", action="store_true", help="전처리 캐시 사용 안 함 (--master/--watch)")
+    ap.add_argument("--stream", action="store_true",
+                    help="CSV 를 덩어리로 읽어 합계만 유지 (대용량, --master 는 BJ 시트가 후원자별 합계)")
+    ap.add_argument("--keep-duplicates", action="store_true",
+                    help="겹치는 파일 사이 중복 행을 지우지 않음 (--master/--watch)")
+    ap.add_argument("--ledger", nargs="?", const="", default=None, metavar="DB",
+                    help="읽은 파일을 후원 원장(SQLite)에 누적 (--master, 경로 생략 시 앱 폴더의 heart_ledger.sqlite3)")
+    ap.add_argument("--columnar", choices=["parquet", "arrow"], default=None,
+                    help="엑셀에 더해 합친 행 + 요약표를 열 지향 파일로 저장 (--master, 엑셀 옆 '<이름>_data' 폴더, pyarrow 필요)")
+    ap.add_argument("--catalog", nargs="?", const="", default=None, metavar="FILE",
+                    help="회차 번호를 회차 목록에서 조회·누적 (--master/--watch, 경로 생략 시 출력 폴더의 heart_rounds.json, "
+                         "안 주면 이번에 고른 파일의 태그 순서로 1회차부터)")
+    ap.add_argument("--quiet", action="store_true", help="진행 로그(stderr) 끄기")
+    return ap
+
+def main(argv: List[str]) -> int:
+    ap = build_parser()
+    try:
+        args = ap.parse_args(argv)
+        check_args(ap, args)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+    workers = args.workers if args.workers > 0 else None
+    catalog = False if args.catalog is None else (Path(args.catalog) if args.catalog else True)
+    if args.watch:
+        interval = 5.0 if args.interval is None else max(args.interval, 0.5)
+        return run_watch(Path(args.watch), Path(args.out), interval, workers,
+                         args.quiet, not args.no_cache, not args.keep_duplicates, catalog)
+    files = expand_inputs(args.single or args.master)
+    if not files:
+        print("입력 파일이 없습니다.", file=sys.stderr)
+        return EXIT_USAGE
+    if args.single:
+        return run_single(files, Path(args.out), workers, args.quiet, args.stream)
+    out = Path(args.out)
+    if args.out.endswith(("/", "\\")):   # Path 가 끝 구분자를 지우므로 여기서 폴더로 만들어 둔다
+        out.mkdir(parents=True, exist_ok=True)
+    ledger = args.ledger
+    if ledger == "":
+        from heart_ledger import LEDGER_PATH
+        ledger = LEDGER_PATH
+    return run_master(files, out, workers, args.quiet, not args.no_cache, args.stream, ledger,
+                      not args.keep_duplicates, args.columnar, catalog)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
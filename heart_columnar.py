@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+heart_columnar.py
+- 총합산 합친 프레임 + 요약표를 열 지향 파일로 저장 (엑셀 옆 '<이름>_data' 폴더)
+    * parquet : 압축(zstd), 다른 도구(DuckDB/Polars/Spark)에서 바로 읽기
+    * arrow   : Arrow IPC 비압축 — 메모리 매핑으로 복사 없이 다시 열기
+- 범주형 키 열은 사전 인코딩(dictionary) 그대로 저장, 엑셀 시트 행 수 한도 없음
+- pyarrow 는 이 기능을 쓸 때만 import (없으면 설치 안내 오류)
+- 파일: rows(후원 행 전체) / daily(일별) / total(참여BJ_총계) / per_round(회차별 전체 합계)
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+class ColumnarUnavailable(RuntimeError):
+    """pyarrow 가 설치되지 않아 열 지향 저장을 할 수 없음."""
+
+
+def require_arrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ColumnarUnavailable(
+            "Parquet/Arrow 저장에는 pyarrow 가 필요합니다: pip install pyarrow") from None
+
+def data_dir(out) -> Path:
+    """엑셀 경로 옆 데이터 폴더 ('총합산_2025-08-04.xlsx' → '총합산_2025-08-04_data')."""
+    out = Path(out)
+    return out.with_name(f"{out.stem}_data")
+
+def _write(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    df = df.reset_index(drop=True).rename_axis(columns=None)   # 피벗 열 이름(구분) 제거
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False, compression="zstd")
+    else:
+        df.to_feather(tmp, compression="uncompressed")   # 메모리 매핑 가능하게
+    tmp.replace(path)
+
+def write_tables(tables: Dict[str, pd.DataFrame], dest, fmt: str = "parquet") -> List[Path]:
+    """이름 → 프레임 을 dest 폴더에 저장. 반환: 저장한 파일 경로 (tables 순서)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (가능: {', '.join(FORMATS)})")
+    require_arrow()
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, df in tables.items():
+        p = dest / f"{name}{FORMATS[fmt]}"
+        _write(df, p, fmt)
+        paths.append(p)
+    return paths
+
+def read_table(path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """저장한 표 다시 읽기 (arrow 는 메모리 매핑, parquet 은 필요한 열만)."""
+    pa = require_arrow()
+    path = Path(path)
+    if path.suffix == FORMATS["arrow"]:
+        import pyarrow.ipc
+        with pa.memory_map(str(path)) as src:
+            table = pyarrow.ipc.open_file(src).read_all()
+        if columns:
+            table = table.select(columns)
+        return table.to_pandas()
+    return pd.read_parquet(path, columns=columns)
+
+def read_rows(dest, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """데이터 폴더의 rows 표 (형식은 있는 파일로 판단)."""
+    for ext in FORMATS.values():
+        p = Path(dest) / f"rows{ext}"
+        if p.exists():
+            return read_table(p, columns)
+    raise FileNotFoundError(f"rows 표가 없습니다: {dest}")
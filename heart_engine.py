@@ -0,0 +1,586 @@
+# -*- coding: utf-8 -*-
+"""
+heart_engine.py
+- 총합산 집계 엔진 (GUI/CLI/벤치마크 공용, tkinter 의존 없음)
+- 단계: ingest → normalize → dedup → assign_rounds → resolve → aggregate → render
+    * 각 단계는 DataFrame / dict / list 를 받고 돌려준다 (다음 단계 입력으로 그대로)
+    * run_master 가 순서대로 호출, 단계 앞뒤로 훅(start/end) 호출
+    * ledger 를 주면 ingest 뒤에 "ledger" 단계 (heart_ledger 원장에 파일별 행 추가,
+      aggregate 의 합계표는 원장 질의로)
+    * keep_index=True 면 aggregate 뒤에 "index" 단계 (heart_index 후원자 역색인, 결과의 "index")
+    * catalog 를 주면 assign_rounds 는 회차 목록(heart_catalog) 조회 + 새 파일만 추가
+    * columnar 를 주면 render 앞에 "columnar" 단계 (heart_columnar, 엑셀 옆 '<이름>_data' 폴더)
+- render_partial: 바뀐 시트만 다시 그리고 나머지는 기존 엑셀에서 옮김 (heart_watch 폴더 감시)
+- 훅: start(stage) / end(stage, info) 두 메서드를 가진 객체 (StageRecorder 참고)
+- 합친 프레임의 키 열은 범주형 (파일별 범주를 합친 공용 사전), 집계는 observed=True 로
+  등장한 조합만, 작은 집계 결과에서만 문자열로 되돌린다
+"""
+
+import io
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from heart_ingest import file_tag, ingest_files, compact_frame
+from xlsx_writer import column_widths, new_workbook, splice_sheets, write_sheet
+
+STAGES = ["ingest", "normalize", "dedup", "assign_rounds", "resolve", "aggregate", "render"]
+
+BJ_HEAD_ROWS = 2   # BJ 시트 상세 앞의 행 (합계 줄 + 머리행)
+DETAIL_COLS = ["회차태그", "후원시간", "ID", "닉네임", "후원하트", "구분"]
+SUM_KEYS = ["BJ_KEY", "회차태그", "구분"]      # aggregate 합계표 키 (sums 인자 모양)
+DEDUP_KEYS = ["회차태그", "후원시간", "BJ_KEY", "ID", "후원하트"]   # 후원 한 건의 동일성
+
+
+class PipelineError(ValueError):
+    """사용자에게 그대로 보여줄 집계 오류 (입력 문제)."""
+
+
+class Ingested(NamedTuple):
+    frames: List[pd.DataFrame]   # 파일별 전처리 결과 (입력 순서)
+    errors: List[str]            # "파일명: 사유"
+    tags: List[str]              # 파일명 태그 (최초 등장 순서, 중복 제거)
+    cached: int
+    parsed: int
+    sources: List[Tuple[Path, Optional[str]]] = []   # frames 와 같은 순서의 (경로, 내용 해시)
+
+
+class BjSheet(NamedTuple):
+    key: str                     # BJ_KEY (빈 값은 "미지정BJ")
+    general: int
+    affiliate: int
+    detail: pd.DataFrame         # DETAIL_COLS 중 존재하는 열
+    per_round: pd.DataFrame      # 회차 / 하트합계 / 회차태그 (없으면 빈 프레임)
+
+
+class Aggregates(NamedTuple):
+    daily: pd.DataFrame          # 일별 시트
+    total: pd.DataFrame          # 참여BJ_총계 (총합 내림차순)
+    per_round: pd.DataFrame      # 회차별 전체 합계
+    bj_sheets: List[BjSheet]
+
+
+# ---------------- 훅 ----------------
+class StageRecorder:
+    """단계별 소요 시간(+ 선택적으로 tracemalloc 최대 메모리)을 모으는 기본 훅."""
+
+    def __init__(self, trace_mem: bool = False):
+        self.trace_mem = trace_mem
+        self.records: List[Dict] = []
+        self._t0 = 0.0
+        self._own_trace = False
+
+    def start(self, stage: str) -> None:
+        if self.trace_mem:
+            self._own_trace = not tracemalloc.is_tracing()
+            if self._own_trace:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self._t0 = time.perf_counter()
+
+    def end(self, stage: str, info: Dict) -> None:
+        rec = {"stage": stage, "seconds": round(time.perf_counter() - self._t0, 4), **info}
+        if self.trace_mem:
+            rec["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+            if self._own_trace:
+                tracemalloc.stop()
+        self.records.append(rec)
+
+    def report(self) -> str:
+        lines = []
+        for r in self.records:
+            mem = f" {r['peak_mb']:,.1f} MB" if "peak_mb" in r else ""
+            rows = f" {r['rows']:,}행" if "rows" in r else ""
+            lines.append(f"[단계] {r['stage']:<14}{r['seconds']:>8.3f}s{rows}{mem}")
+        return "\n".join(lines)
+
+@contextmanager
+def _stage(name: str, hooks: Sequence, info: Dict):
+    # info 는 단계 안에서 채워서 end 훅에 넘김 (rows 등)
+    for h in hooks:
+        h.start(name)
+    yield info
+    for h in hooks:
+        h.end(name, info)
+
+
+# ---------------- 단계 ----------------
+def ingest(paths: List[Path], workers: Optional[int] = None, on_file=None,
+           use_cache: bool = True, stream: bool = False) -> Ingested:
+    """
+    파일 읽기 + 파일 단위 전처리 + 파일명 태그 부여 (heart_ingest, 프로세스 풀 병렬).
+    stream=True 면 파일마다 (회차태그, BJ_KEY, ID, 닉네임, 구분) 누적 합계만 남긴다.
+    """
+    paths = [Path(p) for p in paths]
+    tags = []  # 최초 등장 순서 체크용(정렬은 assign_rounds 에서 숫자 오름차순)
+    for p in paths:
+        tag = file_tag(p.name)
+        if tag not in tags:
+            tags.append(tag)
+    stats = {}
+    frames, errors = ingest_files(paths, workers=workers, on_file=on_file,
+                                  use_cache=use_cache, stats=stats, stream=stream)
+    return Ingested(frames, errors, tags, stats.get("cached", 0), stats.get("parsed", 0),
+                    stats.get("sources", []))
+
+def record_ledger(ing: Ingested, ledger, summed: bool = False) -> List[str]:
+    """
+    파일별 프레임을 원장(heart_ledger)에 추가 (이미 있는 파일은 건너뜀).
+    반환: frames 와 같은 순서의 원장 file_id 목록.
+    """
+    import heart_ledger
+    from heart_cache import file_digest
+    conn = heart_ledger.connect(ledger)
+    try:
+        items = [(df, digest or file_digest(path), file_tag(Path(path).name), Path(path).name)
+                 for df, (path, digest) in zip(ing.frames, ing.sources)]
+        return [fid for fid, _ in heart_ledger.append_many(conn, items, summed=summed)]
+    finally:
+        conn.close()
+
+def ledger_sums(ledger, file_ids: List[str]) -> pd.DataFrame:
+    """원장 인덱스로 (BJ_KEY, 회차태그, 구분) 합계표 (aggregate 의 sums 인자)."""
+    import heart_ledger
+    conn = heart_ledger.connect(ledger)
+    try:
+        return heart_ledger.round_sums(conn, file_ids)
+    finally:
+        conn.close()
+
+def normalize(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    파일별 프레임 합치기. 정규 키 열(ID/닉네임/BJ_KEY/구분)은 ingest 에서
+    파일마다 이미 계산돼 있으므로 여기서 다시 정규화하지 않는다.
+    """
+    if not frames:
+        raise PipelineError("처리 가능한 파일이 없습니다.")
+    # 범주가 파일마다 다르면 concat 이 문자열로 풀어 버리므로 먼저 공용 사전으로 맞춘다
+    shared = {}
+    for c in frames[0].columns:
+        parts = [f[c] for f in frames if c in f.columns]
+        if len(parts) == len(frames) and all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            cats = union_categoricals(parts, sort_categories=True).categories
+            shared[c] = pd.CategoricalDtype(cats)
+    merged = pd.concat([f.astype(shared) for f in frames], ignore_index=True)
+    return compact_frame(merged)   # 일부 파일에만 있던 열 등 남은 문자열 열 정리
+
+def dedup(merged: pd.DataFrame, lens: Sequence[int], names: Sequence[str]):
+    """
+    겹치는 내보내기(같은 회차 재다운로드, 부분+전체 파일) 중복 제거.
+    행 동일성 = DEDUP_KEYS 해시 (한 번의 벡터 연산). 같은 파일 안의 같은 행(같은 초에 같은 금액
+    두 번)은 실제 후원일 수 있으므로, 파일 안에서 몇 번째 등장인지까지 묶어 비교 —
+    동일 행은 파일들 중 가장 많이 나온 횟수만큼 남는다.
+    lens/names: merged 를 이룬 파일별 행 수 / 이름 (입력 순서).
+    반환: (중복 제거 프레임, {파일명: 제거 행 수} — 제거가 있었던 파일만)
+    """
+    if not all(c in merged.columns for c in DEDUP_KEYS) or len(lens) < 2:
+        return merged, {}
+    h = pd.util.hash_pandas_object(merged[DEDUP_KEYS], index=False).to_numpy()
+    file_no = np.repeat(np.arange(len(lens)), lens)
+    occ = pd.DataFrame({"f": file_no, "h": h}).groupby(["f", "h"], sort=False).cumcount().to_numpy()
+    dup = pd.DataFrame({"h": h, "occ": occ}).duplicated().to_numpy()
+    if not dup.any():
+        return merged, {}
+    counts = np.bincount(file_no[dup], minlength=len(lens))
+    report = {}
+    for name, n in zip(names, counts):
+        if n:
+            report[name] = report.get(name, 0) + int(n)
+    return merged[~dup].reset_index(drop=True), report
+
+def memory_report(df: pd.DataFrame) -> List[Dict]:
+    """
+    열별 메모리 (bytes) 와 같은 값을 파이썬 문자열/int64 로 두었을 때의 추정치.
+    추정은 pandas memory_usage(deep=True) 와 같은 방식 (행마다 포인터 + 문자열 크기).
+    """
+    out = []
+    for c in df.columns:
+        s = df[c]
+        now = int(s.memory_usage(index=False, deep=True))
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            sizes = np.fromiter((sys.getsizeof(v) for v in s.cat.categories), dtype=np.int64,
+                                count=len(s.cat.categories))
+            codes = s.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+            plain = 8 * len(s) + int(counts @ sizes)
+        elif s.dtype.kind in "iu":
+            plain = 8 * len(s)
+        else:
+            plain = now
+        out.append({"column": c, "dtype": str(s.dtype), "bytes": now, "plain_bytes": plain})
+    return out
+
+def format_memory_report(report: List[Dict]) -> str:
+    mb = lambda b: b / 1024 / 1024
+    lines = [f"{'열':<8}{'형식':<12}{'현재':>10}{'문자열일 때':>12}"]
+    for r in report:
+        lines.append(f"{r['column']:<8}{r['dtype']:<12}{mb(r['bytes']):>8.1f}MB{mb(r['plain_bytes']):>10.1f}MB")
+    now = sum(r["bytes"] for r in report)
+    plain = sum(r["plain_bytes"] for r in report)
+    saved = (1 - now / plain) * 100 if plain else 0.0
+    lines.append(f"합계: {mb(now):,.1f} MB (문자열/int64 그대로면 {mb(plain):,.1f} MB, {saved:.0f}% 절약)")
+    return "\n".join(lines)
+
+def assign_rounds(tags: List[str]) -> Dict[str, int]:
+    """파일명 태그 → 회차번호 (태그 숫자 오름차순, 1부터)."""
+    tags_sorted = sorted(tags, key=lambda x: int(x))
+    return {tag: i + 1 for i, tag in enumerate(tags_sorted)}
+
+def catalog_rounds(ing: Ingested, lens: Sequence[int], catalog,
+                   summed: bool = False) -> Tuple[Dict[str, int], int]:
+    """
+    읽은 파일을 회차 목록(heart_catalog)에 등록하고 회차 번호는 목록에서 조회.
+    처음 보는 파일만 항목이 늘고, 이미 있는 파일은 조회만 한다.
+    반환: (회차태그 → 회차번호, 새로 추가한 파일 수)
+    """
+    from heart_catalog import RoundCatalog
+    from heart_cache import file_digest
+    cat = RoundCatalog.load(catalog)
+    before = len(cat)
+    for n, (path, digest) in zip(lens, ing.sources):
+        name = Path(path).name
+        cat.add(digest or file_digest(path), file_tag(name), n, name, summed)
+    cat.save()
+    rounds = cat.rounds()
+    return {t: rounds[t] for t in ing.tags if t in rounds}, len(cat) - before
+
+def resolve(merged: pd.DataFrame, tag_to_round: Dict[str, int]):
+    """
+    회차를 넘나드는 후원자 식별 (heart_identity): ID 마다 대표 닉네임 하나로.
+    최근성은 회차번호 (같은 건수면 최근 회차 표기). 반환: (프레임, 통계 dict)
+    """
+    from heart_identity import resolve_identity
+    recency = merged["회차태그"].map(tag_to_round).astype(float).fillna(0) if "회차태그" in merged.columns else None
+    return resolve_identity(merged, recency=recency)
+
+def _group_sum(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """키별 후원하트 합계 (등장한 조합만). 결과의 범주형 키는 일반 문자열로."""
+    g = df.groupby(keys, as_index=False, observed=True)["후원하트"].sum()
+    for k in keys:
+        if isinstance(g[k].dtype, pd.CategoricalDtype):
+            g[k] = g[k].astype(object)
+    return g
+
+def running_sums(sums: Optional[pd.DataFrame], rows: pd.DataFrame) -> pd.DataFrame:
+    """합계표(aggregate 의 sums 모양)에 새 행만 더해 갱신 (이미 더한 행은 다시 묶지 않음)."""
+    part = _group_sum(rows, SUM_KEYS)
+    return part if sums is None else _group_sum(pd.concat([sums, part], ignore_index=True), SUM_KEYS)
+
+def _kind_pivot(g: pd.DataFrame, index: List[str]) -> pd.DataFrame:
+    """(index…, 구분) 합계표 → index 별 일반하트/제휴하트/총합 열."""
+    piv = (
+        g.groupby([*index, "구분"], as_index=False)["후원하트"].sum()
+          .pivot(index=index, columns="구분", values="후원하트")
+          .fillna(0)
+          .reset_index()
+    )
+    for col in ["일반하트", "제휴하트"]:
+        if col not in piv.columns:
+            piv[col] = 0
+    piv["총합"] = piv["일반하트"] + piv["제휴하트"]
+    return piv
+
+def sheet_key(bj_key) -> str:
+    """BJ_KEY 값 → BJ 시트 키 (빈 값은 "미지정BJ")."""
+    return bj_key if isinstance(bj_key, str) and bj_key.strip() else "미지정BJ"
+
+def aggregate(merged: pd.DataFrame, tag_to_round: Dict[str, int],
+              sums: Optional[pd.DataFrame] = None) -> Aggregates:
+    """
+    요약 시트용 프레임 + BJ별 상세/회차별 합계.
+    합계는 (BJ_KEY, 회차태그, 구분) 단위 한 번의 groupby 에서 모두 파생 —
+    BJ 시트 루프는 BJ 키로 찾아 쓰기만 한다.
+    sums: 같은 모양의 합계표를 이미 가지고 있으면 (원장 질의) groupby 를 건너뛴다.
+    """
+    need = {"회차태그", "BJ_KEY", "구분", "후원하트"}
+    if not need.issubset(set(merged.columns)):
+        raise PipelineError("필수 컬럼(회차태그/참여BJ/구분/후원하트) 부족으로 요약을 만들 수 없습니다.")
+
+    g = sums.copy() if sums is not None else _group_sum(merged, SUM_KEYS)
+    g["회차번호"] = g["회차태그"].map(tag_to_round).fillna(0).astype(int)
+
+    # 일별 (파일명 태그 기준)
+    piv = _kind_pivot(g, ["회차태그", "BJ_KEY"])
+    piv["회차"] = piv["회차태그"].map(tag_to_round).fillna(0).astype(int)
+    piv = piv[piv["회차"] > 0].sort_values(["회차", "BJ_KEY"]).reset_index(drop=True)
+    daily = piv[["회차", "회차태그", "BJ_KEY", "일반하트", "제휴하트", "총합"]].rename(
+        columns={"회차태그": "태그", "BJ_KEY": "참여BJ"})
+    daily["회차"] = daily["회차"].astype(str) + "회차"
+
+    # 참여BJ 총계
+    total_by_bj = _kind_pivot(g, ["BJ_KEY"]).rename(columns={"BJ_KEY": "참여BJ"})
+    total = total_by_bj[["참여BJ", "일반하트", "제휴하트", "총합"]].sort_values("총합", ascending=False)
+
+    # 회차별 전체 합계
+    per_round = g.groupby("회차태그", as_index=False)["후원하트"].sum()
+    per_round["회차번호"] = per_round["회차태그"].map(tag_to_round)
+    per_round = per_round.dropna(subset=["회차번호"]).sort_values("회차번호")
+    per_round["회차번호"] = per_round["회차번호"].astype(int)
+    per_round = per_round[["회차번호", "후원하트", "회차태그"]].astype({"후원하트": int})
+
+    # BJ별 구분 합계 / 회차별 합계 (BJ 키 → 값)
+    kind_sum = g.groupby(["BJ_KEY", "구분"])["후원하트"].sum().to_dict()
+    rr = g[g["회차번호"] > 0].groupby(["BJ_KEY", "회차번호", "회차태그"], as_index=False)["후원하트"].sum()
+    bj_rounds = {
+        bj: pd.DataFrame({
+            "회차": part["회차번호"].astype(str) + "회차",
+            "하트합계": part["후원하트"].astype(int),
+            "회차태그": part["회차태그"].astype(str),
+        })
+        for bj, part in rr.groupby("BJ_KEY", sort=False)
+    }
+    no_rounds = pd.DataFrame({"회차": [], "하트합계": [], "회차태그": []})
+
+    # 참여BJ별 상세 (정렬 후 BJ 별로 나누기만)
+    # (스트리밍 합계 프레임은 후원시간이 없어 회차태그 → 후원자 순)
+    merged_sorted = merged
+    sort_cols = [c for c in ["회차태그", "후원시간"] if c in merged_sorted.columns]
+    if sort_cols:
+        merged_sorted = merged_sorted.sort_values(sort_cols, kind="stable")
+
+    exist_cols = [c for c in DETAIL_COLS if c in merged_sorted.columns]
+    sheets = []
+    for bj_key, sub in merged_sorted.groupby("BJ_KEY", dropna=False, observed=True):
+        sheets.append(BjSheet(
+            sheet_key(bj_key),
+            int(kind_sum.get((bj_key, "일반하트"), 0)),
+            int(kind_sum.get((bj_key, "제휴하트"), 0)),
+            sub[exist_cols],
+            bj_rounds.get(bj_key, no_rounds),
+        ))
+    return Aggregates(daily, total, per_round, sheets)
+
+def columnar_tables(merged: pd.DataFrame, agg: Aggregates,
+                    tag_to_round: Dict[str, int]) -> Dict[str, pd.DataFrame]:
+    """열 지향 저장용 표: 합친 행 (+회차 번호) 과 요약 시트 세 개 (엑셀과 같은 값)."""
+    rows = merged.reset_index(drop=True)
+    tags = rows["회차태그"]
+    tag_codes = tags.cat.codes.to_numpy() if isinstance(tags.dtype, pd.CategoricalDtype) else None
+    if tag_codes is not None:
+        lookup = np.array([tag_to_round.get(t, 0) for t in tags.cat.categories] + [0], dtype="int16")
+        rounds = lookup[tag_codes]
+    else:
+        rounds = tags.map(tag_to_round).fillna(0).astype("int16").to_numpy()
+    rows.insert(1, "회차", rounds)
+    if "후원시간" in rows.columns:
+        rows["후원시간"] = rows["후원시간"].astype("string")
+    return {"rows": rows, "daily": agg.daily, "total": agg.total, "per_round": agg.per_round}
+
+def write_columnar(merged: pd.DataFrame, agg: Aggregates, tag_to_round: Dict[str, int],
+                   out, fmt: str = "parquet") -> List[Path]:
+    from heart_columnar import data_dir, write_tables
+    return write_tables(columnar_tables(merged, agg, tag_to_round), data_dir(out), fmt)
+
+def sanitize(name: str) -> str:
+    return re.sub(r'[\\/*?:\[\]]', "_", str(name))[:31] or "Sheet"
+
+def _unique_sheet_name(base: str, used: set[str]) -> str:
+    base = sanitize(str(base))[:31] or "Sheet"
+    name = base
+    i = 2
+    while name in used:
+        suf = f" ({i})"
+        name = base[:31 - len(suf)] + suf
+        i += 1
+    used.add(name)
+    return name
+
+def bj_titles(agg: Aggregates) -> List[str]:
+    """BJ 시트 이름 (agg.bj_sheets 순서, 요약 시트와 겹치지 않게)."""
+    used_names = {"요약_일별", "요약_참여BJ_총계"}
+    return [_unique_sheet_name(s.key, used_names) for s in agg.bj_sheets]
+
+def _bj_blocks(s: BjSheet, skip_rows: int = 0) -> List:
+    """BJ 시트 블록. skip_rows: 상세 앞부분을 빼고 (기존 시트의 행을 그대로 끼울 자리)."""
+    blocks = [
+        [[f"총 일반하트={s.general}", f"총 제휴하트={s.affiliate}",
+          f"총합={s.general + s.affiliate}"], list(s.detail.columns)],
+        s.detail.iloc[skip_rows:] if skip_rows else s.detail,
+    ]
+    if not s.per_round.empty:
+        blocks.append([[], ["회차별 합계"], ["회차", "하트합계", "회차태그"]])
+        blocks.append(s.per_round)
+    return blocks
+
+def render(agg: Aggregates, out, on_sheet: Optional[Callable[[int, int], None]] = None,
+           skip: Optional[set] = None, grown: Optional[Dict[str, int]] = None) -> int:
+    """
+    총합산 엑셀을 out 에 저장 (시트별 스트리밍). 반환: 시트 수.
+    on_sheet(k, n): BJ 시트 하나를 쓸 때마다 호출 (진행 표시/취소 지점)
+    skip: 이 BJ 키의 시트는 빈 자리표시로만 (render_partial 이 기존 시트로 채움)
+    grown: BJ 키 → 기존 시트에 이미 있는 상세 행 수 — 그 행은 빼고 씀 (열 너비는 전체 기준)
+    """
+    wb = new_workbook()
+
+    # (A) 요약_일별
+    write_sheet(wb, "일별", [[list(agg.daily.columns)], agg.daily])
+
+    # (B) 요약_참여BJ_총계
+    total_blocks = [[list(agg.total.columns)], agg.total]
+    if not agg.per_round.empty:
+        total_blocks.append([[], ["회차별 전체 합계"], ["회차번호", "후원하트", "회차태그"]])
+        total_blocks.append(agg.per_round)
+    write_sheet(wb, "참여BJ_총계", total_blocks)
+
+    # (C) 참여BJ별 상세 + 회차별 합계
+    n = len(agg.bj_sheets)
+    for k, (s, title) in enumerate(zip(agg.bj_sheets, bj_titles(agg)), start=1):
+        if skip and s.key in skip:
+            write_sheet(wb, title, [])
+        elif grown and s.key in grown:
+            write_sheet(wb, title, _bj_blocks(s, grown[s.key]), widths=column_widths(_bj_blocks(s)))
+        else:
+            write_sheet(wb, title, _bj_blocks(s))
+        if on_sheet:
+            on_sheet(k, n)
+
+    wb.save(out)
+    return 2 + n
+
+def render_partial(agg: Aggregates, out, previous: Dict[str, str], changed: set,
+                   on_sheet: Optional[Callable[[int, int], None]] = None,
+                   grown: Optional[Dict[str, int]] = None) -> int:
+    """
+    요약 시트와 changed(BJ 키) 시트만 새로 쓰고, 나머지 BJ 시트는 out 에 이미 있는 시트 XML 을 그대로 옮김.
+    previous: 지난번 out 을 쓸 때의 BJ 키 → 시트 이름. 반환: 새로 쓴 시트 수.
+    grown: changed 중 상세 뒤에 행만 붙은 BJ 키 → 지난번 상세 행 수 (기존 행 XML 은 그대로, 붙는 행만 새로)
+    """
+    titles = dict(zip((s.key for s in agg.bj_sheets), bj_titles(agg)))
+    keep = {k for k in previous if k in titles and k not in changed}
+    grown = {k: n for k, n in (grown or {}).items() if k in previous and k in titles and k in changed and n}
+    fresh = io.BytesIO()
+    render(agg, fresh, on_sheet=on_sheet, skip=keep, grown=grown)
+    splice_sheets(fresh.getvalue(), out, {titles[k]: previous[k] for k in keep}, out,
+                  insert={titles[k]: (previous[k], BJ_HEAD_ROWS, n) for k, n in grown.items()})
+    return 2 + len(titles) - len(keep)
+
+
+# ---------------- 전체 실행 ----------------
+def run_master(paths: List[Path], out, workers: Optional[int] = None, use_cache: bool = True,
+               hooks: Sequence = (), on_file=None, on_sheet=None,
+               log: Optional[Callable[[str], None]] = None, stream: bool = False,
+               ledger=None, keep_index: bool = False, drop_duplicates: bool = True,
+               columnar: Optional[str] = None, catalog=None) -> dict:
+    """
+    다섯 단계를 순서대로 실행해 out 에 총합산 엑셀 저장.
+    stream=True: 파일을 덩어리로 읽어 합계만 유지 (BJ 시트는 회차·후원자별 합계 행).
+    ledger: 원장 파일 경로 — 읽은 파일을 원장에 추가하고 요약 합계는 원장에서 질의
+    keep_index: 합친 프레임으로 후원자 역색인(heart_index.DonorIndex)을 만들어 결과에 포함
+    drop_duplicates: 파일 사이 중복 행 제거 (dedup, 스트리밍 합계 프레임은 후원시간이 없어 제외)
+    columnar: "parquet" / "arrow" — 엑셀에 더해 합친 행과 요약표를 열 지향 파일로 저장
+    catalog: 회차 목록(heart_catalog) 경로 — 주면 회차 번호를 목록에서 조회 (새 파일만 추가),
+             없으면 이번에 고른 파일의 태그 순서로 번호 매김
+    반환: {"out", "rows", "sheets", "errors", "cached", "parsed", "duplicates",
+           "index"(keep_index 일 때), "columnar"(columnar 일 때, 저장한 파일 경로)}
+    """
+    log = log or (lambda m: None)
+    if not paths:
+        raise PipelineError("먼저 '파일 여러 개 선택'으로 CSV/XLSX 파일을 선택하세요.")
+    if columnar:
+        # 파일을 다 읽은 뒤가 아니라 시작 전에 확인
+        from heart_columnar import FORMATS, ColumnarUnavailable, require_arrow
+        if columnar not in FORMATS:
+            raise PipelineError(f"지원하지 않는 저장 형식: {columnar} (가능: {', '.join(FORMATS)})")
+        try:
+            require_arrow()
+        except ColumnarUnavailable as e:
+            raise PipelineError(str(e)) from None
+
+    if use_cache:
+        from heart_cache import available
+        if not available():
+            log("[캐시] pyarrow 가 없어 캐시 없이 읽습니다 (pip install pyarrow)")
+    with _stage("ingest", hooks, {"files": len(paths)}) as info:
+        ing = ingest(paths, workers=workers, on_file=on_file, use_cache=use_cache, stream=stream)
+        info["rows"] = sum(len(f) for f in ing.frames)
+    if ing.cached:
+        log(f"[캐시] {ing.cached}개 파일은 캐시 사용, {ing.parsed}개 새로 읽음")
+    if ing.errors:
+        log("[경고] 일부 파일을 건너뜀:\n  - " + "\n  - ".join(ing.errors))
+    if (ledger or catalog is not None) and ing.frames:
+        # 원장/회차 목록 모두 파일 내용 해시가 키 — 캐시를 끈 실행에서도 한 번만 계산
+        from heart_cache import file_digest
+        ing = ing._replace(sources=[(p, d or file_digest(p)) for p, d in ing.sources])
+
+    file_ids = None
+    if ledger and ing.frames:
+        with _stage("ledger", hooks, {}) as info:
+            file_ids = record_ledger(ing, ledger, summed=stream)
+            info["files"] = len(file_ids)
+
+    with _stage("normalize", hooks, {}) as info:
+        merged = normalize(ing.frames)
+        info["rows"] = len(merged)
+        info["mb"] = round(merged.memory_usage(index=False, deep=True).sum() / 1024 / 1024, 1)
+    lens = [len(f) for f in ing.frames]
+    ing = ing._replace(frames=[])   # 합친 뒤 파일별 프레임은 놓아 준다
+
+    duplicates = {}
+    if drop_duplicates and stream:
+        log("[중복] 스트리밍 합계에는 후원시간이 없어 파일 사이 중복 행을 지우지 않습니다 "
+            "(겹치는 파일은 빼고 고르거나 스트리밍을 끄세요)")
+    elif drop_duplicates:
+        with _stage("dedup", hooks, {"rows": len(merged)}) as info:
+            merged, duplicates = dedup(merged, lens, [Path(p).name for p, _ in ing.sources])
+            info["dropped"] = sum(duplicates.values())
+        if duplicates:
+            log(f"[중복] 파일 사이 중복 {sum(duplicates.values()):,}행 제거: "
+                + ", ".join(f"{k} {v:,}" for k, v in duplicates.items()))
+            file_ids = None   # 원장 합계표는 파일 단위라 중복 제거가 반영되지 않음 → 메모리에서 집계
+
+    with _stage("assign_rounds", hooks, {}) as info:
+        if catalog is not None:
+            tag_to_round, added = catalog_rounds(ing, lens, catalog, summed=stream)
+            info["added"] = added
+        else:
+            tag_to_round, added = assign_rounds(ing.tags), 0
+        info["rounds"] = len(tag_to_round)
+    if added:
+        log(f"[회차] 새 파일 {added}개를 회차 목록에 추가: {catalog}")
+
+    with _stage("resolve", hooks, {"rows": len(merged)}) as info:
+        merged, ident = resolve(merged, tag_to_round)
+        info.update(ident)
+    if ident["merged"]:
+        log(f"[식별] 닉네임이 여러 개인 후원자 {ident['merged']:,}명 → ID 별 대표 닉네임으로 통일")
+
+    with _stage("aggregate", hooks, {"rows": len(merged)}) as info:
+        sums = ledger_sums(ledger, file_ids) if file_ids is not None else None
+        agg = aggregate(merged, tag_to_round, sums)
+        info["bjs"] = len(agg.bj_sheets)
+
+    index = None
+    if keep_index:
+        from heart_index import build_index
+        with _stage("index", hooks, {"rows": len(merged)}) as info:
+            index = build_index(merged, tag_to_round)
+            info["donors"] = len(index)
+
+    written = None
+    if columnar:
+        with _stage("columnar", hooks, {"rows": len(merged), "format": columnar}) as info:
+            written = write_columnar(merged, agg, tag_to_round, out, columnar)
+            info["files"] = len(written)
+        log(f"[데이터] {columnar} 저장: {written[0].parent}")
+
+    with _stage("render", hooks, {}) as info:
+        sheets = render(agg, out, on_sheet=on_sheet)
+        info["sheets"] = sheets
+
+    res = {
+        "out": str(out), "rows": len(merged), "sheets": sheets, "errors": ing.errors,
+        "cached": ing.cached, "parsed": ing.parsed, "duplicates": duplicates,
+    }
+    if index is not None:
+        res["index"] = index
+    if written is not None:
+        res["columnar"] = [str(p) for p in written]
+    return res
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+heart_export.py
+- 단일 파일 → BJ별 워크북(관리자용/BJ용) 생성과 ZIP 묶기
+- BJ별 워크북은 프로세스 풀에서 병렬 생성, ZIP 항목 순서는 요약 순서로 고정
+- ZIP 은 워크북이 나오는 대로 디스크에 바로 기록 (xlsx 는 이미 압축이라 STORED, ZIP64 허용)
+"""
+
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from heart_norm import classify_heart_series
+from heart_ingest import default_workers
+from xlsx_writer import new_workbook, write_sheet, save_workbook
+
+# 이보다 BJ 수가 적으면 풀 기동 비용이 더 커서 순차 처리
+PARALLEL_MIN_BJS = 8
+
+
+def sanitize_name(name: str) -> str:
+    return re.sub(r'[\\/*?:\[\]]', "_", str(name))[:31] or "BJ"
+
+def make_bj_excel_bytes(bj_name: str, sub_df: pd.DataFrame, admin: bool) -> bytes:
+    sub = sub_df.copy()
+    # 구분은 전처리(canonicalize)에서 이미 계산됨 — 없을 때만 직접 판별
+    kind = sub["구분"] if "구분" in sub.columns else classify_heart_series(sub["ID"])
+    sub["is_aff"] = kind.eq("제휴하트").to_numpy()
+    gen = sub[~sub["is_aff"]].sort_values("후원하트", ascending=False)[["ID","닉네임","후원하트"]].copy()
+    aff = sub[ sub["is_aff"]].sort_values("후원하트", ascending=False)[["ID","닉네임","후원하트"]].copy()
+    gsum, asum = int(gen["후원하트"].sum()), int(aff["후원하트"].sum())
+
+    def _labeled(part: pd.DataFrame, label: str, total: int) -> pd.DataFrame:
+        # 관리자용: 구간 첫 행에만 구분/합계 표시
+        tag = np.full(len(part), "", dtype=object); tag[0] = label
+        tot = np.full(len(part), "", dtype=object); tot[0] = total
+        return part.assign(구분=tag, 합계=tot)
+
+    if admin:
+        blocks = [[["", bj_name, gsum+asum, "", ""], ["ID","닉네임","후원하트","구분","합계"]]]
+    else:
+        blocks = [[["", bj_name, gsum+asum], ["ID","닉네임","후원하트"]]]
+    if not gen.empty:
+        blocks.append(_labeled(gen, "일반하트", gsum) if admin else gen)
+    if not aff.empty:
+        blocks.append(_labeled(aff, "제휴하트", asum) if admin else aff)
+
+    wb = new_workbook()
+    write_sheet(wb, sanitize_name(bj_name), blocks)
+    return save_workbook(wb)
+
+def _bj_pair(args) -> Tuple[bytes, bytes]:
+    # 워커 진입점: BJ 하나의 관리자용/BJ용 워크북
+    bj, sub = args
+    return make_bj_excel_bytes(bj, sub, admin=True), make_bj_excel_bytes(bj, sub, admin=False)
+
+def bj_file_plan(bjs: Iterable) -> List[Tuple[str, str]]:
+    """
+    (ZIP 항목명, BJ) 목록. 항목명이 겹치면 처음 자리에 마지막 BJ 내용이 들어간다
+    (예전 dict 누적 방식과 같은 결과, 덮어써질 BJ 는 아예 만들지 않음).
+    """
+    pos: Dict[str, int] = {}
+    plan: List[Tuple[str, str]] = []
+    for bj in bjs:
+        bj = str(bj)
+        fname = f"{sanitize_name(bj)}.xlsx"
+        if fname in pos:
+            plan[pos[fname]] = (fname, bj)
+        else:
+            pos[fname] = len(plan)
+            plan.append((fname, bj))
+    return plan
+
+def _open_zip(dest) -> zipfile.ZipFile:
+    return zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+def write_bj_zips(base: pd.DataFrame, bjs: Iterable, summary_bytes: bytes,
+                  admin_dest, bj_dest, workers: Optional[int] = None,
+                  on_item=None) -> int:
+    """
+    요약.xlsx + BJ별 워크북을 관리자용/BJ용 ZIP(admin_dest / bj_dest: 경로 또는 파일객체)에 바로 기록.
+    - 항목 순서는 bjs 순서 고정 (결과를 입력 순서대로 받아 씀)
+    - on_item(i, n): BJ 하나가 끝날 때마다 호출 (진행 표시/취소 지점)
+    반환: 기록한 BJ 워크북 수
+    """
+    cols = [c for c in ["ID","닉네임","후원하트","구분"] if c in base.columns]
+    groups = {str(bj): sub[cols] for bj, sub in base.groupby("참여BJ", sort=False)}
+    empty = base.iloc[0:0][cols]
+    plan = bj_file_plan(bjs)
+    jobs = [(bj, groups.get(bj, empty)) for _, bj in plan]
+    if workers is None:
+        workers = default_workers(len(jobs))
+    with _open_zip(admin_dest) as za, _open_zip(bj_dest) as zb:
+        za.writestr("요약.xlsx", summary_bytes)
+        zb.writestr("요약.xlsx", summary_bytes)
+        if workers <= 1 or len(jobs) < PARALLEL_MIN_BJS:
+            results = map(_bj_pair, jobs)
+            ex = None
+        else:
+            ex = ProcessPoolExecutor(max_workers=workers)
+            results = ex.map(_bj_pair, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+        try:
+            for i, ((fname, _), (admin_b, bj_b)) in enumerate(zip(plan, results), start=1):
+                za.writestr(fname, admin_b)
+                zb.writestr(fname, bj_b)
+                if on_item:
+                    on_item(i, len(jobs))
+        finally:
+            if ex is not None:
+                ex.shutdown(cancel_futures=True)
+    return len(jobs)
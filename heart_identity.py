@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+heart_identity.py
+- 후원자 식별: ID 가 기본 키, ID 마다 대표 닉네임 하나로 통일
+    * normalize_nick 은 값 하나씩 정리할 뿐이라, 회차/파일마다 조금 다른 닉네임이
+      (ID, 닉네임) 묶음을 여러 줄로 쪼갬 → 집계 전에 닉네임을 대표값으로 바꾼다
+- 닉네임 변형 묶기는 블로킹 키(NFKC + 대소문자 무시 + 글자/숫자만)로 — 쌍마다 비교하지 않고
+  같은 키끼리 groupby 한 번 (후원자 수십만 명도 선형)
+- 대표 닉네임: 건수가 가장 많은 변형 묶음 → 그 안에서 가장 많이 쓴 표기 → 가장 최근 회차
+  → 사전순 (빈 닉네임은 다른 표기가 없을 때만)
+- 빈 ID 는 묶지 않음 (서로 다른 사람일 수 있음)
+"""
+
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+
+def nick_block(nick) -> str:
+    """닉네임 변형 묶음 키: 'Ａｂｃ', 'a b c', 'ABC!' → 'abc'."""
+    if nick is None or (isinstance(nick, float) and np.isnan(nick)):
+        return ""
+    s = unicodedata.normalize("NFKC", str(nick)).casefold()
+    return "".join(ch for ch in s if ch.isalnum())
+
+def _as_category(s: pd.Series) -> pd.Series:
+    return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+
+def _resolve_codes(ids: pd.Series, nicks: pd.Series, weights, recency):
+    """
+    범주형 ID/닉네임 → (ID 코드별 대표 닉네임 코드 (-1: 대표 없음), 통계).
+    문자열은 범주 목록에서만 다루고 나머지는 정수 코드 연산.
+    """
+    id_codes = ids.cat.codes.to_numpy()
+    nick_codes = nicks.cat.codes.to_numpy()
+    id_cats = ids.cat.categories
+    nick_cats = nicks.cat.categories.astype(str)
+
+    g = pd.DataFrame({
+        "i": id_codes, "k": nick_codes,
+        "n": 1 if weights is None else weights.to_numpy(),
+        "last": 0 if recency is None else recency.to_numpy(),
+    }).groupby(["i", "k"], as_index=False, sort=False).agg(n=("n", "sum"), last=("last", "max"))
+    bad_ids = np.flatnonzero(np.asarray(id_cats.astype(str) == ""))
+    g = g[(g["i"] >= 0) & ~g["i"].isin(bad_ids)]
+
+    # 닉네임 범주마다 블로킹 키 (변형 묶음) → 정수 코드
+    blocks = pd.factorize(pd.Series([nick_block(n) for n in nick_cats], dtype=object))[0]
+    k = g["k"].to_numpy()
+    named = (k >= 0) & (np.append(nick_cats.to_numpy() != "", False)[k])
+    g["b"] = np.where(k >= 0, np.append(blocks, -1)[k], -1)
+    g["block_n"] = g.groupby(["i", "b"], sort=False)["n"].transform("sum")
+    # 우선순위: 이름 있음 > 묶음 건수 > 표기 건수 > 최근 > 사전순 (범주 순서가 곧 사전순)
+    lex_rank = np.append(np.argsort(np.argsort(nick_cats.to_numpy(), kind="stable")), len(nick_cats))
+    order = np.lexsort((lex_rank[k], -g["last"].to_numpy(), -g["n"].to_numpy(),
+                        -g["block_n"].to_numpy(), ~named, g["i"].to_numpy()))
+    i_sorted = g["i"].to_numpy()[order]
+    first = order[np.unique(i_sorted, return_index=True)[1]]
+
+    canon = np.full(len(id_cats), -1, dtype=np.int64)
+    canon[g["i"].to_numpy()[first]] = k[first]
+    per_id = np.bincount(g["i"].to_numpy(), minlength=len(id_cats))
+    stats = {"ids": int(len(first)), "merged": int((per_id > 1).sum()), "variants": int(len(g) - len(first))}
+    return canon, stats
+
+def canonical_nicks(ids: pd.Series, nicks: pd.Series, weights: Optional[pd.Series] = None,
+                    recency: Optional[pd.Series] = None) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    ID → 대표 닉네임 (빈 ID 제외).
+    weights: 행마다 건수 (생략 시 1), recency: 클수록 최근 (생략 시 0)
+    반환: (ID 색인 Series, {"ids": 후원자 수, "merged": 닉네임이 둘 이상이던 후원자 수,
+                          "variants": 대표값으로 바뀐 (ID, 닉네임) 조합 수})
+    """
+    ids, nicks = _as_category(ids), _as_category(nicks)
+    canon, stats = _resolve_codes(ids, nicks, weights, recency)
+    has = canon >= 0
+    vals = np.append(nicks.cat.categories.to_numpy(dtype=object), "")[canon[has]]
+    return pd.Series(vals, index=ids.cat.categories[has], name="닉네임"), stats
+
+def resolve_identity(df: pd.DataFrame, weight_col: Optional[str] = None,
+                     recency: Optional[pd.Series] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    df["닉네임"] 을 ID 별 대표 닉네임으로 바꿔서 (df 를 바꿔서) 돌려줌. 빈 ID 행은 그대로.
+    범주형 닉네임 열이면 범주형으로 유지 (같은 범주, 코드만 교체).
+    """
+    was_cat = isinstance(df["닉네임"].dtype, pd.CategoricalDtype)
+    ids, nicks = _as_category(df["ID"]), _as_category(df["닉네임"])
+    weights = df[weight_col] if weight_col else None
+    canon, stats = _resolve_codes(ids, nicks, weights, recency)
+    if not stats["variants"]:
+        return df, stats
+    id_codes = ids.cat.codes.to_numpy()
+    new = np.where(id_codes >= 0, canon[id_codes], -1)
+    new = np.where(new >= 0, new, nicks.cat.codes.to_numpy())
+    # 대표가 '빈 닉네임(결측)' 인 경우 코드 -1 → 결측 그대로
+    out = pd.Categorical.from_codes(new, dtype=nicks.dtype)
+    df["닉네임"] = out if was_cat else pd.Series(out, index=df.index).astype(object)
+    return df, stats
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+heart_index.py
+- 총합산 합친 프레임 위의 메모리 역색인 (후원자 ID / 닉네임 / BJ_KEY → 행 위치)
+- 범주형 코드를 한 번 정렬해 (정렬된 행 위치, 코드별 시작 위치) 만 보관 — 키마다 배열을 따로 만들지 않음
+- 조회는 해당 행의 코드만 잘라 numpy 로 회차별 / BJ별 합계 (파일을 다시 읽지 않음, 1ms 안팎)
+- 검색어 해석 순서: 'ID(닉네임)' 형태 → ID 정확히 일치 → 정규화 닉네임 일치 → ID/닉네임 부분 일치
+- 합친 프레임만 있으면 언제든 다시 만들 수 있음 (build_index)
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from heart_ingest import MIX_PATTERN
+from heart_norm import master_nick_key
+
+INDEX_COLS = ["회차태그", "BJ_KEY", "ID", "닉네임", "후원하트", "구분"]
+SEARCH_LIMIT = 20
+
+_RE_MIX = re.compile(MIX_PATTERN)
+
+
+class DonorHit(NamedTuple):
+    id: str
+    nicks: List[str]             # 이 ID 로 쓰인 닉네임 (정규화, 많이 쓴 순)
+    total: int
+    per_round: pd.DataFrame      # 회차 / 회차태그 / 일반하트 / 제휴하트 / 총합
+    per_bj: pd.DataFrame         # 참여BJ / 일반하트 / 제휴하트 / 총합 (총합 내림차순)
+
+
+class _Postings:
+    """범주형 열 하나의 역색인: 값 → 그 값이 있는 행 위치."""
+
+    def __init__(self, s: pd.Series):
+        if not isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype("category")
+        codes = s.cat.codes.to_numpy()
+        self.codes = codes
+        self.categories = s.cat.categories
+        self._values = np.append(self.categories.to_numpy(dtype=object), None)   # 코드 -1 → None
+        self.code_of = {v: i for i, v in enumerate(self.categories)}
+        self.order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories))
+        skip = int((codes < 0).sum())   # 결측(-1)은 정렬 맨 앞
+        self.starts = np.concatenate([[0], np.cumsum(counts)]) + skip
+        self._lower = None   # 부분 일치 검색 때 처음 한 번 만듦
+
+    def rows(self, value) -> np.ndarray:
+        c = self.code_of.get(value)
+        if c is None:
+            return self.order[:0]
+        return self.order[self.starts[c]:self.starts[c + 1]]
+
+    def values(self, codes: np.ndarray) -> np.ndarray:
+        return self._values[codes]
+
+    def find(self, text: str) -> List[str]:
+        """대소문자 무시 부분 일치하는 값 (범주 목록만 훑음)."""
+        if self._lower is None:
+            self._lower = pd.Series(self.categories.astype(str)).str.lower()
+        hit = self._lower.str.contains(text.lower(), regex=False).to_numpy()
+        return list(self.categories[hit])
+
+
+class DonorIndex:
+    def __init__(self, merged: pd.DataFrame, tag_to_round: Optional[Dict[str, int]] = None):
+        self.frame = merged[[c for c in INDEX_COLS if c in merged.columns]]
+        self.tag_to_round = tag_to_round or {}
+        self.by_id = _Postings(self.frame["ID"])
+        self.by_nick = _Postings(self.frame["닉네임"])
+        self.by_bj = _Postings(self.frame["BJ_KEY"])
+        self.by_tag = _Postings(self.frame["회차태그"])
+        # 조회는 작은 행 집합이라 pandas groupby 대신 코드 배열로 직접 합산
+        self._hearts = self.frame["후원하트"].to_numpy().astype("int64")
+        self._affiliate = (self.frame["구분"] == "제휴하트").to_numpy()
+
+    def __len__(self) -> int:
+        return len(self.by_id.categories)
+
+    def _sums(self, post: _Postings, rows: np.ndarray):
+        """행 위치 → (키 값, 일반하트, 제휴하트) — 키는 post 의 범주."""
+        uniq, inv = np.unique(post.codes[rows], return_inverse=True)
+        h = self._hearts[rows]
+        aff = self._affiliate[rows]
+        general = np.zeros(len(uniq), dtype="int64")
+        affiliate = np.zeros(len(uniq), dtype="int64")
+        np.add.at(general, inv[~aff], h[~aff])
+        np.add.at(affiliate, inv[aff], h[aff])
+        return post.values(uniq), general, affiliate
+
+    def _kind_table(self, post: _Postings, rows: np.ndarray, key: str) -> pd.DataFrame:
+        keys, general, affiliate = self._sums(post, rows)
+        return pd.DataFrame({key: keys, "일반하트": general, "제휴하트": affiliate,
+                             "총합": general + affiliate})
+
+    def _round_table(self, rows: np.ndarray) -> pd.DataFrame:
+        out = self._kind_table(self.by_tag, rows, "회차태그")
+        out.insert(0, "회차", [self.tag_to_round.get(t, 0) for t in out["회차태그"]])
+        return out.sort_values(["회차", "회차태그"], kind="stable").reset_index(drop=True)
+
+    def _ids_of_rows(self, rows: np.ndarray) -> List[str]:
+        # 행 위치 → 등장한 ID (후원하트 많은 순)
+        ids, general, affiliate = self._sums(self.by_id, rows)
+        order = np.argsort(-(general + affiliate), kind="stable")
+        return [str(i) for i in ids[order]]
+
+    def resolve(self, query: str, limit: int = SEARCH_LIMIT) -> List[str]:
+        """검색어 → 후원자 ID 목록."""
+        q = str(query).strip()
+        if not q:
+            return []
+        m = _RE_MIX.match(q)
+        uid = m["ID"].replace("＠", "@").strip() if m else q
+        if len(self.by_id.rows(uid)):
+            return [uid]
+        nick = master_nick_key(m["NICK"] if m and m["NICK"] is not None else q)
+        rows = self.by_nick.rows(nick)
+        if len(rows):
+            return self._ids_of_rows(rows)[:limit]
+        ids = set(self.by_id.find(q))
+        for n in self.by_nick.find(q)[:limit * 5]:
+            ids.update(self._ids_of_rows(self.by_nick.rows(n)))
+        if not ids:
+            return []
+        totals = {i: int(self._hearts[self.by_id.rows(i)].sum()) for i in ids}
+        return sorted(ids, key=lambda i: -totals[i])[:limit]
+
+    def donor(self, uid: str) -> Optional[DonorHit]:
+        rows = self.by_id.rows(uid)
+        if not len(rows):
+            return None
+        nick_codes, counts = np.unique(self.by_nick.codes[rows], return_counts=True)
+        nicks = self.by_nick.values(nick_codes[np.argsort(-counts, kind="stable")])
+
+        per_round = self._round_table(rows)
+        per_round["회차"] = per_round["회차"].astype(str) + "회차"
+        per_bj = self._kind_table(self.by_bj, rows, "참여BJ")
+        per_bj = per_bj.sort_values("총합", ascending=False, kind="stable").reset_index(drop=True)
+        return DonorHit(uid, [str(n) for n in nicks], int(self._hearts[rows].sum()), per_round, per_bj)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[DonorHit]:
+        return [h for h in (self.donor(i) for i in self.resolve(query, limit)) if h is not None]
+
+    def bj(self, bj_key: str) -> pd.DataFrame:
+        """BJ 키의 회차별 합계 (일반/제휴/총합)."""
+        return self._round_table(self.by_bj.rows(bj_key))
+
+
+def build_index(merged: pd.DataFrame, tag_to_round: Optional[Dict[str, int]] = None) -> DonorIndex:
+    """합친 프레임(heart_engine.normalize 결과)에서 역색인 생성."""
+    return DonorIndex(merged, tag_to_round)
+
+def format_hit(hit: DonorHit) -> str:
+    shown = [n for n in hit.nicks if n]
+    nicks = ", ".join(shown[:3]) + (" …" if len(shown) > 3 else "")
+    lines = [f"[후원자] {hit.id} ({nicks}) 총 {hit.total:,}"]
+    for r in hit.per_round.itertuples(index=False):
+        lines.append(f"  {r.회차:>6} {r.회차태그:<6} 일반 {r.일반하트:>10,}  제휴 {r.제휴하트:>10,}  합 {r.총합:>10,}")
+    for r in hit.per_bj.itertuples(index=False):
+        lines.append(f"  - {r.참여BJ:<16} 일반 {r.일반하트:>10,}  제휴 {r.제휴하트:>10,}  합 {r.총합:>10,}")
+    return "\n".join(lines)
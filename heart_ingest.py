@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+heart_ingest.py
+- 총합산용 파일 읽기 + 전처리 (파일 단위)
+- 여러 파일은 프로세스 풀에서 병렬 처리, 결과는 선택 순서대로 반환
+- 파일별 오류는 "파일명: 사유" 문자열로 모아 호출측 경고 로그에 그대로 사용
+- 내용 해시 기준 디스크 캐시(heart_cache)에 있으면 다시 파싱하지 않음
+- 정규 키 열(ID / 닉네임 / BJ_KEY / 구분)은 canonicalize 에서 행마다 한 번만 계산,
+  이후 집계/엑셀 작성은 이 열만 읽는다
+- 총합산 프레임은 키 열을 범주형(정수 코드 + 고유값 사전), 하트를 int32 로 보관
+- 스트리밍 모드(stream=True): CSV 를 STREAM_CHUNK_ROWS 행씩 읽어 키별 누적 합계만 유지
+    * 단일: (참여BJ, ID, 닉네임) 합계+건수 — 결과는 일반 모드와 같음
+    * 총합산: (회차태그, BJ_KEY, ID, 닉네임, 구분) 합계 — 후원 건별 행/후원시간은 남지 않음
+    * 최대 메모리는 행 수가 아니라 고유 키 수에 비례 (XLSX 는 통째로 읽음)
+"""
+
+import os
+import re
+import csv
+import codecs
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+import heart_cache
+from heart_norm import (
+    normalize_nick_series, master_nick_key_series, master_bj_key_series, classify_heart_series
+)
+from heart_identity import resolve_identity
+
+MIX_COL = "후원 아이디(닉네임)"
+MIX_PATTERN = r'^\s*(?P<ID>[^()]+?)(?:\((?P<NICK>.*)\))?\s*$'
+MASTER_COLS = ["회차태그", "후원시간", "BJ_KEY", "ID", "닉네임", "후원하트", "구분"]
+# 총합산 프레임에서 범주형으로 두는 열 (행 수가 아니라 고유값 수만큼만 문자열 보관)
+CATEGORY_COLS = ["회차태그", "BJ_KEY", "ID", "닉네임", "구분"]
+HEART_DTYPE = "int32"
+
+CSV_ENCODINGS = ["utf-8-sig","utf-8","cp949","euc-kr"]
+SNIFF_BYTES = 64 * 1024   # 인코딩/구분자 판정에 쓰는 앞부분 크기
+
+STREAM_CHUNK_ROWS = 200_000   # 스트리밍 모드 한 번에 읽는 행 수
+STREAM_MERGE_EVERY = 8        # 부분 합계를 이 개수만큼 모으면 다시 합쳐 크기 유지
+# 스트리밍 모드에서 문자열로 읽는 열 (덩어리마다 자료형 추론이 달라지지 않게)
+STREAM_STR_COLS = ["참여BJ", "후원하트", MIX_COL]
+SINGLE_KEYS = ["참여BJ", "ID", "닉네임", "구분"]
+MASTER_KEYS = ["회차태그", "BJ_KEY", "ID", "닉네임", "구분"]
+
+# 병렬 작업 수 기본값 (환경변수로 덮어쓰기 가능)
+WORKERS_ENV = "MUSE_INGEST_WORKERS"
+
+
+def extract_date_from_name(name: str) -> str:
+    s = name.lower()
+    m = re.search(r'(20\d{2})[.\-_](\d{1,2})[.\-_](\d{1,2})', s)
+    if m: return f"{int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
+    m = re.search(r'(20\d{2})(\d{2})(\d{2})', s)
+    if m: return f"{int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
+    m = re.search(r'(\d{2})[.\-_](\d{1,2})[.\-_](\d{1,2})', s)
+    if m: return f"{2000+int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
+    m = re.search(r'(\d{1,2})(\d{2})', s)
+    if m and len(m.group(0)) == 4:
+        y = datetime.now().year
+        return f"{y:04d}-{int(m[1]):02d}-{int(m[2]):02d}"
+    return datetime.now().strftime("%Y-%m-%d")
+
+def file_tag(name: str) -> str:
+    """파일명에서 4자리 태그 추출(없으면 MMDD 보정)."""
+    m4 = re.search(r'(\d{4})', name)
+    if m4:
+        return m4.group(1)  # 예: '0804'
+    return extract_date_from_name(name)[5:].replace('-', '')  # 'MMDD'
+
+def _decode_prefix(prefix: bytes, enc: str, final: bool) -> Optional[str]:
+    """앞부분만 해독. 끝에 잘린 멀티바이트 문자는 오류로 보지 않는다."""
+    try:
+        return codecs.getincrementaldecoder(enc)().decode(prefix, final=final)
+    except UnicodeDecodeError:
+        return None
+
+def _sniff_sep(head: str) -> str:
+    try:
+        return csv.Sniffer().sniff(head[:4000], delimiters=[",","\t",";","|"]).delimiter
+    except Exception:
+        return ","
+
+def sniff_csv(path) -> List[Tuple[str, str]]:
+    """
+    BOM/인코딩/구분자를 파일 앞부분(SNIFF_BYTES)만 보고 판정.
+    앞부분 해독이 되는 후보만 (인코딩, 구분자) 순서대로 돌려준다.
+    (앞부분이 깨지는 인코딩은 전체 해독도 반드시 실패하므로 건너뜀)
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(SNIFF_BYTES)
+        final = not f.read(1)
+    if prefix.startswith(codecs.BOM_UTF8):
+        encs = ["utf-8-sig"]
+    else:
+        encs = CSV_ENCODINGS
+    out = []
+    for enc in encs:
+        head = _decode_prefix(prefix, enc, final)
+        if head is not None:
+            out.append((enc, _sniff_sep(head)))
+    return out
+
+def read_any_table(path_or_file, sheet=None) -> pd.DataFrame:
+    """
+    CSV/XLSX 읽기. CSV 는 sniff_csv 후보로 한 번만 파싱 (실패 시 다음 후보).
+    선택된 인코딩/구분자는 df.attrs["encoding"], df.attrs["sep"] 에 기록.
+    내용이 없는 파일(머리행도 없음)은 인코딩 문제가 아니므로 바로 "빈 파일입니다."
+    """
+    p = str(path_or_file)
+    if p.lower().endswith(".xlsx"):
+        return pd.read_excel(path_or_file, sheet_name=(sheet if str(sheet).strip() else 0))
+    for enc, sep in sniff_csv(path_or_file):
+        try:
+            df = pd.read_csv(path_or_file, sep=sep, encoding=enc)
+        except pd.errors.EmptyDataError:
+            raise ValueError("빈 파일입니다.") from None
+        except Exception:
+            continue
+        df.attrs["encoding"] = enc
+        df.attrs["sep"] = sep
+        return df
+    raise ValueError("CSV 인코딩/구분자 해석 실패")
+
+def canonicalize(df: pd.DataFrame, master: bool = True) -> pd.DataFrame:
+    """
+    정규 키 열 추가 (df 를 바꿔서 돌려줌):
+    - ID     : 혼합열에서 추출, 전각 '＠' → '@'
+    - 닉네임 : 혼합열 괄호 안 → 총합산은 master_nick_key, 단일 파일은 normalize_nick (한 번)
+    - BJ_KEY : 참여BJ → master_bj_key (총합산이고 참여BJ 열이 있을 때)
+    - 구분   : ID 로 일반하트/제휴하트 판정 (규칙 표, 고유 ID 마다 한 번)
+    """
+    sp = df[MIX_COL].astype(str).str.extract(MIX_PATTERN)
+    df["ID"] = sp["ID"].fillna("").str.replace("＠", "@", regex=False).str.strip()
+    nick_key = master_nick_key_series if master else normalize_nick_series
+    df["닉네임"] = nick_key(sp["NICK"].fillna(""))
+    if master and "참여BJ" in df.columns:
+        df["BJ_KEY"] = master_bj_key_series(df["참여BJ"].astype(str))
+    df["구분"] = classify_heart_series(df["ID"])
+    return df
+
+def _to_hearts(s: pd.Series) -> pd.Series:
+    return pd.to_numeric(s.astype(str).str.replace(",", "", regex=False), errors="coerce").fillna(0).astype(int)
+
+def _single_groups(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [str(c).strip() for c in df.columns]
+    col_bj    = next((c for c in df.columns if c == "참여BJ"), None)
+    col_heart = next((c for c in df.columns if c == "후원하트"), None)
+    col_mix   = next((c for c in df.columns if c == MIX_COL), None)
+    if not (col_bj and col_heart and col_mix):
+        raise ValueError("필수 컬럼 누락: 참여BJ / 후원하트 / 후원 아이디(닉네임)")
+
+    # 단일 파일은 참여BJ 표시 이름 그대로 묶는다 (ZIP 항목명)
+    df[col_bj] = df[col_bj].astype(str).str.strip()
+    df[col_heart] = _to_hearts(df[col_heart])
+    df[col_mix] = df[col_mix].astype(str).str.strip()
+    canonicalize(df, master=False)
+
+    # 구분은 ID 로 정해지므로 묶음 키에 넣어도 그룹은 그대로
+    return (
+        df.groupby([col_bj, "ID", "닉네임", "구분"], as_index=False)
+          .agg(후원하트=(col_heart, "sum"), 건수=(col_heart, "size"))
+          .rename(columns={col_bj:"참여BJ"})
+    )
+
+def _resolve_single(groups: pd.DataFrame) -> pd.DataFrame:
+    """(참여BJ, ID, 닉네임, 구분) 합계+건수 → ID 별 대표 닉네임으로 다시 묶음 (heart_identity)."""
+    groups, _ = resolve_identity(groups, weight_col="건수")
+    base = groups.groupby(SINGLE_KEYS, as_index=False)["후원하트"].sum()
+    return base[["참여BJ", "ID", "닉네임", "후원하트", "구분"]]
+
+def preprocess_single(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    단일 파일 → (참여BJ, ID, 닉네임) 후원하트 합계.
+    같은 ID 의 닉네임 변형은 대표 닉네임 하나로 (한 후원자가 여러 줄로 나뉘지 않게).
+    """
+    return _resolve_single(_single_groups(df))
+
+def _master_rows(df_in: pd.DataFrame, name: str, tag: str) -> pd.DataFrame:
+    if MIX_COL not in df_in.columns:
+        raise ValueError(f"{name}: '{MIX_COL}' 컬럼이 없습니다.")
+
+    canonicalize(df_in)
+
+    # 하트 정수화
+    if "후원하트" in df_in.columns:
+        df_in["후원하트"] = _to_hearts(df_in["후원하트"])
+
+    # 파일명 태그
+    df_in["회차태그"] = tag
+
+    exist_cols = [c for c in MASTER_COLS if c in df_in.columns]
+    return df_in[exist_cols].copy()
+
+def preprocess_master_file(path, tag: str) -> pd.DataFrame:
+    """파일 1개 → 총합산용 압축 프레임 (MASTER_COLS 중 존재하는 열만)."""
+    p = Path(path)
+    return compact_frame(_master_rows(read_any_table(p, sheet=None), p.name, tag))
+
+# ---------------- 스트리밍 (덩어리 단위 누적 합계) ----------------
+def _sum_by(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    keys = [k for k in keys if k in df.columns]
+    vals = [c for c in ("후원하트", "건수") if c in df.columns]
+    return df.groupby(keys, as_index=False, sort=True)[vals].sum()
+
+def _stream_reduce(path, per_chunk, keys: List[str], chunk_rows: int) -> pd.DataFrame:
+    """
+    CSV 를 덩어리로 읽어 per_chunk(chunk) 결과(키별 합계)를 누적.
+    인코딩 후보는 read_any_table 과 같은 순서, 중간에 해독 실패하면 다음 후보로 처음부터.
+    빈 파일 / 머리행만 있는 파일은 read_any_table 경로와 같은 결과 (오류 / 빈 합계 프레임)
+    반환 프레임 attrs: encoding / sep / rows (원본 행 수)
+    """
+    p = Path(path)
+    if p.suffix.lower() == ".xlsx":
+        df = read_any_table(p, sheet=None)
+        out = _sum_by(per_chunk(df), keys)
+        out.attrs["rows"] = len(df)
+        return out
+    for enc, sep in sniff_csv(p):
+        parts, rows = [], 0
+        try:
+            reader = pd.read_csv(p, sep=sep, encoding=enc, chunksize=chunk_rows,
+                                 dtype={c: str for c in STREAM_STR_COLS})
+            with reader:
+                for chunk in reader:
+                    rows += len(chunk)
+                    parts.append(per_chunk(chunk))
+                    if len(parts) >= STREAM_MERGE_EVERY:
+                        parts = [_sum_by(pd.concat(parts, ignore_index=True), keys)]
+        except pd.errors.EmptyDataError:
+            raise ValueError("빈 파일입니다.") from None
+        except (UnicodeDecodeError, pd.errors.ParserError):
+            continue
+        out = _sum_by(pd.concat(parts, ignore_index=True), keys) if parts else None
+        if out is None:
+            raise ValueError("빈 파일입니다.")
+        out.attrs.update(encoding=enc, sep=sep, rows=rows)
+        return out
+    raise ValueError("CSV 인코딩/구분자 해석 실패")
+
+def preprocess_single_stream(path, chunk_rows: int = STREAM_CHUNK_ROWS) -> pd.DataFrame:
+    """preprocess_single 과 같은 결과를 덩어리 단위로 (attrs 에 encoding/sep/rows)."""
+    out = _stream_reduce(path, _single_groups, SINGLE_KEYS, chunk_rows)
+    attrs = dict(out.attrs)
+    out = _resolve_single(out)   # 건수까지 누적했으므로 대표 닉네임도 일반 모드와 같음
+    out.attrs.update(attrs)
+    return out
+
+def preprocess_master_stream(path, tag: str, chunk_rows: int = STREAM_CHUNK_ROWS) -> pd.DataFrame:
+    """총합산용 프레임을 (회차태그, BJ_KEY, ID, 닉네임, 구분) 합계로 (건별 행 없음)."""
+    p = Path(path)
+
+    def _chunk(df):
+        rows = _master_rows(df, p.name, tag)
+        if "후원하트" not in rows.columns:
+            raise ValueError(f"{p.name}: '후원하트' 컬럼이 없습니다.")
+        return _sum_by(rows, MASTER_KEYS)
+
+    out = _stream_reduce(p, _chunk, MASTER_KEYS, chunk_rows)
+    return compact_frame(out[[c for c in MASTER_COLS if c in out.columns]])
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """키 열 → 범주형 (범주는 정렬 순서), 후원하트 → HEART_DTYPE. df 를 바꿔서 돌려줌."""
+    for c in CATEGORY_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    if "후원하트" in df.columns and df["후원하트"].dtype != HEART_DTYPE:
+        df["후원하트"] = df["후원하트"].astype(HEART_DTYPE)
+    return df
+
+def _ingest_one(args) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    # 워커 진입점: 예외 객체 대신 메시지를 돌려줘서 피클 문제를 피한다
+    path, tag, key, stream = args
+    try:
+        if stream:
+            df = preprocess_master_stream(path, tag)
+        else:
+            df = preprocess_master_file(path, tag)
+    except Exception as e:
+        return None, f"{Path(path).name}: {e}"
+    if key:
+        try:
+            heart_cache.store(key, df)
+        except Exception:
+            pass  # 캐시 실패는 집계에 영향 없음
+    return df, None
+
+def default_workers(n_files: int) -> int:
+    env = os.environ.get(WORKERS_ENV, "").strip()
+    if env.isdigit() and int(env) > 0:
+        return min(int(env), max(1, n_files))
+    return max(1, min(n_files, os.cpu_count() or 1))
+
+def ingest_files(paths: List[Path], workers: Optional[int] = None,
+                 on_file=None, use_cache: bool = True, stats: Optional[dict] = None,
+                 stream: bool = False) -> Tuple[List[pd.DataFrame], List[str]]:
+    """
+    파일 목록을 전처리해 (프레임 목록, 오류 목록) 반환.
+    - 프레임은 입력 순서 유지 (실패 파일은 제외)
+    - 캐시 적중 파일은 현재 프로세스에서 바로 로드, 나머지만 워커로 보냄
+    - workers<=1 이거나 남은 파일이 1개면 현재 프로세스에서 순차 처리
+    - on_file(i, path, error_or_None): 파일 하나가 끝날 때마다 호출 (진행 표시용)
+    - stats: 넘기면 {"cached": n, "parsed": m, "sources": [(경로, 내용 해시|None), …]} 을 채워 준다
+      (sources 는 돌려준 프레임과 같은 순서)
+    - stream: 파일을 덩어리 단위 누적 합계로 읽음 (preprocess_master_stream)
+    - pyarrow 가 없으면 use_cache 를 무시 (heart_cache.available)
+    """
+    use_cache = use_cache and heart_cache.available()
+    jobs, digests = [], []
+    for p in paths:
+        p = Path(p); tag = file_tag(p.name); key = digest = None
+        if use_cache:
+            try:
+                digest = heart_cache.file_digest(p)
+                key = heart_cache.cache_key(digest, tag, stream=stream)
+            except Exception:
+                key = None  # 읽기 오류는 파싱 단계에서 그대로 보고
+        jobs.append((p, tag, key, stream))
+        digests.append(digest)
+
+    done = {}
+    for i, (p, _, key, _) in enumerate(jobs):
+        df = heart_cache.load(key) if key else None
+        if df is not None:
+            done[i] = (df, None)
+            if on_file:
+                on_file(i, p, None)
+    todo = [i for i in range(len(jobs)) if i not in done]
+
+    if workers is None:
+        workers = default_workers(len(todo))
+    if workers <= 1 or len(todo) <= 1:
+        results = map(_ingest_one, [jobs[i] for i in todo])
+        ex = None
+    else:
+        ex = ProcessPoolExecutor(max_workers=workers)
+        results = ex.map(_ingest_one, [jobs[i] for i in todo])
+    try:
+        for i, res in zip(todo, results):
+            done[i] = res
+            if on_file:
+                on_file(i, jobs[i][0], res[1])
+    finally:
+        if ex is not None:
+            ex.shutdown(cancel_futures=True)
+    if use_cache and todo:
+        heart_cache.evict()
+
+    if stats is not None:
+        stats["cached"] = len(jobs) - len(todo)
+        stats["parsed"] = len(todo)
+    frames, errors, sources = [], [], []
+    for i in range(len(jobs)):
+        df, err = done[i]
+        if err is None:
+            frames.append(df)
+            sources.append((jobs[i][0], digests[i]))
+        else:
+            errors.append(err)
+    if stats is not None:
+        stats["sources"] = sources
+    return frames, errors
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+heart_jobs.py
+- 탭1 집계 작업을 UI 스레드 밖에서 돌리는 작업 실행기
+- 진행 상황/결과/오류는 post(fn) 로 UI 스레드에 넘김 (GUI 는 큐 + root.after 로 처리)
+- 작업 코드는 job.stage()/job.check() 지점에서 취소 요청을 확인
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """작업 1건의 진행 보고/취소 상태. GUI 없이 쓸 때는 log 만 넘기면 된다."""
+
+    # 같은 단계 진행 메시지는 이 간격(초)보다 자주 보내지 않음
+    STAGE_INTERVAL = 0.3
+
+    def __init__(self, name: str = "", log: Optional[Callable[[str], None]] = None):
+        self.name = name
+        self._log = log
+        self._cancel = threading.Event()
+        self._last_stage = ("", 0.0)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def log(self, msg: str) -> None:
+        if self._log:
+            self._log(msg)
+
+    def stage(self, name: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        """단계 진행 보고 + 취소 확인. 마지막 항목은 항상 보고."""
+        self.check()
+        now = time.monotonic()
+        last_name, last_ts = self._last_stage
+        final = done is None or (total is not None and done >= total)
+        if name == last_name and not final and now - last_ts < self.STAGE_INTERVAL:
+            return
+        self._last_stage = (name, now)
+        if done is None:
+            self.log(f"[진행] {name}")
+        elif total is None:
+            self.log(f"[진행] {name}: {done:,}")
+        else:
+            self.log(f"[진행] {name}: {done:,}/{total:,}")
+
+
+class JobRunner:
+    """한 번에 작업 하나만 돌리는 백그라운드 실행기."""
+
+    def __init__(self, post: Callable[[Callable[[], None]], None]):
+        self._post = post
+        self._job: Optional[Job] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, name: str, work: Callable[[Job], object],
+              on_done: Optional[Callable[[object], None]] = None,
+              on_error: Optional[Callable[[Exception], None]] = None,
+              log: Optional[Callable[[str], None]] = None) -> Job:
+        """work(job) 을 새 스레드에서 실행. 콜백은 모두 post 를 거쳐 호출된다."""
+        if self.busy:
+            raise RuntimeError("이미 실행 중인 작업이 있습니다.")
+        post = self._post
+        job = Job(name, log=(lambda m: post(lambda: log(m))) if log else None)
+
+        def _run():
+            try:
+                res = work(job)
+            except JobCancelled:
+                if log:
+                    post(lambda: log(f"[취소] {name} 작업을 취소했습니다."))
+            except Exception as e:
+                if on_error:
+                    post(lambda e=e: on_error(e))
+            else:
+                if on_done:
+                    post(lambda: on_done(res))
+
+        self._job = job
+        self._thread = threading.Thread(target=_run, name=f"job-{name}", daemon=True)
+        self._thread.start()
+        return job
+
+    def cancel(self) -> bool:
+        if self.busy and self._job is not None:
+            self._job.cancel()
+            return True
+        return False
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
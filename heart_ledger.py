@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+heart_ledger.py
+- 회차 파일 전처리 행을 쌓아 두는 로컬 원장 (표준 라이브러리 sqlite3, 파일 하나)
+- 파일 단위로 한 번만 추가 (키: 파일 내용 해시 + 회차태그) — 같은 파일을 다시 집계해도 중복 없음
+    * 정규화/하트 구분 규칙이 바뀌었으면 그 파일 행만 지우고 다시 넣음
+    * 스트리밍 합계로 들어간 파일은 나중에 행 단위로 읽으면 교체
+- 겹치는 내보내기(재다운로드, 부분+전체 파일)는 파일마다 그대로 저장하고 조회에서 한 번만 센다
+    * 행 동일성 = heart_engine.DEDUP_KEYS + 파일 안에서 몇 번째 등장인지(occ) — 총합산 dedup 과 같은 기준
+    * 스트리밍 합계 행(후원시간 없음)은 파일마다 따로 센다
+- 인덱스: 회차태그 / BJ 키 / 후원자 ID / 구분 (+ 파일 키)
+- 파일별 (BJ 키, 회차태그, 구분) 합계표(round_totals)도 추가할 때 같이 저장 —
+  총합산 요약 합계는 행 전체가 아니라 이 표를 파일 키로 찾아 더한다 (round_sums)
+- 실행 예:
+    python heart_ledger.py rounds
+    python heart_ledger.py donor abc123 --last 30
+    python heart_ledger.py bj 별빛 --last 10
+"""
+
+import sys
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from heart_engine import DEDUP_KEYS
+from heart_norm import NORM_RULES_VERSION, rules_signature
+from heart_paths import APP_DIR
+
+LEDGER_PATH = APP_DIR / "heart_ledger.sqlite3"
+LEDGER_FORMAT = 2   # donations 행 모양이 바뀌면 올림 (예전 파일은 다시 추가할 때 교체)
+
+# 원장 열 → 프레임 열
+COLS = {
+    "round_tag": "회차태그", "donated_at": "후원시간", "bj_key": "BJ_KEY", "donor_id": "ID",
+    "nickname": "닉네임", "hearts": "후원하트", "kind": "구분",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id   TEXT PRIMARY KEY,
+    digest    TEXT NOT NULL,
+    round_tag TEXT NOT NULL,
+    name      TEXT,
+    rows      INTEGER NOT NULL,
+    rules     TEXT NOT NULL,
+    summed    INTEGER NOT NULL DEFAULT 0,
+    added_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS donations (
+    file_id    TEXT NOT NULL,
+    round_tag  TEXT,
+    donated_at TEXT,
+    bj_key     TEXT,
+    donor_id   TEXT,
+    nickname   TEXT,
+    hearts     INTEGER NOT NULL,
+    kind       TEXT,
+    occ        INTEGER
+);
+CREATE TABLE IF NOT EXISTS round_totals (
+    file_id   TEXT NOT NULL,
+    bj_key    TEXT NOT NULL,
+    round_tag TEXT NOT NULL,
+    kind      TEXT NOT NULL,
+    hearts    INTEGER NOT NULL,
+    PRIMARY KEY (file_id, bj_key, round_tag, kind)
+);
+"""
+
+_INDEXES = {
+    "ix_donations_file": "donations(file_id)",
+    "ix_donations_round": "donations(round_tag)",
+    "ix_donations_bj": "donations(bj_key, round_tag)",
+    "ix_donations_donor": "donations(donor_id, round_tag)",
+    "ix_donations_kind": "donations(kind)",
+}
+
+
+def connect(path=None) -> sqlite3.Connection:
+    """원장 열기 (없으면 생성)."""
+    conn = sqlite3.connect(str(path or LEDGER_PATH))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    if "occ" not in {r[1] for r in conn.execute("PRAGMA table_info(donations)")}:
+        conn.execute("ALTER TABLE donations ADD COLUMN occ INTEGER")   # LEDGER_FORMAT 1 원장
+    _create_indexes(conn)
+    return conn
+
+def _create_indexes(conn: sqlite3.Connection) -> None:
+    for name, target in _INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+def file_id(digest: str, tag: str) -> str:
+    return hashlib.sha256(f"{digest}|tag={tag}".encode("utf-8")).hexdigest()[:40]
+
+def _rules() -> str:
+    return f"{NORM_RULES_VERSION}:{rules_signature()}:{LEDGER_FORMAT}"
+
+def _column(df: pd.DataFrame, col: str, n: int) -> list:
+    # sqlite3 가 받는 파이썬 값으로 (범주형 → 문자열, 결측 → None)
+    if col not in df.columns:
+        return [None] * n
+    s = df[col].astype(object)
+    return s.where(s.notna(), None).tolist()
+
+def _occurrence(df: pd.DataFrame, summed: bool) -> list:
+    # 같은 파일 안의 같은 행(같은 초에 같은 금액 두 번)은 실제 후원 — 몇 번째인지로 구분
+    if summed or not set(DEDUP_KEYS).issubset(df.columns):
+        return [None] * len(df)
+    return df.groupby(DEDUP_KEYS, observed=True, dropna=False, sort=False).cumcount().tolist()
+
+def _is_current(conn: sqlite3.Connection, fid: str, rules: str, summed: bool) -> bool:
+    old = conn.execute("SELECT rules, summed FROM files WHERE file_id=?", (fid,)).fetchone()
+    return old is not None and old[0] == rules and (summed or not old[1])
+
+def append(conn: sqlite3.Connection, df: pd.DataFrame, digest: str, tag: str,
+           name: str = "", summed: bool = False) -> Tuple[str, int]:
+    """
+    파일 하나의 전처리 행 추가. 반환: (file_id, 추가한 행 수 — 이미 있으면 0).
+    summed=True: 스트리밍 합계 프레임 (후원시간 없음)
+    """
+    return append_many(conn, [(df, digest, tag, name)], summed)[0]
+
+def append_many(conn: sqlite3.Connection, items: Sequence[Tuple[pd.DataFrame, str, str, str]],
+                summed: bool = False) -> List[Tuple[str, int]]:
+    """
+    (프레임, 내용 해시, 회차태그, 파일명) 여러 개를 한 번에 추가. 반환: 항목별 (file_id, 추가 행 수).
+    새로 넣을 행이 원장에 이미 있는 행보다 많으면 행 인덱스를 지웠다가 다 넣은 뒤 한 번에 다시 만든다
+    (행마다 인덱스 5개를 갱신하는 것보다 2배 이상 빠름).
+    """
+    rules = _rules()
+    out, todo = [], []
+    for df, digest, tag, name in items:
+        fid = file_id(digest, tag)
+        out.append((fid, 0))
+        if not _is_current(conn, fid, rules, summed) and fid not in {t[0] for t in todo}:
+            todo.append((fid, df, digest, tag, name))
+            out[-1] = (fid, len(df))
+    if not todo:
+        return out
+
+    existing = conn.execute("SELECT COALESCE(SUM(rows), 0) FROM files").fetchone()[0]
+    rebuild = sum(len(t[1]) for t in todo) > existing
+    with conn:
+        if rebuild:
+            for ix in _INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {ix}")
+        for fid, df, digest, tag, name in todo:
+            _insert(conn, fid, df, digest, tag, name, rules, summed)
+        if rebuild:
+            _create_indexes(conn)
+    return out
+
+def _insert(conn, fid, df, digest, tag, name, rules, summed) -> None:
+    n = len(df)
+    totals = []
+    if {"BJ_KEY", "회차태그", "구분"}.issubset(df.columns):
+        g = df.groupby(["BJ_KEY", "회차태그", "구분"], observed=True)["후원하트"].sum()
+        totals = [(fid, *(str(k) for k in key), int(v)) for key, v in g.items()]
+    hearts = df["후원하트"].astype("int64").tolist()
+    cols = [_column(df, c, n) for c in ("회차태그", "후원시간", "BJ_KEY", "ID", "닉네임")]
+    occ = _occurrence(df, summed)
+    conn.execute("DELETE FROM donations WHERE file_id=?", (fid,))
+    conn.execute("DELETE FROM round_totals WHERE file_id=?", (fid,))
+    conn.executemany(
+        "INSERT INTO donations (file_id, round_tag, donated_at, bj_key, donor_id, nickname, hearts, kind, occ) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        zip([fid] * n, *cols, hearts, _column(df, "구분", n), occ),
+    )
+    conn.executemany("INSERT INTO round_totals VALUES (?, ?, ?, ?, ?)", totals)
+    conn.execute(
+        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (fid, digest, tag, name, n, rules, int(summed), datetime.now().isoformat(timespec="seconds")),
+    )
+
+def round_sums(conn: sqlite3.Connection, file_ids: Sequence[str]) -> pd.DataFrame:
+    """
+    파일들의 (BJ_KEY, 회차태그, 구분) 후원하트 합계 — heart_engine.aggregate 의 합계표와 같은 모양.
+    같은 파일을 두 번 고르면 두 번 더한다 (메모리 집계와 동일).
+    """
+    cols = ["BJ_KEY", "회차태그", "구분", "후원하트"]
+    uniq = list(dict.fromkeys(file_ids))
+    if not uniq:
+        return pd.DataFrame(columns=cols)
+    marks = ",".join("?" * len(uniq))
+    per_file = pd.read_sql_query(
+        "SELECT file_id, bj_key, round_tag, kind, hearts FROM round_totals "
+        f"WHERE file_id IN ({marks})",
+        conn, params=uniq,
+    )
+    weight = pd.Series(list(file_ids)).value_counts()
+    per_file["hearts"] = per_file["hearts"] * per_file["file_id"].map(weight)
+    g = per_file.groupby(["bj_key", "round_tag", "kind"], as_index=False, sort=True)["hearts"].sum()
+    g.columns = cols
+    g["후원하트"] = g["후원하트"].astype("int64")
+    return g
+
+def last_tags(conn: sqlite3.Connection, last: Optional[int] = None) -> List[str]:
+    """원장에 있는 회차태그 (숫자 오름차순), last 면 마지막 n 개."""
+    tags = [r[0] for r in conn.execute("SELECT DISTINCT round_tag FROM files")]
+    tags.sort(key=lambda t: (0, int(t)) if t.isdigit() else (1, t))
+    return tags[-last:] if last else tags
+
+def _history(conn, key_col: str, value: str, by: str, last: Optional[int]) -> pd.DataFrame:
+    # 여러 파일에 같은 행이 있으면 한 번만 (occ 가 없는 합계 행은 파일마다)
+    sql = ("SELECT DISTINCT round_tag, donated_at, bj_key, donor_id, hearts, kind, occ, "
+           "CASE WHEN occ IS NULL THEN file_id END AS own "
+           f"FROM donations WHERE {key_col}=?")
+    params: list = [value]
+    if last:
+        tags = last_tags(conn, last)
+        sql += f" AND round_tag IN ({','.join('?' * len(tags))})"
+        params += tags
+    sql = f"SELECT round_tag, {by}, kind, SUM(hearts) AS hearts FROM ({sql}) GROUP BY round_tag, {by}, kind"
+    df = pd.read_sql_query(sql, conn, params=params)
+    order = {t: i for i, t in enumerate(last_tags(conn))}
+    df = df.sort_values(["round_tag", by], key=lambda s: s.map(order) if s.name == "round_tag" else s)
+    return df.rename(columns={**COLS, "hearts": "후원하트"}).reset_index(drop=True)
+
+def donor_history(conn: sqlite3.Connection, donor_id: str, last: Optional[int] = None) -> pd.DataFrame:
+    """후원자 ID 의 회차·BJ·구분별 합계 (ID 인덱스)."""
+    return _history(conn, "donor_id", donor_id, "bj_key", last)
+
+def bj_history(conn: sqlite3.Connection, bj_key: str, last: Optional[int] = None) -> pd.DataFrame:
+    """BJ 키의 회차·후원자·구분별 합계 (BJ 인덱스)."""
+    return _history(conn, "bj_key", bj_key, "donor_id", last)
+
+def rounds(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(
+        "SELECT round_tag AS 회차태그, name AS 파일, rows AS 행, summed AS 합계행, added_at AS 추가시각 "
+        "FROM files ORDER BY added_at", conn)
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="heart_ledger.py", description="후원 원장 조회")
+    ap.add_argument("--db", default=str(LEDGER_PATH), help="원장 파일 경로")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("rounds", help="원장에 들어간 회차 파일 목록")
+    for cmd, what in (("donor", "후원자 ID"), ("bj", "BJ 키 (정규화된 참여BJ)")):
+        p = sub.add_parser(cmd, help=f"{what}의 회차별 합계")
+        p.add_argument("key", help=what)
+        p.add_argument("--last", type=int, default=None, help="마지막 n 개 회차만")
+    return ap
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not Path(args.db).exists():
+        print(f"원장이 없습니다: {args.db}", file=sys.stderr)
+        return 2
+    conn = connect(args.db)
+    try:
+        if args.cmd == "rounds":
+            df = rounds(conn)
+        elif args.cmd == "donor":
+            df = donor_history(conn, args.key, args.last)
+        else:
+            df = bj_history(conn, args.key, args.last)
+    finally:
+        conn.close()
+    if df.empty:
+        print("결과 없음")
+        return 1
+    print(df.to_string(index=False))
+    if "후원하트" in df.columns:
+        print(f"합계: {int(df['후원하트'].sum()):,}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
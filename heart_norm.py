@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+heart_norm.py
+- 닉네임/참여BJ 정규화 엔진
+- 패턴은 모두 미리 컴파일, 단순 삭제 규칙은 str.translate 테이블로 처리
+- 같은 문자열은 한 번만 정규화 (크기 제한 LRU 캐시)
+- Series 는 factorize 코드로 고유값만 정규화한 뒤 다시 펼침
+- 총합산 키(master_nick_key / master_bj_key)는 값이 더 바뀌지 않을 때까지 규칙을 반복
+    * 예전 총합산은 같은 값을 여러 번 정규화했음 (닉네임 2번, 참여BJ 최대 4번) —
+      '[팀A][리더] 철수' 와 '[리더] 철수' 가 같은 BJ 로 모이던 결과를 유지
+    * 단일 파일(normalize_nick / normalize_bj)은 예전처럼 한 번
+- 일반/제휴 하트 구분은 규칙 표 기반, Series 는 고유 ID 단위 벡터 연산
+"""
+
+import re
+import json
+import hashlib
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from heart_paths import APP_DIR
+
+# 규칙이 바뀌면 올린다 (정규화 결과를 저장/재사용하는 쪽에서 키로 사용)
+NORM_RULES_VERSION = 4
+
+# 고유 문자열 캐시 상한 (닉네임/BJ 각각)
+NORM_CACHE_SIZE = 200_000
+
+BRACKET_ANY = r"[()\[\]{}<>「」『』【】〈〉《》⟦⟧❲❳]"
+
+# 제로폭/방향제어 문자 삭제표
+_ZW_TABLE = dict.fromkeys(
+    [*range(0x200B, 0x2010), *range(0x202A, 0x202F), *range(0x2060, 0x2070), 0xFEFF]
+)
+
+# 이모지 블록 + 하트/장식 문자 삭제표 (regex 문자클래스와 동일한 집합)
+_EMOJI_TABLE = dict.fromkeys(
+    [*range(0x1F000, 0x1FB00), *range(0x2700, 0x27C0), *range(0x2600, 0x2700)]
+    + [ord(ch) for ch in "❤️♡♥︎💗💖💘💝💞💟✨⭐️☀️"]
+)
+
+_QUOTE_TABLE = dict.fromkeys(map(ord, "\"'`"))
+
+_BRACKET_CHARS = frozenset("()[]{}<>「」『』【】〈〉《》⟦⟧❲❳")
+_RE_BR_HEAD = re.compile(fr"^\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*")
+_RE_BR_TAIL = re.compile(fr"\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*$")
+_RE_BR_MID  = re.compile(fr"{BRACKET_ANY}.*?{BRACKET_ANY}")
+_RE_HONORIFIC = re.compile(r"\s*(님|형|누나|오빠|언니)$")
+
+
+def _strip_zw(s: str) -> str:
+    return s.translate(_ZW_TABLE)
+
+def _has_bracket(s: str) -> bool:
+    return not _BRACKET_CHARS.isdisjoint(s)
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _normalize_nick_cached(nick: str) -> str:
+    s = _strip_zw(unicodedata.normalize("NFKC", nick))
+    if _has_bracket(s):
+        for _ in range(3):
+            prev = s
+            s = _RE_BR_HEAD.sub("", s)
+            s = _RE_BR_TAIL.sub("", s)
+            s = _RE_BR_MID.sub(" ", s)
+            if s == prev:  # 더 바뀔 것이 없으면 남은 반복도 결과 동일
+                break
+    s = s.translate(_EMOJI_TABLE)
+    s = _RE_HONORIFIC.sub("", s)
+    s = s.translate(_QUOTE_TABLE)
+    return " ".join(s.split())
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _normalize_bj_cached(name: str) -> str:
+    s = _strip_zw(unicodedata.normalize("NFKC", name))
+    if _has_bracket(s):
+        s = _RE_BR_HEAD.sub("", s)
+    return " ".join(s.split())
+
+def normalize_nick(nick: str) -> str:
+    if not isinstance(nick, str):
+        return ""
+    return _normalize_nick_cached(nick)
+
+def normalize_bj(name: str) -> str:
+    if not isinstance(name, str):
+        return ""
+    return _normalize_bj_cached(name)
+
+def map_unique(series: pd.Series, func) -> pd.Series:
+    """series 의 고유값에만 func 를 적용하고 factorize 코드로 원래 길이로 되돌린다."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    # 마지막 칸은 결측(-1 코드) 자리
+    table = np.empty(len(uniques) + 1, dtype=object)
+    table[:len(uniques)] = [func(u) for u in uniques]
+    table[-1] = func(None)
+    return pd.Series(table[codes], index=series.index, name=series.name, dtype=object)
+
+def normalize_nick_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, normalize_nick)
+
+def normalize_bj_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, normalize_bj)
+
+def _until_stable(func, s: str) -> str:
+    # 첫 적용 뒤에는 글자가 줄기만 하므로 반드시 멈춘다
+    t = func(s)
+    while t != s:
+        s, t = t, func(t)
+    return t
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _master_nick_cached(nick: str) -> str:
+    return _until_stable(_normalize_nick_cached, nick)
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _master_bj_cached(name: str) -> str:
+    return _until_stable(_normalize_bj_cached, name)
+
+def master_nick_key(nick: str) -> str:
+    """총합산 닉네임 키: normalize_nick 을 값이 그대로일 때까지 ('철수님님' → '철수')."""
+    if not isinstance(nick, str):
+        return ""
+    return _master_nick_cached(nick)
+
+def master_bj_key(name: str) -> str:
+    """총합산 BJ 키: normalize_bj 를 값이 그대로일 때까지 ('[팀A][리더] 철수' → '철수')."""
+    if not isinstance(name, str):
+        return ""
+    return _master_bj_cached(name)
+
+def master_nick_key_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, master_nick_key)
+
+def master_bj_key_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, master_bj_key)
+
+def clear_norm_cache() -> None:
+    _normalize_nick_cached.cache_clear()
+    _normalize_bj_cached.cache_clear()
+    _master_nick_cached.cache_clear()
+    _master_bj_cached.cache_clear()
+
+# ---------------- 하트 구분 ----------------
+# 규칙 표: 앱 폴더(heart_paths.APP_DIR — 실행 파일이면 .exe 옆)에 heart_rules.json 이 있으면
+#          항목별로 기본값을 덮어쓴다 (코드 수정 없이 확장)
+#   char_map           : 비교 전 문자 치환 (앞뒤 공백 제거 후, 소문자화 전)
+#   general_substrings : 포함되면 일반하트 (예외, affiliate 보다 우선)
+#   affiliate_markers  : 포함되면 제휴하트
+AFFILIATE_GENERAL_SUBSTRS = ["@ka"]   # '@ka' 포함 시 일반하트 예외
+HEART_RULES_FILE = APP_DIR / "heart_rules.json"
+DEFAULT_HEART_RULES = {
+    "char_map": {"＠": "@"},
+    "general_substrings": AFFILIATE_GENERAL_SUBSTRS,
+    "affiliate_markers": ["@"],
+}
+
+
+class HeartRules(NamedTuple):
+    char_map: Tuple[Tuple[str, str], ...]
+    general: Tuple[str, ...]
+    affiliate: Tuple[str, ...]
+
+
+def load_heart_rules(path: Path = HEART_RULES_FILE) -> HeartRules:
+    raw = dict(DEFAULT_HEART_RULES)
+    if path.exists():
+        try:
+            raw.update(json.loads(path.read_text(encoding="utf-8")))
+        except Exception as e:
+            raise ValueError(f"하트 구분 규칙 파일 오류 ({path.name}): {e}")
+    # 비교 대상은 소문자화된 ID 이므로 부분문자열도 소문자로
+    return HeartRules(
+        tuple((str(k), str(v)) for k, v in raw["char_map"].items()),
+        tuple(str(x).lower() for x in raw["general_substrings"]),
+        tuple(str(x).lower() for x in raw["affiliate_markers"]),
+    )
+
+@lru_cache(maxsize=None)
+def heart_rules() -> HeartRules:
+    return load_heart_rules()
+
+def rules_signature() -> str:
+    """현재 규칙 표의 짧은 해시 (규칙이 바뀌면 캐시 키가 달라지도록)."""
+    raw = json.dumps(heart_rules(), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+def classify_heart(id_str) -> str:
+    if id_str is None:
+        return "일반하트"
+    rules = heart_rules()
+    s = str(id_str).strip()
+    for a, b in rules.char_map:
+        s = s.replace(a, b)
+    s = s.lower()
+    if any(sub in s for sub in rules.general):
+        return "일반하트"
+    return "제휴하트" if any(m in s for m in rules.affiliate) else "일반하트"
+
+def _contains_any(s: pd.Series, subs) -> np.ndarray:
+    mask = np.zeros(len(s), dtype=bool)
+    for sub in subs:
+        mask |= s.str.contains(sub, regex=False).to_numpy(dtype=bool)
+    return mask
+
+def classify_heart_series(series: pd.Series) -> pd.Series:
+    """classify_heart 와 같은 결과를 고유 ID 마다 한 번, 문자열 연산 한 번씩으로 계산."""
+    rules = heart_rules()
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    s = pd.Series(uniques, dtype=object).map(str).str.strip()
+    for a, b in rules.char_map:
+        s = s.str.replace(a, b, regex=False)
+    s = s.str.lower()
+    aff = _contains_any(s, rules.affiliate) & ~_contains_any(s, rules.general)
+    # 마지막 칸은 결측(-1 코드) 자리 — classify_heart(None) 과 같게
+    table = np.append(np.where(aff, "제휴하트", "일반하트").astype(object), "일반하트")
+    return pd.Series(table[codes], index=series.index, name=series.name, dtype=object)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+heart_paths.py
+- 앱 폴더: 실행할 때마다 남아 있어야 하는 파일(전처리 캐시 / 후원 원장 / 하트 구분 규칙 표)을 두는 곳
+    * 소스 실행: 이 파일이 있는 폴더
+    * PyInstaller 실행 파일(frozen): 실행 파일(.exe)이 있는 폴더
+      (--onefile 이면 __file__ 이 실행마다 새로 풀리고 종료 때 지워지는 임시 폴더 _MEIPASS 안이라 쓰지 않음)
+"""
+
+import sys
+from pathlib import Path
+
+
+def app_dir() -> Path:
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parent
+
+APP_DIR = app_dir()
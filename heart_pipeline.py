@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+heart_pipeline.py
+- 탭1 집계 파이프라인 (GUI 없이 실행 가능)
+    * build_single : 단일 파일 → 요약 + BJ별 관리자용/BJ용 워크북 ZIP
+    * build_master : 여러 파일 → 총합산 엑셀 (일별 / 참여BJ_총계 / BJ별 시트)
+- 총합산 단계 구현은 heart_engine (여기서는 진행 보고/취소만 연결)
+- 총합산 회차 번호는 이번에 고른 파일의 태그 순서 (catalog 를 켜면 회차 목록 heart_rounds.json 에서 조회)
+- 진행 보고/취소는 heart_jobs.Job 으로 (job 생략 시 조용히 실행)
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+from heart_jobs import Job
+from heart_ingest import (
+    extract_date_from_name, read_any_table, preprocess_single, preprocess_single_stream
+)
+from heart_export import write_bj_zips
+from heart_catalog import catalog_path
+from heart_engine import PipelineError, sanitize, run_master  # noqa: F401 (재노출)
+from xlsx_writer import frame_to_xlsx_bytes
+
+# 엔진 단계 → 진행 로그 이름
+_JOB_STAGES = {"ledger": "원장 기록", "normalize": "행 합치기", "dedup": "중복 행 제거",
+               "assign_rounds": "회차 조회", "resolve": "후원자 식별", "aggregate": "행 집계",
+               "index": "후원자 색인", "columnar": "데이터 파일 저장", "render": "시트 작성"}
+
+
+class _JobHook:
+    """엔진 단계 시작을 job 진행 로그로 (취소 확인 지점도 겸함)."""
+
+    def __init__(self, job: Job):
+        self.job = job
+
+    def start(self, stage: str) -> None:
+        if stage in _JOB_STAGES:
+            self.job.stage(_JOB_STAGES[stage])
+
+    def end(self, stage: str, info: dict) -> None:
+        pass
+
+def master_default_name(paths: List[Path]) -> str:
+    # 첫 파일명에서 날짜 문자열만 활용해 기본 파일명 구성 (실제 집계는 태그 기준)
+    return f"총합산_{extract_date_from_name(Path(paths[0]).name)}.xlsx"
+
+
+# ---------------- 단일 파일 ----------------
+def build_single(path, admin_zip, bj_zip, workers: Optional[int] = None,
+                 job: Optional[Job] = None, stream: bool = False) -> dict:
+    """
+    관리자용/BJ용 ZIP 을 admin_zip / bj_zip (경로 또는 파일객체)에 바로 기록.
+    stream=True: CSV 를 덩어리로 읽으며 (참여BJ, ID, 닉네임) 합계만 유지 (결과 동일)
+    반환: {"base", "summary", "bj_count", "rows", "encoding", "sep"}
+    """
+    job = job or Job()
+    if stream:
+        job.stage("파일 읽기 + 행 집계 (스트리밍)")
+        base = preprocess_single_stream(Path(path))
+        attrs = base.attrs
+    else:
+        job.stage("파일 읽기")
+        df = read_any_table(Path(path), sheet=None)
+        attrs = dict(df.attrs, rows=len(df))
+        job.stage("행 집계", len(df))
+        base = preprocess_single(df)
+        del df
+    if "encoding" in attrs:
+        job.log(f"[읽기] 인코딩={attrs['encoding']} 구분자={attrs['sep']!r} 행={attrs['rows']}")
+    summary = base.groupby("참여BJ", as_index=False)["후원하트"].sum().sort_values("후원하트", ascending=False)
+
+    n = write_bj_zips(base, summary["참여BJ"], frame_to_xlsx_bytes(summary, "요약"),
+                      admin_zip, bj_zip, workers=workers,
+                      on_item=lambda i, n: job.stage("BJ 워크북 작성", i, n))
+    return {
+        "base": base, "summary": summary, "bj_count": n, "rows": attrs["rows"],
+        "encoding": attrs.get("encoding"), "sep": attrs.get("sep"),
+    }
+
+
+# ---------------- 총합산 ----------------
+def build_master(paths: List[Path], out, workers: Optional[int] = None,
+                 job: Optional[Job] = None, use_cache: bool = True, stream: bool = False,
+                 ledger=None, keep_index: bool = False, drop_duplicates: bool = True,
+                 columnar: Optional[str] = None, catalog=False) -> dict:
+    """
+    여러 파일을 합산해 out 경로에 총합산 엑셀 저장.
+    ledger: 원장(heart_ledger) 경로 — 주면 파일별 행을 원장에 누적하고 요약 합계를 원장에서 질의
+    keep_index: 후원자 역색인을 결과 "index" 로 (탭1 검색용)
+    drop_duplicates: 겹치는 파일 사이 중복 행 제거 (제거 수는 결과 "duplicates" 에 파일별로)
+    columnar: "parquet" / "arrow" — 엑셀 옆 '<이름>_data' 폴더에 합친 행 + 요약표도 저장
+    catalog: 회차 목록(heart_catalog) — 기본은 안 씀 (이번에 고른 파일의 태그 순서로 회차 번호),
+             True 면 out 옆 heart_rounds.json, 경로면 그 파일
+    반환: {"out", "rows", "sheets", "errors", "cached", "parsed", "duplicates"(, "index", "columnar")}
+    """
+    job = job or Job()
+    paths = [Path(p) for p in paths]
+    if catalog is True:
+        catalog = catalog_path(out)
+    elif not catalog:
+        catalog = None
+
+    job.stage("파일 읽기", 0, len(paths))
+
+    n_done = [0]
+    def _on_file(i, path, err):
+        n_done[0] += 1
+        job.stage("파일 읽기", n_done[0], len(paths))
+
+    return run_master(
+        paths, out, workers=workers, use_cache=use_cache, hooks=[_JobHook(job)],
+        on_file=_on_file, on_sheet=lambda k, n: job.stage("시트 작성", k, n), log=job.log,
+        stream=stream, ledger=ledger, keep_index=keep_index, drop_duplicates=drop_duplicates,
+        columnar=columnar, catalog=catalog,
+    )
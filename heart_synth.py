@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+heart_synth.py
+- 벤치마크/재현용 가짜 후원 내역 생성기 (실제 내보내기와 같은 컬럼 구성)
+    후원시간 / 참여BJ / 후원하트 / 후원 아이디(닉네임)
+- 조절 가능: 행 수, BJ 수, 후원자 수, 괄호/이모지 닉네임 비율, '@' 제휴 아이디 비율,
+  인코딩(utf-8-sig / cp949), 형식(CSV / XLSX)
+- 같은 seed 면 항상 같은 내용 (BJ/후원자 구성은 회차 파일끼리 공유)
+- 실행 예:
+    python heart_synth.py data/ --rows 100k --files 4 --encoding cp949
+"""
+
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from heart_ingest import MIX_COL
+
+XLSX_MAX_ROWS = 1_048_575   # 엑셀 시트 한도 (머리글 1행 제외)
+
+_SYLLABLES = list("가나다라마바사아자차카타파하별달해솔빛꽃봄숲강산민지수현우진서윤하은도영")
+_ID_CHARS = list("abcdefghijklmnopqrstuvwxyz")
+_BRACKETS = ["[VIP]", "[팬]", "「{}」", "【{}】", "({})", "<열혈>"]
+_EMOJIS = ["💖", "❤️", "✨", "⭐", "🐼", "♥"]
+_HONORIFICS = ["님", "형", "누나", "오빠", "언니"]
+_AFFILIATES = ["@sk", "@kt", "@lg", "@ka"]   # '@ka' 는 일반하트 예외
+_HEARTS = np.array([1, 10, 30, 50, 100, 300, 500, 1000, 3000, 10000])
+_HEART_P = np.array([8, 20, 10, 14, 20, 8, 8, 8, 3, 1], dtype=float)
+
+
+class Population(NamedTuple):
+    bjs: np.ndarray        # 참여BJ 표시 이름
+    mixes: np.ndarray      # "아이디(닉네임)" 문자열
+    weights: np.ndarray    # 후원자별 등장 확률 (소수 고액 후원자에 쏠림)
+
+
+def parse_count(s) -> int:
+    """'10k' / '1M' / '250000' → 정수."""
+    s = str(s).strip().lower().replace(",", "").replace("_", "")
+    mult = 1
+    if s.endswith("k"):
+        mult, s = 1_000, s[:-1]
+    elif s.endswith("m"):
+        mult, s = 1_000_000, s[:-1]
+    return int(float(s) * mult)
+
+def _word(rng, lo: int, hi: int) -> str:
+    return "".join(rng.choice(_SYLLABLES, size=int(rng.integers(lo, hi + 1))))
+
+def make_population(bjs: int = 20, donors: int = 2_000, bracket_ratio: float = 0.2,
+                    emoji_ratio: float = 0.1, affiliate_ratio: float = 0.15,
+                    seed: int = 0) -> Population:
+    rng = np.random.default_rng(seed)
+    bj_names = []
+    for i in range(bjs):
+        name = _word(rng, 2, 3)
+        if rng.random() < bracket_ratio:
+            name = f"[{_word(rng, 1, 2)}] {name}"
+        bj_names.append(f"{name}{i}")   # 정규화 후에도 서로 다르게
+
+    mixes = []
+    for i in range(donors):
+        uid = "".join(rng.choice(_ID_CHARS, size=int(rng.integers(4, 9)))) + str(i)
+        if rng.random() < affiliate_ratio:
+            uid += str(rng.choice(_AFFILIATES))
+        nick = _word(rng, 2, 4)
+        if rng.random() < bracket_ratio:
+            br = str(rng.choice(_BRACKETS))
+            nick = br.format(nick) if "{}" in br else br + nick
+        if rng.random() < emoji_ratio:
+            nick += str(rng.choice(_EMOJIS))
+        if rng.random() < 0.05:
+            nick += str(rng.choice(_HONORIFICS))
+        mixes.append(f"{uid}({nick})")
+
+    # 순위^-0.8 분포 (상위 후원자 몇 명이 큰 비중)
+    w = 1.0 / np.arange(1, donors + 1) ** 0.8
+    return Population(np.array(bj_names, dtype=object), np.array(mixes, dtype=object), w / w.sum())
+
+def generate_frame(pop: Population, rows: int, day: date = date(2025, 8, 4),
+                   seed: int = 0, comma_hearts: bool = True) -> pd.DataFrame:
+    """방송 하루치 (20시부터 6시간) 후원 행. 후원시간 오름차순."""
+    rng = np.random.default_rng(seed)
+    secs = np.sort(rng.integers(0, 6 * 3600, size=rows))
+    start = np.datetime64(f"{day.isoformat()}T20:00:00", "s")
+    times = pd.Series((start + secs).astype(str)).str.replace("T", " ", regex=False)
+
+    hearts = rng.choice(_HEARTS, size=rows, p=_HEART_P / _HEART_P.sum())
+    if comma_hearts:
+        labels = np.array([f"{h:,}" for h in _HEARTS], dtype=object)
+        hearts = labels[np.searchsorted(_HEARTS, hearts)]
+
+    # BJ 도 약간 쏠리게 (인기 BJ 가 후원을 더 받음)
+    bw = 1.0 / np.arange(1, len(pop.bjs) + 1) ** 0.5
+    bj = pop.bjs[rng.choice(len(pop.bjs), size=rows, p=bw / bw.sum())]
+    mix = pop.mixes[rng.choice(len(pop.mixes), size=rows, p=pop.weights)]
+    return pd.DataFrame({"후원시간": times.to_numpy(), "참여BJ": bj, "후원하트": hearts, MIX_COL: mix})
+
+def write_export(df: pd.DataFrame, path, encoding: str = "utf-8-sig") -> Path:
+    """확장자(.csv/.xlsx)에 맞춰 저장. cp949 로 못 쓰는 문자(이모지)는 '?' 로 (실제 내보내기와 동일)."""
+    path = Path(path)
+    if path.suffix.lower() == ".xlsx":
+        if len(df) > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX 는 {XLSX_MAX_ROWS:,}행까지만 가능합니다: {len(df):,}행")
+        from xlsx_writer import new_workbook, write_sheet
+        wb = new_workbook()
+        write_sheet(wb, "Sheet1", [[list(df.columns)], df])
+        wb.save(path)
+    else:
+        df.to_csv(path, index=False, encoding=encoding, errors="replace")
+    return path
+
+def generate_files(out_dir, files: int = 1, rows: int = 10_000, bjs: int = 20,
+                   donors: int = 2_000, bracket_ratio: float = 0.2, emoji_ratio: float = 0.1,
+                   affiliate_ratio: float = 0.15, encoding: str = "utf-8-sig",
+                   fmt: str = "csv", seed: int = 0, start: date = date(2025, 8, 4),
+                   pop: Optional[Population] = None) -> List[Path]:
+    """
+    회차 파일 files 개 생성 (파일명 '후원내역_MMDD.csv', 하루씩 증가).
+    rows 는 전체 행 수 — 파일마다 고르게 나눈다.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if pop is None:
+        pop = make_population(bjs, donors, bracket_ratio, emoji_ratio, affiliate_ratio, seed)
+    paths = []
+    per, extra = divmod(rows, files)
+    for k in range(files):
+        day = start + timedelta(days=k)
+        df = generate_frame(pop, per + (1 if k < extra else 0), day, seed=seed + 1 + k)
+        paths.append(write_export(df, out_dir / f"후원내역_{day:%m%d}.{fmt}", encoding))
+    return paths
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="heart_synth.py", description="가짜 후원 내역 파일 생성")
+    ap.add_argument("out_dir", help="출력 폴더")
+    ap.add_argument("--rows", default="10k", help="전체 행 수 (예: 10k, 1M)")
+    ap.add_argument("--files", type=int, default=1, help="회차 파일 수 (행은 나눠 담음)")
+    ap.add_argument("--bjs", type=int, default=20, help="참여BJ 수")
+    ap.add_argument("--donors", default="2k", help="후원자(아이디) 수")
+    ap.add_argument("--bracket", type=float, default=0.2, help="괄호 장식 닉네임/BJ 비율")
+    ap.add_argument("--emoji", type=float, default=0.1, help="이모지 닉네임 비율")
+    ap.add_argument("--affiliate", type=float, default=0.15, help="'@' 제휴 아이디 비율")
+    ap.add_argument("--encoding", default="utf-8-sig", choices=["utf-8-sig", "utf-8", "cp949"])
+    ap.add_argument("--format", default="csv", choices=["csv", "xlsx"])
+    ap.add_argument("--seed", type=int, default=0)
+    return ap
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    paths = generate_files(
+        args.out_dir, files=args.files, rows=parse_count(args.rows), bjs=args.bjs,
+        donors=parse_count(args.donors), bracket_ratio=args.bracket, emoji_ratio=args.emoji,
+        affiliate_ratio=args.affiliate, encoding=args.encoding, fmt=args.format, seed=args.seed,
+    )
+    for p in paths:
+        print(p)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+heart_watch.py
+- 폴더 감시 모드: 회차가 끝날 때마다 공유 폴더에 들어오는 내보내기로 총합산 엑셀을 계속 최신으로
+- 새 CSV/XLSX 가 생기면 그 파일만 읽어 누적 상태(합친 프레임 + 합계표)에 더하고,
+  바뀐 시트만 다시 쓴다 (요약 2개 + 새 행이나 대표 닉네임이 바뀐 행이 있는 BJ) —
+  나머지 BJ 시트는 기존 엑셀의 시트 XML 을 그대로 옮김 (heart_engine.render_partial)
+    * 새 회차 행은 BJ 시트 상세 끝에 붙으므로 기존 상세 행 XML 은 두고 붙는 행과 합계만 새로 씀
+      (같은 회차를 다시 받았거나 대표 닉네임이 바뀐 BJ 는 그 시트 전체를 다시 씀)
+    * 감시 시작 때 폴더에 있던 파일은 한 번에 읽어 전체 작성
+    * 중간 날짜가 늦게 들어와 회차 번호가 밀리면 전체 다시 작성
+    * 엑셀에서 파일을 열어 두어 저장이 막히면 바뀐 시트를 모아 두었다가 다음 확인 때 다시 시도
+    * 지난번 저장 뒤 파일이 바뀌었거나(엑셀에서 고쳐 저장, 시트 삭제) 옮길 시트/행이 없으면 전체 다시 작성
+- 반영 중 오류는 로그만 남기고 감시는 계속 (취소할 때만 끝남)
+- 복사 중인 파일은 건너뜀: 크기/수정 시각이 두 번 연속 같을 때 읽는다
+- 단계는 총합산과 같음 (heart_engine: ingest / normalize / dedup / 회차 목록 / resolve / aggregate)
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from heart_jobs import Job, JobCancelled
+from heart_engine import (
+    PipelineError, aggregate, assign_rounds, bj_titles, catalog_rounds, dedup, ingest,
+    normalize, render, render_partial, resolve, running_sums, sheet_key,
+)
+from xlsx_writer import SpliceMismatch
+
+WATCH_EXTS = (".csv", ".xlsx")
+WATCH_INTERVAL = 5.0
+_OUTPUT_PREFIX = "총합산_"   # 같은 폴더에 저장한 총합산 결과는 입력으로 보지 않음
+
+
+def _file_sig(path: Path) -> Optional[Tuple[int, int]]:
+    """(크기, 수정 시각) — 없으면 None."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+def _changed(before: pd.Series, now: pd.Series) -> np.ndarray:
+    """같은 행의 값이 달라진 위치 (결측끼리는 같음)."""
+    if isinstance(before.dtype, pd.CategoricalDtype) and isinstance(now.dtype, pd.CategoricalDtype):
+        b = before.cat.set_categories(now.cat.categories).cat.codes.to_numpy()
+        return np.flatnonzero(b != now.cat.codes.to_numpy())
+    b, n = before.to_numpy(dtype=object), now.to_numpy(dtype=object)
+    return np.flatnonzero(~((b == n) | (pd.isna(b) & pd.isna(n))))
+
+
+class WatchSession:
+    """총합산 누적 상태 + 엑셀 갱신 (폴더 감시 없이 파일 목록으로도 사용 가능)."""
+
+    def __init__(self, out, workers: Optional[int] = None, use_cache: bool = True,
+                 drop_duplicates: bool = True, catalog=None,
+                 log: Optional[Callable[[str], None]] = None):
+        self.out = Path(out)
+        self.workers = workers
+        self.use_cache = use_cache
+        self.drop_duplicates = drop_duplicates
+        self.catalog = catalog
+        self.log = log or (lambda m: None)
+        self.merged: Optional[pd.DataFrame] = None    # 합친 행 (닉네임은 파일에 적힌 그대로)
+        self._nick: Optional[pd.Series] = None        # 지난번 대표 닉네임 (merged 와 같은 행 순서)
+        self.sums: Optional[pd.DataFrame] = None      # (BJ_KEY, 회차태그, 구분) 후원하트 누적 합계
+        self.tags: List[str] = []
+        self.tag_to_round: Dict[str, int] = {}
+        self.files = 0
+        self._agg = None
+        self._titles: Dict[str, str] = {}             # 마지막으로 저장한 BJ 키 → 시트 이름
+        self._rows: Dict[str, int] = {}               # 마지막으로 저장한 BJ 키 → 상세 행 수
+        self._written: Optional[Tuple[int, int]] = None   # 마지막으로 저장한 엑셀의 (크기, 수정 시각)
+        self._pending: Optional[set] = None           # 아직 못 쓴 BJ 키 (None: 전체 작성 필요)
+        self._rewrite: set = set()                    # 그중 기존 행도 바뀐 BJ (뒤에 붙이기만으로는 안 됨)
+
+    @property
+    def stale(self) -> bool:
+        """반영은 했지만 엑셀에 아직 못 쓴 내용이 있음."""
+        return self._agg is not None and (self._pending is None or bool(self._pending))
+
+    def add(self, paths: List[Path], job: Optional[Job] = None) -> dict:
+        """
+        새 파일을 누적 상태에 더하고 엑셀 갱신.
+        반환: {"out", "files", "rows", "added", "duplicates", "errors", "written", "sheets", "seconds"}
+              (written: 새로 쓴 시트 수, 저장이 막혔으면 0)
+        """
+        job = job or Job()
+        t0 = time.perf_counter()
+        ing = ingest(paths, workers=self.workers, use_cache=self.use_cache)
+        for e in ing.errors:
+            self.log(f"[경고] 건너뜀: {e}")
+        res = {"out": str(self.out), "files": len(ing.frames), "rows": 0, "added": 0,
+               "duplicates": {}, "errors": ing.errors, "written": 0, "sheets": 0}
+        if not ing.frames:
+            res["seconds"] = round(time.perf_counter() - t0, 3)
+            return res
+        job.check()
+
+        old_n = 0 if self.merged is None else len(self.merged)
+        frames = ([self.merged] if self.merged is not None else []) + ing.frames
+        names = (["(기존)"] if self.merged is not None else []) + [Path(p).name for p, _ in ing.sources]
+        merged = normalize(frames)
+        if self.drop_duplicates:
+            # 이미 합친 행은 파일 하나처럼 — 동일 행은 지금까지 가장 많이 나온 횟수만큼만 남아 있으므로 결과는 같다
+            merged, res["duplicates"] = dedup(merged, [len(f) for f in frames], names)
+        new_rows = merged.iloc[old_n:]
+
+        self.tags += [t for t in ing.tags if t not in self.tags]
+        if self.catalog is not None:
+            tag_to_round, _ = catalog_rounds(ing._replace(tags=self.tags),
+                                             [len(f) for f in ing.frames], self.catalog)
+        else:
+            tag_to_round = assign_rounds(self.tags)
+        renumbered = any(tag_to_round.get(t) != r for t, r in self.tag_to_round.items())
+
+        # 대표 닉네임은 원래 표기 전체로 다시 정함 (이미 바꾼 닉네임으로 다시 세면 건수가 달라짐)
+        resolved, _ = resolve(merged.copy(deep=False), tag_to_round)
+        renamed = (_changed(self._nick, resolved["닉네임"].iloc[:old_n])
+                   if self._nick is not None else np.empty(0, dtype=np.int64))
+        job.check()
+
+        self.sums = running_sums(self.sums, new_rows)
+        agg = aggregate(resolved, tag_to_round, self.sums)
+
+        # 새 행의 회차태그가 기존 행보다 모두 뒤면 BJ 시트 상세는 뒤에 붙기만 함 (상세는 회차태그 → 후원시간 순)
+        new_tags = new_rows["회차태그"].dropna().astype(str)
+        old_tags = merged["회차태그"].iloc[:old_n].dropna().astype(str)
+        in_order = new_tags.empty or old_tags.empty or new_tags.min() > old_tags.max()
+        added_keys = {sheet_key(k) for k in new_rows["BJ_KEY"].unique()}
+        renamed_keys = {sheet_key(k) for k in merged["BJ_KEY"].iloc[renamed].unique()}
+        if renumbered or self._pending is None or not self.out.exists():
+            self._pending = None
+        else:
+            self._pending |= added_keys | renamed_keys
+            self._rewrite |= renamed_keys | (set() if in_order else added_keys)
+        self.merged, self._nick = merged, resolved["닉네임"]
+        self.tag_to_round, self._agg = tag_to_round, agg
+        self.files += len(ing.frames)
+        if renumbered:
+            self.log("[감시] 중간 회차가 추가되어 회차 번호가 바뀜 — 전체 다시 작성")
+        if len(renamed):
+            self.log(f"[식별] 대표 닉네임이 바뀐 기존 행 {len(renamed):,}개")
+
+        res.update(rows=len(merged), added=len(new_rows), written=self.flush(job) or 0,
+                   sheets=2 + len(agg.bj_sheets), seconds=round(time.perf_counter() - t0, 3))
+        return res
+
+    def flush(self, job: Optional[Job] = None) -> Optional[int]:
+        """못 쓴 내용을 엑셀에 저장. 반환: 새로 쓴 시트 수 (쓸 것이 없으면 0, 저장이 막혔으면 None)."""
+        if not self.stale:
+            return 0
+        agg = self._agg
+        on_sheet = (lambda k, n: job.check()) if job else None
+        try:
+            written = self._splice(agg, on_sheet) if self._pending is not None else None
+            if written is None:
+                written = render(agg, self.out, on_sheet=on_sheet)
+        except PermissionError:
+            self.log(f"[경고] 엑셀에서 파일이 열려 있어 저장하지 못함 — 닫으면 다음 확인 때 다시 저장: {self.out}")
+            return None
+        self._written = _file_sig(self.out)
+        self._titles = dict(zip((s.key for s in agg.bj_sheets), bj_titles(agg)))
+        self._rows = {s.key: len(s.detail) for s in agg.bj_sheets}
+        self._pending, self._rewrite = set(), set()
+        return written
+
+    def _splice(self, agg, on_sheet) -> Optional[int]:
+        """바뀐 시트만 다시 씀. 기존 엑셀이 지난번에 저장한 그대로가 아니면 None (전체 작성으로 넘어감)."""
+        if _file_sig(self.out) != self._written:
+            self.log(f"[감시] 저장 뒤 총합산 파일이 바뀌었거나 없어짐 — 전체 다시 작성: {self.out}")
+            self._pending = None
+            return None
+        grown = {k: self._rows[k] for k in self._pending - self._rewrite if k in self._rows}
+        try:
+            return render_partial(agg, self.out, self._titles, self._pending,
+                                  on_sheet=on_sheet, grown=grown)
+        except SpliceMismatch as e:
+            self.log(f"[감시] 기존 총합산 파일과 맞지 않음 ({e}) — 전체 다시 작성")
+            self._pending = None
+            return None
+
+
+def _snapshot(folder: Path, skip: set) -> Dict[Path, Tuple[int, int]]:
+    """폴더의 입력 후보 → (크기, 수정 시각)."""
+    out = {}
+    for e in os.scandir(folder):
+        name = e.name
+        if (not e.is_file() or name.startswith(("~$", ".", _OUTPUT_PREFIX))
+                or not name.lower().endswith(WATCH_EXTS)):
+            continue
+        p = Path(e.path)
+        if p.resolve() in skip:
+            continue
+        st = e.stat()
+        out[p] = (st.st_size, st.st_mtime_ns)
+    return out
+
+def watch_folder(folder, out, interval: float = WATCH_INTERVAL, job: Optional[Job] = None,
+                 workers: Optional[int] = None, use_cache: bool = True,
+                 drop_duplicates: bool = True, catalog=False,
+                 on_update: Optional[Callable[[dict], None]] = None) -> None:
+    """
+    folder 를 interval 초마다 확인해 새 파일(또는 다시 받은 파일)이 생기면 반영. job 을 취소할 때까지 반복.
+    out: 총합산 엑셀 경로 (폴더면 처음 읽은 파일 이름으로 총합산_날짜.xlsx)
+    catalog: build_master 와 같음 (기본은 안 씀, True 면 out 옆 heart_rounds.json)
+    on_update(result): 반영할 때마다 WatchSession.add 결과로 호출
+    """
+    from heart_catalog import catalog_path
+    from heart_pipeline import master_default_name
+    job = job or Job()
+    folder = Path(folder)
+    if not folder.is_dir():
+        raise PipelineError(f"감시할 폴더가 없습니다: {folder}")
+    out = Path(out)
+    session: Optional[WatchSession] = None
+    done: Dict[Path, Tuple[int, int]] = {}
+    last: Dict[Path, Tuple[int, int]] = {}
+    job.log(f"[감시] {folder} 확인 시작 ({interval:g}초 간격, 중지는 작업 취소)")
+    while True:
+        snap = _snapshot(folder, {out.resolve()} if out.suffix else set())
+        ready = sorted(p for p, sig in snap.items() if last.get(p) == sig and done.get(p) != sig)
+        last = snap
+        if ready:
+            if session is None:
+                if out.is_dir() or not out.suffix:
+                    out.mkdir(parents=True, exist_ok=True)
+                    out = out / master_default_name(ready)
+                cat = catalog_path(out) if catalog is True else (catalog or None)
+                session = WatchSession(out, workers=workers, use_cache=use_cache,
+                                       drop_duplicates=drop_duplicates, catalog=cat, log=job.log)
+            job.log(f"[감시] 새 파일 {len(ready)}개: " + ", ".join(p.name for p in ready))
+            # 실패해도 같은 파일을 매번 다시 읽지 않음 (파일을 다시 저장하면 새 파일로 보고 다시 읽음)
+            done.update((p, snap[p]) for p in ready)
+            try:
+                res = session.add(ready, job)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                job.log(f"[오류] 반영 실패 ({', '.join(p.name for p in ready)}): {e} — 감시는 계속합니다")
+            else:
+                if res["written"]:
+                    job.log(f"[감시] 저장 {res['out']} — 행 {res['rows']:,} (+{res['added']:,}), "
+                            f"시트 {res['written']}/{res['sheets']}개 다시 씀, {res['seconds']:.1f}초")
+                if on_update:
+                    on_update(res)
+        elif session is not None and session.stale:
+            try:
+                written = session.flush(job)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                job.log(f"[오류] 저장 실패: {e} — 다음 확인 때 다시 시도합니다")
+            else:
+                if written:
+                    job.log(f"[감시] 저장 {session.out} — 시트 {written}개 다시 씀")
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline:
+            job.check()
+            time.sleep(min(0.2, interval))
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# 모듈이 저장소 루트에 평평하게 있으므로 루트를 import 경로에 추가
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import pytest
+
+EXPORT_COLS = ["후원시간", "참여BJ", "후원하트", "후원 아이디(닉네임)"]
+
+
+@pytest.fixture
+def make_export(tmp_path):
+    """행 목록 [(후원시간, 참여BJ, 후원하트, '아이디(닉네임)'), …] → tmp_path 의 내보내기 CSV 경로."""
+    def _make(name, rows):
+        p = tmp_path / name
+        pd.DataFrame(rows, columns=EXPORT_COLS).to_csv(p, index=False, encoding="utf-8-sig")
+        return p
+    return _make
+
+
+def read_sheets(path):
+    """엑셀 → {시트 이름: 행 목록 (값만)}."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        return {ws.title: [list(r) for r in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+    finally:
+        wb.close()
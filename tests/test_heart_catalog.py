@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""회차 목록 번호: 중간 날짜가 늦게 들어오면 뒤 번호를 한 칸씩 민다 (_insert_tag)."""
+
+from heart_catalog import RoundCatalog, reset_catalog
+from heart_engine import assign_rounds
+
+
+def _add(cat, *tags):
+    for t in tags:
+        cat.add(f"d{t}", t, rows=1, name=f"후원내역_{t}.csv")
+
+
+def test_late_middle_date_shifts_later_rounds(tmp_path):
+    cat = RoundCatalog(tmp_path / "r.json")
+    _add(cat, "0804", "0806", "0808")
+    assert cat.rounds() == {"0804": 1, "0806": 2, "0808": 3}
+    _add(cat, "0807", "0801")
+    assert cat.rounds() == {"0801": 1, "0804": 2, "0806": 3, "0807": 4, "0808": 5}
+    assert cat.rounds() == assign_rounds(list(cat.rounds()))   # 한 번에 번호 매긴 것과 같음
+    assert {e.tag: e.round for e in cat.entries} == cat.rounds()   # 이미 있던 항목도 갱신
+
+
+def test_redownload_keeps_round_and_survives_reload(tmp_path):
+    path = tmp_path / "r.json"
+    cat = RoundCatalog(path)
+    _add(cat, "0804", "0806")
+    again = cat.add("다른해시", "0806", rows=2)   # 같은 회차를 다시 받은 파일
+    assert again.round == 2 and len(cat) == 3
+    assert cat.add("d0804", "0804", rows=9).rows == 1   # 이미 있는 파일은 그대로
+    cat.save()
+    loaded = RoundCatalog.load(path)
+    assert loaded.rounds() == {"0804": 1, "0806": 2}
+    _add(loaded, "0805")
+    assert loaded.rounds() == {"0804": 1, "0805": 2, "0806": 3}
+
+
+def test_reset_keeps_backup(tmp_path):
+    path = tmp_path / "r.json"
+    assert not reset_catalog(path)
+    cat = RoundCatalog(path)
+    _add(cat, "0804")
+    cat.save()
+    assert reset_catalog(path)
+    assert not path.exists() and path.with_name("r.json.bak").exists()
+    assert len(RoundCatalog.load(path)) == 0
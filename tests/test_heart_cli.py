@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""지원하지 않는 옵션 조합은 파일을 읽기 전에 종료 코드 2."""
+
+import pytest
+
+from heart_cli import EXIT_USAGE, build_parser, check_args, main
+
+
+@pytest.mark.parametrize("argv", [
+    ["--master", "a.csv", "--out", "o.xlsx", "--stream"],
+    ["--watch", "d", "--out", "o.xlsx", "--ledger"],
+    ["--single", "a.csv", "--out", "o", "--catalog"],
+])
+def test_rejected_combinations(argv):
+    assert main(argv) == EXIT_USAGE
+
+
+def test_stream_with_keep_duplicates_accepted():
+    ap = build_parser()
+    args = ap.parse_args(["--master", "a.csv", "--out", "o.xlsx", "--stream", "--keep-duplicates"])
+    check_args(ap, args)   # ap.error 면 SystemExit
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""dedup: 파일 사이 중복 행 제거와 파일별 제거 수."""
+
+import pandas as pd
+
+from heart_engine import DEDUP_KEYS, dedup
+
+
+def _rows(*hearts, tag="0804"):
+    # 후원시간/ID 는 하트로 구분 — 같은 하트 = 같은 행
+    return pd.DataFrame({"회차태그": tag, "후원시간": [f"10:{h:02d}" for h in hearts], "BJ_KEY": "철수",
+                         "ID": [f"a{h}" for h in hearts], "후원하트": list(hearts)})[DEDUP_KEYS]
+
+
+def _dedup(*files):
+    frames = [f for _, f in files]
+    return dedup(pd.concat(frames, ignore_index=True), [len(f) for f in frames], [n for n, _ in files])
+
+
+def test_counts_per_later_file():
+    out, report = _dedup(("전체.csv", _rows(1, 2, 3)), ("부분.csv", _rows(2, 3)), ("다시.csv", _rows(1, 4)))
+    assert report == {"부분.csv": 2, "다시.csv": 1}
+    assert out["후원하트"].tolist() == [1, 2, 3, 4]
+
+
+def test_same_row_within_file_is_kept_up_to_max_count():
+    # 한 파일 안의 같은 행 두 번은 실제 후원 — 다른 파일에 한 번 있으면 그것만 중복
+    out, report = _dedup(("a.csv", _rows(5, 5)), ("b.csv", _rows(5)), ("c.csv", _rows(5, 5, 5)))
+    assert report == {"b.csv": 1, "c.csv": 2}
+    assert out["후원하트"].tolist() == [5, 5, 5]
+
+
+def test_same_name_counts_are_summed_and_other_rounds_untouched():
+    out, report = _dedup(("x.csv", _rows(1)), ("x.csv", _rows(1)), ("y.csv", _rows(1, tag="0805")))
+    assert report == {"x.csv": 1}
+    assert len(out) == 2
+
+
+def test_single_file_or_missing_columns_untouched():
+    assert _dedup(("a.csv", _rows(1, 1)))[1] == {}
+    df = _rows(1).drop(columns="후원시간")   # 스트리밍 합계 프레임
+    assert dedup(pd.concat([df, df], ignore_index=True), [1, 1], ["a", "b"])[1] == {}
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""대표 닉네임 우선순위: 이름 있음 > 묶음 건수 > 표기 건수 > 최근 > 사전순 (_resolve_codes)."""
+
+import pandas as pd
+
+from heart_identity import canonical_nicks
+
+
+def _canon(rows, weights=None, recency=None):
+    ids, nicks = zip(*rows)
+    out, stats = canonical_nicks(pd.Series(ids), pd.Series(nicks),
+                                 None if weights is None else pd.Series(weights),
+                                 None if recency is None else pd.Series(recency))
+    return out.to_dict(), stats
+
+
+def test_named_beats_more_frequent_empty():
+    assert _canon([("a1", "")] * 3 + [("a1", "철수")])[0] == {"a1": "철수"}
+
+
+def test_block_count_beats_spelling_count():
+    # 'Abc'+'abc' 묶음 4건 > 'xyz' 3건, 묶음 안은 동률 → 사전순 'Abc'
+    rows = [("a1", "Abc")] * 2 + [("a1", "abc")] * 2 + [("a1", "xyz")] * 3
+    assert _canon(rows)[0] == {"a1": "Abc"}
+
+
+def test_spelling_count_within_block():
+    rows = [("a1", "ABC"), ("a1", "a b c"), ("a1", "a b c"), ("a1", "xyz")]
+    assert _canon(rows)[0] == {"a1": "a b c"}
+
+
+def test_recency_breaks_count_tie():
+    assert _canon([("a1", "abc"), ("a1", "ABC")], recency=[2, 1])[0] == {"a1": "abc"}
+    assert _canon([("a1", "abc"), ("a1", "ABC")], recency=[1, 2])[0] == {"a1": "ABC"}
+
+
+def test_lexical_last():
+    assert _canon([("a1", "나"), ("a1", "가")])[0] == {"a1": "가"}
+
+
+def test_weights_count_as_rows_and_empty_id_skipped():
+    out, stats = _canon([("a1", "가"), ("a1", "나"), ("", "다")], weights=[1, 5, 9])
+    assert out == {"a1": "나"}
+    assert stats == {"ids": 1, "merged": 1, "variants": 1}
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+- 총합산 키: 예전 총합산은 닉네임을 두 번, 참여BJ 를 최대 네 번 정규화했으므로
+  중첩 괄호 접두어 / 겹친 호칭이 한 키로 모여야 한다 (단일 파일은 한 번 — test_heart_norm)
+- 빈 파일: 스트리밍과 일반 읽기가 같은 결과
+"""
+
+import pandas as pd
+import pytest
+
+from conftest import read_sheets
+from heart_ingest import (MIX_COL, canonicalize, preprocess_master_file, preprocess_master_stream,
+                          preprocess_single)
+from heart_pipeline import build_master
+
+
+def _frame(bjs, mixes):
+    return pd.DataFrame({"참여BJ": bjs, "후원하트": ["1"] * len(bjs), MIX_COL: mixes})
+
+
+def test_master_keys_repeat_until_stable():
+    df = canonicalize(_frame(["[팀A][리더] 철수", "[a][b][c][d]철수", "[리더] 철수"],
+                             ["a1(철수님님)", "a2(민수 님 님)", "a3(「x」「y」영희님)"]))
+    assert df["BJ_KEY"].tolist() == ["철수", "철수", "철수"]
+    assert df["닉네임"].tolist() == ["철수", "민수", "영희"]
+
+
+def test_single_file_keeps_one_pass():
+    base = preprocess_single(_frame(["[리더] 철수"], ["a1(철수님님)"]))
+    assert base["닉네임"].tolist() == ["철수님"]
+    assert base["참여BJ"].tolist() == ["[리더] 철수"]   # 단일 파일은 표시 이름 그대로
+
+
+def test_master_nested_prefixes_land_on_one_sheet(tmp_path, make_export):
+    a = make_export("후원내역_0804.csv", [("2025-08-04 10:00:00", "[팀A][리더] 철수", "200", "a1(영희님님)")])
+    b = make_export("후원내역_0805.csv", [("2025-08-05 10:00:00", "[리더] 철수", "100", "a2(영희님)")])
+    out = tmp_path / "총합산.xlsx"
+    build_master([a, b], out, workers=1, use_cache=False)
+    sheets = read_sheets(out)
+    assert list(sheets) == ["일별", "참여BJ_총계", "철수"]
+    assert sheets["참여BJ_총계"][1] == ["철수", 300, 0, 300]
+    assert sheets["철수"][0][2] == "총합=300"
+    assert [r[3] for r in sheets["철수"][2:4]] == ["영희", "영희"]
+
+
+@pytest.mark.parametrize("read", [lambda p: preprocess_master_file(p, "0804"),
+                                  lambda p: preprocess_master_stream(p, "0804")])
+def test_empty_csv_is_not_an_encoding_error(tmp_path, read):
+    p = tmp_path / "후원내역_0804.csv"
+    p.write_bytes(b"")
+    with pytest.raises(ValueError, match="빈 파일입니다"):
+        read(p)
+
+
+def test_header_only_csv_gives_empty_frame_in_both_paths(make_export):
+    p = make_export("후원내역_0804.csv", [])
+    assert preprocess_master_file(p, "0804").empty
+    assert preprocess_master_stream(p, "0804").empty
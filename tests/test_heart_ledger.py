@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""원장 조회는 겹치는 내보내기의 같은 행을 한 번만 센다 (총합산 dedup 과 같은 기준)."""
+
+import heart_ledger
+from heart_engine import run_master
+
+FULL = [("2025-08-04 10:00:00", "철수", "100", "a1(영희)"),
+        ("2025-08-04 11:00:00", "철수", "50", "a2(민수)"),
+        ("2025-08-04 11:00:00", "철수", "50", "a2(민수)")]   # 같은 초 두 번 = 실제 후원 두 건
+
+
+def _donor_total(db, donor):
+    conn = heart_ledger.connect(db)
+    try:
+        return int(heart_ledger.donor_history(conn, donor)["후원하트"].sum())
+    finally:
+        conn.close()
+
+
+def test_overlapping_exports_counted_once(tmp_path, make_export):
+    db = tmp_path / "ledger.sqlite3"
+    full = make_export("후원내역_0804.csv", FULL)
+    part = make_export("후원내역_0804_재다운로드.csv", FULL[:2])
+    res = run_master([full, part], tmp_path / "a.xlsx", workers=1, use_cache=False, ledger=db)
+    assert res["duplicates"] == {part.name: 2}
+    assert _donor_total(db, "a1") == 100
+    assert _donor_total(db, "a2") == 100
+
+
+def test_overlap_across_runs(tmp_path, make_export):
+    # 다른 실행에서 따로 들어간 파일끼리도 한 번만
+    db = tmp_path / "ledger.sqlite3"
+    run_master([make_export("후원내역_0804.csv", FULL)], tmp_path / "a.xlsx",
+               workers=1, use_cache=False, ledger=db)
+    run_master([make_export("후원내역_0804_부분.csv", FULL[:1])], tmp_path / "b.xlsx",
+               workers=1, use_cache=False, ledger=db)
+    assert _donor_total(db, "a1") == 100
+    assert _donor_total(db, "a2") == 100
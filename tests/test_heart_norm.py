@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+heart_norm 정규화가 예전 desktop_app 의 정규식 체인과 같은 결과를 내는지 확인
+- 기준 함수는 예전 코드를 그대로 옮겨 둔 것 (바꾸지 말 것)
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heart_norm import (normalize_bj, normalize_bj_series, normalize_nick,
+                        normalize_nick_series)
+
+# ---------------- 예전 구현 (기준) ----------------
+def _strip_zw(s: str) -> str:
+    return re.sub(r"[\u200b-\u200f\u202a-\u202e\u2060-\u206f\ufeff]", "", s)
+
+BRACKET_ANY = r"[()\[\]{}<>「」『』【】〈〉《》⟦⟧❲❳]"
+
+def old_normalize_nick(nick: str) -> str:
+    if not isinstance(nick, str):
+        return ""
+    s = unicodedata.normalize("NFKC", nick)
+    s = _strip_zw(s)
+    for _ in range(3):
+        s = re.sub(fr"^\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*", "", s)
+        s = re.sub(fr"\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*$", "", s)
+        s = re.sub(fr"{BRACKET_ANY}.*?{BRACKET_ANY}", " ", s)
+    s = re.sub(r"[\U0001F000-\U0001FAFF\U00002700-\U000027BF\U00002600-\U000026FF]+", "", s)
+    s = re.sub(r"[❤️♡♥︎💗💖💘💝💞💟✨⭐️☀️]+", "", s)
+    s = re.sub(r"\s*(님|형|누나|오빠|언니)$", "", s)
+    s = re.sub(r"[\"'`]+", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+def old_normalize_bj(name: str) -> str:
+    if not isinstance(name, str):
+        return ""
+    s = unicodedata.normalize("NFKC", name)
+    s = _strip_zw(s)
+    s = re.sub(fr"^\s*{BRACKET_ANY}.*?{BRACKET_ANY}\s*", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+# ---------------- 경계 사례 ----------------
+CASES = [
+    "", " ", "\t\n", "　", "철수", "  철수  ", "철수님", "철수님님", "민수 님 님", "철수 오빠",
+    "누나", "님", "언니언니", "[VIP]철수", "철수[VIP]", "[a]철수[b]", "[a][b][c][d]철수",
+    "[a] [b] [c] [d] 철수 [e]", "(((철수)))", "「철수」님", "【공지】 민수 】", "[열린 괄호",
+    "닫힌 괄호]", "<a>b<c>d<e>", "❲x❳y⟦z⟧", "Ａｂｃ１２３", "ＡＢＣ　ＤＥＦ", "ﾊﾝｶｸ",
+    "철\u200b수", "\ufeff철수", "\u202a철수\u202c", "철\u2060수\u200d님", "💖철수💖", "❤️민수❤️",
+    "♡♥︎하트♡", "✨⭐️☀️별", "😀🫶 웃음 님", "'따옴표'", '"큰"따옴표`', "a  b\t\tc",
+    "[💖]철수 님", "(철수)💖님", "철수 ( 님 )", "\x1c철수\x1c", "①②③", "ｶﾞｷﾞ", "fiﬂ",
+]
+
+
+@pytest.mark.parametrize("s", CASES)
+def test_normalize_nick_matches_old(s):
+    assert normalize_nick(s) == old_normalize_nick(s)
+
+
+@pytest.mark.parametrize("s", CASES)
+def test_normalize_bj_matches_old(s):
+    assert normalize_bj(s) == old_normalize_bj(s)
+
+
+@pytest.mark.parametrize("value", [None, np.nan, 3, 1.5])
+def test_non_string_is_empty(value):
+    assert normalize_nick(value) == old_normalize_nick(value) == ""
+    assert normalize_bj(value) == old_normalize_bj(value) == ""
+
+
+def test_series_matches_old():
+    ser = pd.Series(CASES + [None, np.nan, "철수님님", "철수님님"], dtype=object)
+    assert normalize_nick_series(ser).tolist() == [old_normalize_nick(x) for x in ser]
+    assert normalize_bj_series(ser).tolist() == [old_normalize_bj(x) for x in ser]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+- splice_sheets: 기존 시트 XML 옮기기 / 기존 행 끼워 넣기 (행 번호 밀기)
+- WatchSession: 파일을 하나씩 더하며 바뀐 시트만 쓴 결과 == 같은 파일로 처음부터 만든 총합산
+"""
+
+import os
+
+import pytest
+
+from conftest import read_sheets
+from heart_pipeline import build_master
+from heart_watch import WatchSession
+from xlsx_writer import SpliceMismatch, new_workbook, save_workbook, splice_sheets, write_sheet
+
+
+def _book(sheets):
+    wb = new_workbook()
+    for title, rows in sheets.items():
+        write_sheet(wb, title, [rows])
+    return save_workbook(wb)
+
+
+def test_splice_reuses_and_inserts_old_rows(tmp_path):
+    old = tmp_path / "old.xlsx"
+    old.write_bytes(_book({"요약": [["합계", 3]], "철수": [["머리"], ["가"], ["나"]]}))
+    fresh = _book({"요약": [["자리"]], "철수": [["새 머리"], ["다"]]})
+    splice_sheets(fresh, old, {"요약": "요약"}, old, insert={"철수": ("철수", 1, 2)})
+    sheets = read_sheets(old)
+    assert sheets["요약"] == [["합계", 3]]
+    assert sheets["철수"] == [["새 머리"], ["가"], ["나"], ["다"]]
+
+
+def test_splice_missing_sheet_leaves_dest(tmp_path):
+    old = tmp_path / "old.xlsx"
+    old.write_bytes(_book({"요약": [["합계", 3]]}))
+    before = old.read_bytes()
+    with pytest.raises(SpliceMismatch):
+        splice_sheets(_book({"철수": [["자리"]]}), old, {"철수": "철수"}, old)
+    assert old.read_bytes() == before
+
+
+ROUNDS = {
+    "0804": [("2025-08-04 10:00:00", "철수", "100", "a1(영희)"),
+             ("2025-08-04 10:05:00", "민수", "30", "b2@ka(동수)")],
+    "0805": [("2025-08-05 10:00:00", "철수", "50", "a1(영희님)"),
+             ("2025-08-05 11:00:00", "영철", "20", "c3@x(지수)")],
+    "0806": [("2025-08-06 09:00:00", "민수", "70", "a1(영희)")],
+}
+
+
+def _export(make_export, tag):
+    return make_export(f"후원내역_{tag}.csv", ROUNDS[tag])
+
+
+@pytest.mark.parametrize("order", [["0804", "0805", "0806"],    # 뒤에 붙기만 (부분 작성)
+                                   ["0804", "0806", "0805"]])   # 중간 회차가 늦게 (전체 작성)
+def test_incremental_matches_full_rebuild(tmp_path, make_export, order):
+    out = tmp_path / "watch.xlsx"
+    s = WatchSession(out, workers=1, use_cache=False)
+    for k, tag in enumerate(order):
+        res = s.add([_export(make_export, tag)])
+        if k and order[:k + 1] == sorted(order[:k + 1]):
+            assert res["written"] < res["sheets"]   # 바뀐 시트만 씀
+        ref = tmp_path / "ref.xlsx"
+        build_master([_export(make_export, t) for t in sorted(order[:k + 1])], ref,
+                     workers=1, use_cache=False)
+        assert read_sheets(out) == read_sheets(ref)
+
+
+def test_edited_workbook_falls_back_to_full_rewrite(tmp_path, make_export):
+    out = tmp_path / "watch.xlsx"
+    logs = []
+    s = WatchSession(out, workers=1, use_cache=False, log=logs.append)
+    s.add([_export(make_export, "0804")])
+    out.write_bytes(_book({"일별": [["엑셀에서 고침"]]}))   # 사용자가 시트를 지우고 저장
+    os.utime(out, ns=(0, 0))
+    s.add([_export(make_export, "0805")])
+    ref = tmp_path / "ref.xlsx"
+    build_master([_export(make_export, t) for t in ("0804", "0805")], ref, workers=1, use_cache=False)
+    assert read_sheets(out) == read_sheets(ref)
+    assert any("전체 다시 작성" in m for m in logs)
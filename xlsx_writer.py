@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+xlsx_writer.py
+- 모든 엑셀 출력(요약/BJ별/총합산)이 공유하는 스트리밍 워크북 작성기
+- openpyxl write-only 모드: 시트를 추가하는 즉시 행을 흘려 쓰므로 메모리 사용이 일정
+- 시트 내용은 '블록' 목록으로 전달
+    * list[list]   : 머리행/합계행/빈 행 등 고정 행
+    * pd.DataFrame : 데이터 행 (머리행 제외, 열 배열에서 바로 행 생성)
+- 열 너비는 쓰기 전에 블록에서 계산 (기존 max(12, min(m+2, 80)) 규칙 유지)
+    * DataFrame 은 열 단위로 고유값만 측정, 문자열 폭은 캐시/문자 폭 표 사용
+- write-only 시트는 문자열을 시트 안(inlineStr)에 두므로 시트 XML 하나가 독립적 —
+  splice_sheets 는 바뀐 시트만 새로 쓰고 나머지는 기존 파일의 시트 XML 을 그대로 옮긴다
+  (뒤에 행만 붙은 시트는 기존 행 XML 을 그대로 두고 붙는 행만 새로 써서 행 번호를 맞춘다)
+"""
+
+import io
+import os
+import re
+import shutil
+import zipfile
+import posixpath
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_bool_dtype
+
+Block = Union[List[list], pd.DataFrame]
+
+WIDTH_MIN, WIDTH_MAX = 12, 80
+WIDTH_CACHE_SIZE = 200_000   # 고유 문자열 폭 캐시 상한
+
+
+@lru_cache(maxsize=None)
+def _char_width(ch: str) -> int:
+    # 문자 폭 표 (처음 본 문자만 unicodedata 조회)
+    if unicodedata.east_asian_width(ch) in ("F","W","A") or ord(ch) >= 0x1F300:
+        return 2
+    return 1
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def _str_width(s: str) -> int:
+    if s.isascii():
+        return len(s)
+    return sum(map(_char_width, s))
+
+def visual_len(val) -> int:
+    return _str_width(str("" if val is None else val))
+
+def series_width(col: pd.Series) -> int:
+    """열의 최대 visual_len. 정수열은 최댓값/최솟값 자릿수, 그 외는 고유값만 측정."""
+    if col.empty:
+        return 0
+    if is_integer_dtype(col.dtype) and not is_bool_dtype(col.dtype):
+        return max(len(str(col.max())), len(str(col.min())))
+    return max(map(visual_len, col.drop_duplicates().tolist()))
+
+def _iter_block_rows(block: Block) -> Iterator[list]:
+    if isinstance(block, pd.DataFrame):
+        if block.empty:
+            return
+        cols = [block.iloc[:, i].tolist() for i in range(block.shape[1])]
+        for row in zip(*cols):
+            yield list(row)
+    else:
+        for row in block:
+            yield list(row)
+
+def _block_widths(block: Block) -> List[int]:
+    """블록의 열별 최대 visual_len (열 개수만큼)."""
+    if isinstance(block, pd.DataFrame):
+        return [series_width(block.iloc[:, i]) for i in range(block.shape[1])]
+    out: List[int] = []
+    for row in block:
+        for i, v in enumerate(row):
+            w = visual_len(v)
+            if i < len(out):
+                out[i] = max(out[i], w)
+            else:
+                out.append(w)
+    return out
+
+def column_widths(blocks: Iterable[Block]) -> List[int]:
+    """블록 전체 기준 열 너비 (clamp 적용)."""
+    m: List[int] = []
+    for b in blocks:
+        for i, w in enumerate(_block_widths(b)):
+            if i < len(m):
+                m[i] = max(m[i], w)
+            else:
+                m.append(w)
+    return [max(WIDTH_MIN, min(w + 2, WIDTH_MAX)) for w in m]
+
+def new_workbook():
+    from openpyxl import Workbook
+    return Workbook(write_only=True)
+
+def write_sheet(wb, title: str, blocks: List[Block], widths: Optional[List[int]] = None) -> None:
+    """
+    블록을 순서대로 한 시트에 흘려 쓴다. 너비는 행보다 먼저 지정해야 한다.
+    widths: 미리 계산한 열 너비 (splice_sheets 로 기존 행을 끼워 넣을 시트는 전체 행 기준으로)
+    """
+    from openpyxl.utils import get_column_letter
+    ws = wb.create_sheet(title=title)
+    for i, w in enumerate(column_widths(blocks) if widths is None else widths, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+    for b in blocks:
+        for row in _iter_block_rows(b):
+            ws.append(row)
+
+def save_workbook(wb, dest=None):
+    """dest 가 없으면 bytes 반환, 있으면 경로/파일객체에 저장."""
+    if dest is None:
+        bio = io.BytesIO(); wb.save(bio); return bio.getvalue()
+    wb.save(dest)
+    return None
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+def sheet_parts(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """워크북 zip → {시트 이름: 시트 XML 항목 이름}."""
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for r in rels.iter(f"{_NS_PKG}Relationship"):
+        t = r.get("Target")
+        targets[r.get("Id")] = t.lstrip("/") if t.startswith("/") else posixpath.normpath("xl/" + t)
+    wb = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    return {sh.get("name"): targets[sh.get(f"{_NS_REL}id")] for sh in wb.iter(f"{_NS_MAIN}sheet")}
+
+class SpliceMismatch(ValueError):
+    """기존 파일에 옮겨 올 시트/행이 없음 (사용자가 시트를 지우거나 행을 고침 — 전체를 다시 써야 함)."""
+
+_RE_ROW_NUM = re.compile(rb'(<row r="|<c r="[A-Z]+)(\d+)"')
+_SHEET_DATA_END = b"</sheetData>"
+
+def _row_tag(r: int) -> bytes:
+    return f'<row r="{r}"'.encode()
+
+def _find_row(xml: bytes, r: int) -> int:
+    """시트 XML 에서 r 행이 시작하는 위치 (없으면 sheetData 끝)."""
+    i = xml.find(_row_tag(r))
+    return i if i >= 0 else xml.find(_SHEET_DATA_END)
+
+def _copy_rows(src, dst, first: int, last: int, chunk: int = 1 << 20) -> None:
+    """시트 XML 스트림 src 의 first~last 행을 그대로 dst 로 (전체를 메모리에 올리지 않음)."""
+    start, stop = _row_tag(first), _row_tag(last + 1)
+    overlap = max(len(stop), len(_SHEET_DATA_END)) - 1
+    buf, copying = b"", False
+    while True:
+        data = src.read(chunk)
+        buf += data
+        if not copying:
+            i = buf.find(start)
+            if i < 0:
+                if not data:
+                    raise SpliceMismatch(f"기존 시트에 {first}행이 없습니다.")
+                buf = buf[-overlap:]
+                continue
+            buf, copying = buf[i:], True
+        cuts = [j for j in (buf.find(stop), buf.find(_SHEET_DATA_END)) if j >= 0]
+        if cuts:
+            dst.write(buf[:min(cuts)])
+            return
+        if not data:
+            raise SpliceMismatch(f"기존 시트의 {last}행 뒤를 찾을 수 없습니다.")
+        dst.write(buf[:-overlap])
+        buf = buf[-overlap:]
+
+def _insert_rows(fresh_xml: bytes, old_src, dst, head: int, keep: int) -> None:
+    """fresh 시트의 앞 head 행 뒤에 기존 시트의 head+1 ~ head+keep 행을 끼우고 fresh 의 나머지 행 번호를 keep 만큼 민다."""
+    cut = _find_row(fresh_xml, head + 1)
+    dst.write(fresh_xml[:cut])
+    _copy_rows(old_src, dst, head + 1, head + keep)
+    shift = lambda m: m[1] + str(int(m[2]) + keep).encode() + b'"'
+    dst.write(_RE_ROW_NUM.sub(shift, fresh_xml[cut:]))
+
+def _open_old(old) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(old)
+    except zipfile.BadZipFile as e:
+        raise SpliceMismatch(f"기존 파일을 엑셀 파일로 읽을 수 없습니다: {e}") from None
+
+def splice_sheets(fresh: bytes, old, reuse: Dict[str, str], dest,
+                  insert: Optional[Dict[str, Tuple[str, int, int]]] = None) -> None:
+    """
+    fresh(새 워크북 bytes) 와 old(기존 파일) 로 dest 저장 (임시 파일에 쓴 뒤 교체 — dest 와 old 가 같아도 됨).
+    reuse {새 시트 이름: 기존 시트 이름}: 시트 XML 을 old 에서 그대로 (fresh 에는 빈 자리표시 시트)
+    insert {새 시트 이름: (기존 시트 이름, head, keep)}: fresh 시트의 앞 head 행 뒤에 기존 시트의
+        head+1 ~ head+keep 행을 그대로 끼움 (fresh 에는 그 행을 빼고 쓴 시트 — 뒤에 붙는 행만 새로 만든다)
+    old 에 옮길 시트/행이 없거나 워크북으로 읽을 수 없으면 SpliceMismatch (dest 는 그대로)
+    """
+    dest = Path(dest)
+    tmp = dest.with_name(dest.name + ".tmp")
+    try:
+        with zipfile.ZipFile(io.BytesIO(fresh)) as zin, _open_old(old) as zold, \
+                zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+            new_parts = sheet_parts(zin)
+            try:
+                old_parts = sheet_parts(zold)
+            except (KeyError, ElementTree.ParseError) as e:
+                raise SpliceMismatch(f"기존 파일의 시트 목록을 읽을 수 없습니다: {e}") from None
+            wanted = list(reuse.values()) + [o for o, _, _ in (insert or {}).values()]
+            missing = [o for o in wanted if o not in old_parts or old_parts[o] not in zold.NameToInfo]
+            if missing:
+                raise SpliceMismatch(f"기존 파일에 시트가 없습니다: {', '.join(missing)}")
+            swap = {new_parts[n]: old_parts[o] for n, o in reuse.items()}
+            grow = {new_parts[n]: (old_parts[o], head, keep) for n, (o, head, keep) in (insert or {}).items()}
+            for info in zin.infolist():
+                zi = zipfile.ZipInfo(info.filename, info.date_time)
+                zi.compress_type = zipfile.ZIP_DEFLATED
+                with zout.open(zi, "w") as fo:
+                    if info.filename in grow:
+                        name, head, keep = grow[info.filename]
+                        with zold.open(name) as fi:
+                            _insert_rows(zin.read(info.filename), fi, fo, head, keep)
+                        continue
+                    src, name = (zold, swap[info.filename]) if info.filename in swap else (zin, info.filename)
+                    with src.open(name) as fi:
+                        shutil.copyfileobj(fi, fo, 1 << 20)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def frame_to_xlsx_bytes(df: pd.DataFrame, title: str) -> bytes:
+    """머리행 + 데이터 한 시트짜리 워크북."""
+    wb = new_workbook()
+    write_sheet(wb, title, [[list(df.columns)], df])
+    return save_workbook(wb)